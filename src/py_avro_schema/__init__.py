@@ -14,7 +14,17 @@
 Generate Apache Avro schemas for Python types including standard library data-classes and Pydantic data models.
 
 The main API is a single function, :func:`generate`. Its first argument is the Python type or class to generate the Avro
-schema for.
+schema for. To generate schemas for many classes at once, optionally using multiple processes, use
+:func:`generate_many`. To identify schemas, for example to tag serialized data, use :func:`fingerprint` or
+:func:`canonical_form`. To serialize instances of Python types in Avro binary encoding, use :func:`encoder`, and to
+deserialize them, use :func:`decoder`. To deserialize data written with another schema, for example an older version
+of the schema, use :func:`resolving_decoder`. To read a few fields of records without decoding them entirely, use
+:func:`view`. To encode many records one field at a time, use :func:`encode_batch`, and to decode many records into
+columns of field values, :func:`decode_columns`. For data tagged with its schema's fingerprint, use
+:func:`encode_single` and :func:`decode_single`. For records with a fixed layout, :func:`struct_codec` encodes and
+decodes them using a :class:`struct.Struct`. To write and read Avro container files, use the
+:mod:`py_avro_schema.container` module, and to serialize data in the Confluent Schema Registry wire format, the
+:mod:`py_avro_schema.registry` module.
 
 .. seealso::
 
@@ -22,36 +32,112 @@ schema for.
 
 """
 
-import importlib.metadata
-from typing import Optional, Type
+import importlib
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple, Type
 
-import memoization
-import orjson
-
-from py_avro_schema._schemas import (
-    JSON_OPTIONS,
-    Option,
-    TypeNotSupportedError,
-    register_schema,
-    schema,
-)
+from py_avro_schema._cache import CacheInfo, cached
+from py_avro_schema._options import JSON_OPTIONS, Option
 from py_avro_schema._typing import DecimalMeta, DecimalType
 
-#: Library version, e.g. 1.0.0, taken from Git tags
-__version__ = importlib.metadata.version("localstack-py-avro-schema")
+if TYPE_CHECKING:
+    from py_avro_schema import container, registry
+    from py_avro_schema._batch import GenerateResult, generate_many
+    from py_avro_schema._columnar import (
+        Column,
+        EncodedBatch,
+        decode_columns,
+        encode_batch,
+    )
+    from py_avro_schema._decoder import decoder
+    from py_avro_schema._encoder import encoder
+    from py_avro_schema._fingerprint import canonical_form, fingerprint
+    from py_avro_schema._fixed_layout import StructCodec, struct_codec
+    from py_avro_schema._resolution import resolving_decoder
+    from py_avro_schema._schemas import TypeNotSupportedError, register_schema
+    from py_avro_schema._single_object import decode_single, encode_single
+    from py_avro_schema._view import view
+
+    #: Library version, e.g. 1.0.0, taken from Git tags
+    __version__: str
 
 
 __all__ = [
+    "CacheInfo",
+    "Column",
     "DecimalMeta",
     "DecimalType",
+    "EncodedBatch",
+    "GenerateResult",
     "Option",
+    "StructCodec",
     "TypeNotSupportedError",
+    "canonical_form",
+    "container",
+    "decode_columns",
+    "decode_single",
+    "decoder",
+    "encode_batch",
+    "encode_single",
+    "encoder",
+    "fingerprint",
     "generate",
+    "generate_many",
     "register_schema",
+    "registry",
+    "resolving_decoder",
+    "struct_codec",
+    "view",
 ]
 
-
-@memoization.cached
+_LAZY_ATTRS = {
+    "Column": "py_avro_schema._columnar",
+    "EncodedBatch": "py_avro_schema._columnar",
+    "GenerateResult": "py_avro_schema._batch",
+    "StructCodec": "py_avro_schema._fixed_layout",
+    "TypeNotSupportedError": "py_avro_schema._schemas",
+    "canonical_form": "py_avro_schema._fingerprint",
+    "decode_columns": "py_avro_schema._columnar",
+    "decode_single": "py_avro_schema._single_object",
+    "decoder": "py_avro_schema._decoder",
+    "encode_batch": "py_avro_schema._columnar",
+    "encode_single": "py_avro_schema._single_object",
+    "encoder": "py_avro_schema._encoder",
+    "fingerprint": "py_avro_schema._fingerprint",
+    "generate_many": "py_avro_schema._batch",
+    "register_schema": "py_avro_schema._schemas",
+    "resolving_decoder": "py_avro_schema._resolution",
+    "struct_codec": "py_avro_schema._fixed_layout",
+    "view": "py_avro_schema._view",
+}
+"""Public names imported from their modules on first access only, such that importing this package is fast"""
+
+_LAZY_MODULES = {"container", "registry"}
+"""Public submodules imported on first access only"""
+
+
+def __getattr__(name: str) -> Any:
+    """Import lazily loaded attributes on first access"""
+    value: Any
+    if name == "__version__":
+        from importlib import metadata
+
+        value = metadata.version("localstack-py-avro-schema")
+    elif name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    elif name in _LAZY_MODULES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """Return the module's attributes including lazily loaded attributes"""
+    return sorted({*globals(), *_LAZY_ATTRS, *_LAZY_MODULES, "__version__"})
+
+
+@cached(maxsize=4096)
 def generate(
     py_type: Type,
     *,
@@ -61,17 +147,92 @@ def generate(
     """
     Return an Avro schema as a JSON-formatted bytestring for a given Python class or instance
 
-    This function is cached and can be called repeatedly with the same arguments without any performance penalty.
+    This function is cached and can be called repeatedly with the same arguments without any performance penalty. The
+    cache holds up to 4096 schemas, evicting the least recently used ones, and references Python classes weakly such
+    that dynamically created classes can be garbage collected. The cache is cleared automatically when schema classes or
+    type aliases are registered. Use ``generate.cache_info()`` for cache statistics, ``generate.cache_clear()`` to clear
+    the cache and ``generate.cache_resize(maxsize)`` to change its size.
+
+    To also cache schemas on disk across processes, set the environment variable ``PY_AVRO_SCHEMA_CACHE_DIR`` to a
+    directory. Cached schemas are keyed by the contents of the source files of the type and all types it references,
+    such that changed types are detected and their schemas generated again.
+
+    Options which only affect the output format, like ``Option.NO_DOC`` or ``Option.INT_32``, do not require the Python
+    type to be inspected again: generating the schema for the same type with a different combination of these options
+    re-uses the type information collected before.
 
     :param py_type:   The Python class to generate a schema for.
     :param namespace: The Avro namespace to add to schemas.
     :param options:   Schema generation options as defined by :class:`Option` enum values. Specify multiple values like
                       this: ``Option.INT_32 | Option.FLOAT_32``.
     """
+    # Imported on first use to keep importing this package fast
+    import orjson
+
+    from py_avro_schema import _disk_cache
+    from py_avro_schema._schemas import schema
+
+    cache_dir = _disk_cache.cache_dir()
+    cache_key = _disk_cache.cache_key(py_type, namespace, options) if cache_dir else None
+    if cache_dir and cache_key:
+        schema_json = _disk_cache.load(cache_dir, cache_key)
+        if schema_json is not None:
+            return schema_json
     schema_dict = schema(py_type, namespace=namespace, options=options)
     json_options = 0
     for opt in JSON_OPTIONS:
         if opt in options:
             json_options |= opt.value
-    schema_json = orjson.dumps(schema_dict, option=json_options)
+    try:
+        schema_json = orjson.dumps(schema_dict, option=json_options)
+    except orjson.JSONEncodeError as e:
+        if "recursion" not in str(e).lower():
+            raise
+        schema_json = _dumps_nested(schema_dict, option=json_options)
+    if cache_dir and cache_key:
+        _disk_cache.store(cache_dir, cache_key, schema_json)
     return schema_json
+
+
+def _dumps_nested(obj: Any, option: int) -> bytes:
+    """
+    Serialize JSON data nested too deeply for :func:`orjson.dumps`
+
+    Containers are serialized using an explicit stack, other values using :func:`orjson.dumps`. Output is formatted
+    exactly like :func:`orjson.dumps` would.
+    """
+    import orjson
+
+    indent = bool(option & orjson.OPT_INDENT_2)
+    sort_keys = bool(option & orjson.OPT_SORT_KEYS)
+    value_option = option & ~(orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+    key_separator = b": " if indent else b":"
+    chunks: List[bytes] = []
+    stack: List[Tuple[Any, int, bool]] = [(obj, 0, False)]  # (Value or raw bytes, depth, whether raw)
+    while stack:
+        value, depth, raw = stack.pop()
+        if raw:
+            chunks.append(value)
+        elif isinstance(value, (dict, list)) and value:
+            newline = b"\n" + b"  " * (depth + 1) if indent else b""
+            items: Iterable[Tuple[Any, Any]]
+            if isinstance(value, dict):
+                items = sorted(value.items()) if sort_keys else value.items()
+                opening, closing = b"{", b"}"
+            else:
+                items = ((None, item) for item in value)
+                opening, closing = b"[", b"]"
+            tokens: List[Tuple[Any, int, bool]] = [(opening, depth, True)]
+            for i, (key, item) in enumerate(items):
+                prefix = (b"," if i else b"") + newline
+                if key is not None:
+                    prefix += orjson.dumps(key) + key_separator
+                tokens.append((prefix, depth, True))
+                tokens.append((item, depth + 1, False))
+            tokens.append(((b"\n" + b"  " * depth if indent else b"") + closing, depth, True))
+            stack.extend(reversed(tokens))
+        else:
+            chunks.append(orjson.dumps(value, option=value_option))
+    if option & orjson.OPT_APPEND_NEWLINE:
+        chunks.append(b"\n")
+    return b"".join(chunks)
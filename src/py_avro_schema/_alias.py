@@ -9,6 +9,8 @@ import dataclasses
 from collections import defaultdict
 from typing import Annotated, Type, get_args, get_origin
 
+from py_avro_schema._cache import invalidate_caches
+
 FQN = str
 """Fully qualified name for a Python type"""
 _ALIASES: dict[FQN, set[FQN]] = defaultdict(set)
@@ -69,6 +71,7 @@ def register_type_aliases(aliases: list[FQN]):
         """Wrapper function that updates the aliases dictionary"""
         fqn = get_fully_qualified_name(cls)
         _ALIASES[fqn].update(aliases)
+        invalidate_caches()
         return cls
 
     return _wrapper
@@ -91,6 +94,7 @@ def register_type_alias(alias: FQN):
         """Wrapper function that updates the aliases dictionary"""
         fqn = get_fully_qualified_name(cls)
         _ALIASES[fqn].add(alias)
+        invalidate_caches()
         return cls
 
     return _wrapper
@@ -103,6 +107,14 @@ def get_aliases(fqn: str) -> list[str]:
     return []
 
 
+def is_opaque(py_type: Type) -> bool:
+    """Whether a type is annotated with the `Opaque` marker, such that its values are serialized as JSON strings"""
+    if get_origin(py_type) is not Annotated:
+        return False
+    annotation = get_args(py_type)[1]
+    return isinstance(annotation, type) and issubclass(annotation, Opaque)
+
+
 def get_field_aliases_and_actual_type(py_type: Type) -> tuple[list[str] | None, Type]:
     """
     Check if a type contains an alias metadata via `Alias` or `Aliases` as metadata.
@@ -117,7 +129,7 @@ def get_field_aliases_and_actual_type(py_type: Type) -> tuple[list[str] | None,
 
     # When a field is annotated with the Opaque class, we return bytes as type.
     #   The object serializer is responsible for dumping the entire attribute as a JSON string
-    if isinstance(annotation, type) and issubclass(annotation, Opaque):
+    if is_opaque(py_type):
         return [], str
 
     # Annotated type but not an alias. We do nothing.
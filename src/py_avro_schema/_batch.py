@@ -0,0 +1,175 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Generate Avro schemas for many Python types at once, optionally using multiple processes
+"""
+
+import concurrent.futures
+import dataclasses
+import importlib
+import math
+import pickle
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import py_avro_schema
+from py_avro_schema._options import Option
+
+_CHUNKS_PER_WORKER = 4
+"""Number of chunks to split the types into per worker process, to balance load across workers"""
+
+_Outcome = Tuple[Optional[bytes], Optional[BaseException]]
+
+
+@dataclasses.dataclass(frozen=True)
+class GenerateResult:
+    """The outcome of generating the Avro schema for a single Python type using :func:`generate_many`"""
+
+    #: The Python type, or the import path as given if it could not be imported
+    py_type: Any
+    #: The Avro schema as a JSON-formatted bytestring, if generated successfully
+    schema: Optional[bytes] = None
+    #: The exception raised when importing the type or generating its schema, if any
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the schema was generated successfully"""
+        return self.error is None
+
+
+def generate_many(
+    py_types: Iterable[Union[type, str]],
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+    workers: Optional[int] = None,
+) -> List[GenerateResult]:
+    """
+    Return the Avro schemas for many Python classes, in the same order as the given classes
+
+    Errors do not stop the batch; they are reported per class instead. Schemas generated are added to the cache of
+    :func:`py_avro_schema.generate` such that later calls for the same class and arguments return immediately.
+
+    With more than 1 worker, the classes are distributed across a pool of worker processes. Worker processes import each
+    class by its import path, so classes must be importable as ``module:QualifiedName``. Classes which are not, for
+    example classes defined inside a function or in ``__main__``, are generated in the calling process instead. Schema
+    classes and type aliases must be registered when the classes' modules are imported, such that worker processes
+    know about them.
+
+    :param py_types:  The Python classes to generate schemas for, or their import paths like ``"shipping.models:Ship"``.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :param workers:   The number of worker processes to use. By default, schemas are generated in the calling process.
+    """
+    generate = py_avro_schema.generate
+    cache_key = generate.cache_key(namespace=namespace, options=options)  # type: ignore
+    results: List[Optional[GenerateResult]] = []
+    remote: List[Tuple[int, Any, str]] = []  # Index, Python type and import path of each class for worker processes
+    for py_type in py_types:
+        if isinstance(py_type, str):
+            try:
+                py_type = _import_type(py_type)
+            except Exception as e:
+                results.append(GenerateResult(py_type, error=e))
+                continue
+        path = _import_path(py_type) if workers and workers > 1 else None
+        cached = _cache_peek(py_type, cache_key) if path else None
+        if cached is not None:
+            results.append(GenerateResult(py_type, schema=cached))
+        elif path:
+            remote.append((len(results), py_type, path))
+            results.append(None)
+        else:  # Looked up in the cache by ``generate`` itself
+            schema, error = _generate(py_type, namespace, options)
+            results.append(GenerateResult(py_type, schema=schema, error=error))
+
+    if remote:
+        assert workers
+        chunk_size = math.ceil(len(remote) / (workers * _CHUNKS_PER_WORKER))
+        chunks = [remote[i : i + chunk_size] for i in range(0, len(remote), chunk_size)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_generate_chunk, [path for _, _, path in chunk], namespace, options) for chunk in chunks
+            ]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    outcomes = future.result()
+                except Exception as e:  # The worker process crashed, for example
+                    outcomes = [(None, e)] * len(chunk)
+                for (index, py_type, _), (schema, error) in zip(chunk, outcomes):
+                    if schema is not None:
+                        generate.cache.set(py_type, cache_key, schema)  # type: ignore
+                    results[index] = GenerateResult(py_type, schema=schema, error=error)
+    return results  # type: ignore
+
+
+def _cache_peek(py_type: Any, cache_key: Any) -> Optional[bytes]:
+    """Return the schema from the cache of :func:`py_avro_schema.generate`, if any, without counting a hit or miss"""
+    try:
+        return py_avro_schema.generate.cache.peek(py_type, cache_key)  # type: ignore
+    except TypeError:  # Unhashable
+        return None
+
+
+def _generate(py_type: Any, namespace: Optional[str], options: Option) -> _Outcome:
+    """Generate a schema, returning any exception instead of raising it"""
+    try:
+        return py_avro_schema.generate(py_type, namespace=namespace, options=options), None
+    except Exception as e:
+        return None, e
+
+
+def _generate_chunk(paths: List[str], namespace: Optional[str], options: Option) -> List[_Outcome]:
+    """Worker process function to import and generate schemas for a chunk of classes"""
+    outcomes = []
+    for path in paths:
+        try:
+            schema, error = _generate(_import_type(path), namespace, options)
+        except Exception as e:
+            schema, error = None, e
+        if error is not None:
+            try:
+                pickle.dumps(error)
+            except Exception:
+                error = RuntimeError(f"{type(error).__name__}: {error}")
+        outcomes.append((schema, error))
+    return outcomes
+
+
+def _import_path(py_type: Any) -> Optional[str]:
+    """Return the import path for a class as ``module:QualifiedName``, if it can be re-imported by that path"""
+    module = getattr(py_type, "__module__", None)
+    qualname = getattr(py_type, "__qualname__", None)
+    if not isinstance(py_type, type) or not module or not qualname:
+        return None  # Generic aliases etc.
+    if module == "__main__" or "<locals>" in qualname:
+        return None
+    return f"{module}:{qualname}"
+
+
+def _import_type(path: str) -> Any:
+    """
+    Import and return a class by its import path
+
+    The path is either formatted as ``module:QualifiedName`` or as a dotted path ``module.ClassName``.
+    """
+    if ":" in path:
+        module_name, qualname = path.split(":", 1)
+    else:
+        module_name, _, qualname = path.rpartition(".")
+    if not module_name or not qualname:
+        raise ValueError(f"'{path}' is not a valid import path for a Python class")
+    obj: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
@@ -0,0 +1,164 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Avro binary encoding of primitive values
+
+See https://avro.apache.org/docs/1.11.1/specification/#binary-encoding. Values are written to a :class:`bytearray`.
+Values are read from a :class:`memoryview` at a given position, returning the value and the position after it, such
+that reading does not copy the buffer. Values can also be skipped, returning the position after them only.
+"""
+
+import struct
+from typing import Tuple
+
+_LONG_MIN, _LONG_MAX = -(1 << 63), (1 << 63) - 1
+_INT_MIN, _INT_MAX = -(1 << 31), (1 << 31) - 1
+
+_FLOAT = struct.Struct("<f")
+_DOUBLE = struct.Struct("<d")
+
+
+def write_long(out: bytearray, value: int) -> None:
+    """Write a 64-bit signed integer as a zig-zag encoded variable-length integer"""
+    if not _LONG_MIN <= value <= _LONG_MAX:
+        raise ValueError(f"{value!r} is out of range for an Avro long")
+    n = (value << 1) ^ (value >> 63)
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def write_int(out: bytearray, value: int) -> None:
+    """Write a 32-bit signed integer as a zig-zag encoded variable-length integer"""
+    if not _INT_MIN <= value <= _INT_MAX:
+        raise ValueError(f"{value!r} is out of range for an Avro int")
+    n = (value << 1) ^ (value >> 31)
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def write_boolean(out: bytearray, value: bool) -> None:
+    """Write a boolean as a single byte"""
+    out.append(1 if value else 0)
+
+
+def write_float(out: bytearray, value: float) -> None:
+    """Write a 32-bit IEEE 754 floating-point number, little-endian"""
+    out += _FLOAT.pack(value)
+
+
+def write_double(out: bytearray, value: float) -> None:
+    """Write a 64-bit IEEE 754 floating-point number, little-endian"""
+    out += _DOUBLE.pack(value)
+
+
+def write_bytes(out: bytearray, value: bytes) -> None:
+    """Write a bytestring prefixed with its length"""
+    write_long(out, len(value))
+    out += value
+
+
+def write_string(out: bytearray, value: str) -> None:
+    """Write a string as UTF-8 encoded bytes prefixed with their length"""
+    encoded = value.encode()
+    write_long(out, len(encoded))
+    out += encoded
+
+
+def write_null(out: bytearray, value: None) -> None:
+    """Write nothing, the encoding of null"""
+
+
+def read_long(buf: memoryview, pos: int) -> Tuple[int, int]:
+    """Read a zig-zag encoded variable-length integer, of type int or long"""
+    byte = buf[pos]
+    pos += 1
+    n = byte & 0x7F
+    shift = 7
+    while byte & 0x80:
+        byte = buf[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        shift += 7
+    return (n >> 1) ^ -(n & 1), pos
+
+
+read_int = read_long
+
+
+def read_boolean(buf: memoryview, pos: int) -> Tuple[bool, int]:
+    """Read a boolean from a single byte"""
+    return buf[pos] != 0, pos + 1
+
+
+def read_float(buf: memoryview, pos: int) -> Tuple[float, int]:
+    """Read a 32-bit IEEE 754 floating-point number, little-endian"""
+    return _FLOAT.unpack_from(buf, pos)[0], pos + 4
+
+
+def read_double(buf: memoryview, pos: int) -> Tuple[float, int]:
+    """Read a 64-bit IEEE 754 floating-point number, little-endian"""
+    return _DOUBLE.unpack_from(buf, pos)[0], pos + 8
+
+
+def read_bytes_view(buf: memoryview, pos: int) -> Tuple[memoryview, int]:
+    """Read a bytestring prefixed with its length, returning a view of the buffer without copying it"""
+    size, pos = read_long(buf, pos)
+    end = pos + size
+    if size < 0 or end > len(buf):
+        raise ValueError(f"Invalid Avro data: {size} bytes to read at position {pos} of {len(buf)}")
+    return buf[pos:end], end
+
+
+def read_bytes(buf: memoryview, pos: int) -> Tuple[bytes, int]:
+    """Read a bytestring prefixed with its length"""
+    view, pos = read_bytes_view(buf, pos)
+    return bytes(view), pos
+
+
+def read_string(buf: memoryview, pos: int) -> Tuple[str, int]:
+    """Read a string from UTF-8 encoded bytes prefixed with their length"""
+    view, pos = read_bytes_view(buf, pos)
+    return str(view, "utf-8"), pos
+
+
+def read_null(buf: memoryview, pos: int) -> Tuple[None, int]:
+    """Read nothing, the encoding of null"""
+    return None, pos
+
+
+def skip_long(buf: memoryview, pos: int) -> int:
+    """Skip a variable-length integer"""
+    while buf[pos] & 0x80:
+        pos += 1
+    return pos + 1
+
+
+def skip_bytes(buf: memoryview, pos: int) -> int:
+    """Skip a bytestring or string prefixed with its length"""
+    size, pos = read_long(buf, pos)
+    end = pos + size
+    if size < 0 or end > len(buf):
+        raise ValueError(f"Invalid Avro data: {size} bytes to skip at position {pos} of {len(buf)}")
+    return end
+
+
+def skip_fixed(size: int, buf: memoryview, pos: int) -> int:
+    """Skip a given number of bytes, the encoding of values of fixed size"""
+    end = pos + size
+    if end > len(buf):
+        raise ValueError(f"Invalid Avro data: {size} bytes to skip at position {pos} of {len(buf)}")
+    return end
@@ -0,0 +1,286 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Caches keyed by Python types
+
+Caches hold weak references to the Python classes they are keyed by such that dynamically created classes can be garbage
+collected. All caches are registered in this module and are invalidated together whenever a global registry (schema
+classes, type aliases) changes.
+"""
+
+import collections
+import functools
+import threading
+import weakref
+from typing import Any, Callable, Hashable, List, NamedTuple, Optional, Tuple, TypeVar
+
+DEFAULT_MAXSIZE = 4096
+
+_MISSING = object()
+
+_ON_CLASS = object()
+"""Marks entries whose value is stored on the class the entry is keyed by"""
+
+_CLASS_ATTR = "__py_avro_cache"
+"""Class attribute holding the values caches store on the class, by cache and key"""
+
+_CACHES: "weakref.WeakSet[TypeCache]" = weakref.WeakSet()
+"""All caches which must be invalidated when a global registry changes"""
+
+F = TypeVar("F", bound=Callable[..., Any])
+_Key = Tuple[Hashable, Hashable]
+
+
+class CacheInfo(NamedTuple):
+    """Cache statistics"""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class TypeCache:
+    """
+    A thread-safe least-recently-used cache keyed by a Python type and further hashable arguments
+
+    Python classes are referenced weakly: once a class is garbage collected, all its entries are dropped from the cache.
+    Other type hints (generic aliases etc.) are referenced strongly and are subject to LRU eviction only.
+
+    Values referencing the class they are keyed by, like schema objects or compiled functions, would keep the class
+    alive nevertheless. Such caches store values on the class itself instead, where only the garbage collector finds the
+    reference cycle. Classes not accepting attributes, like built-in types, are referenced strongly by such values.
+    """
+
+    def __init__(self, maxsize: Optional[int] = DEFAULT_MAXSIZE, *, values_on_class: bool = False):
+        """
+        A thread-safe least-recently-used cache keyed by a Python type and further hashable arguments
+
+        :param maxsize:         Maximum number of entries to keep. Use ``None`` for an unbounded cache.
+        :param values_on_class: Whether to store values on the class they are keyed by, for values referencing it.
+        """
+        self._maxsize = maxsize
+        self._values_on_class = values_on_class
+        self._data: collections.OrderedDict[_Key, Any] = collections.OrderedDict()
+        self._keys_by_ref: dict[weakref.ref, set[_Key]] = {}
+        self._collected: List[weakref.ref] = []  # Appended to by weakref callbacks, processed under the lock
+        self._lock = threading.RLock()
+        self.hits = self.misses = self.evictions = 0
+        _CACHES.add(self)
+
+    def _type_key(self, py_type: Any, create: bool) -> Hashable:
+        """Return the first key item for a type: a weak reference for classes, the type hint itself otherwise"""
+        if not issubclass(type(py_type), type):  # Includes ``types.GenericAlias`` like ``list[int]``
+            return py_type
+        if not create:
+            return weakref.ref(py_type)  # Compares equal to the reference stored in the cache
+        self_ref = weakref.ref(self)
+
+        def _on_collect(ref: weakref.ref) -> None:
+            """Schedule removal of all entries for a garbage collected class"""
+            cache = self_ref()
+            if cache is not None:
+                cache._collected.append(ref)
+
+        return weakref.ref(py_type, _on_collect)
+
+    def _store_on_class(self, py_type: type, key: Hashable, value: Any) -> bool:
+        """Store a value on the class it is keyed by, returning whether the class accepts attributes"""
+        values = vars(py_type).get(_CLASS_ATTR)  # Ignoring values stored on base classes
+        if values is None:
+            values = weakref.WeakKeyDictionary()
+            try:
+                type.__setattr__(py_type, _CLASS_ATTR, values)
+            except (TypeError, AttributeError):  # Built-in and extension types
+                return False
+        values.setdefault(self, {})[key] = value
+        return True
+
+    def _load_from_class(self, full_key: _Key) -> Any:
+        """
+        Return a value stored on the class it is keyed by
+
+        :raises KeyError: If the class has been garbage collected or the value was removed.
+        """
+        type_key, key = full_key
+        py_type = type_key()  # type: ignore
+        if py_type is None:
+            raise KeyError(full_key)
+        return vars(py_type)[_CLASS_ATTR][self][key]
+
+    def _discard(self, full_key: _Key, value: Any) -> None:
+        """Remove a value stored on the class it is keyed by, for an entry removed from the cache"""
+        if value is not _ON_CLASS:
+            return
+        type_key, key = full_key
+        py_type = type_key()  # type: ignore
+        values = vars(py_type).get(_CLASS_ATTR) if py_type is not None else None
+        if values is not None:
+            values.get(self, {}).pop(key, None)
+
+    def _purge_collected(self) -> None:
+        """Drop entries keyed by classes which have been garbage collected"""
+        while self._collected:
+            ref = self._collected.pop()
+            for key in self._keys_by_ref.pop(ref, ()):
+                self._data.pop(key, None)
+
+    def get(self, py_type: Any, key: Hashable = (), default: Any = None) -> Any:
+        """
+        Return the cached value for a given type and key and mark the entry as most recently used
+
+        :raises TypeError: If the type or key is not hashable.
+        """
+        full_key: _Key = (self._type_key(py_type, create=False), key)
+        with self._lock:
+            self._purge_collected()
+            try:
+                value = self._data[full_key]
+                if value is _ON_CLASS:
+                    value = self._load_from_class(full_key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(full_key)
+            self.hits += 1
+            return value
+
+    def peek(self, py_type: Any, key: Hashable = (), default: Any = None) -> Any:
+        """
+        Return the cached value for a given type and key, without marking the entry as used or counting a hit or miss
+
+        :raises TypeError: If the type or key is not hashable.
+        """
+        full_key: _Key = (self._type_key(py_type, create=False), key)
+        with self._lock:
+            self._purge_collected()
+            value = self._data.get(full_key, default)
+            if value is not _ON_CLASS:
+                return value
+            try:
+                return self._load_from_class(full_key)
+            except KeyError:
+                return default
+
+    def set(self, py_type: Any, key: Hashable, value: Any) -> None:
+        """
+        Store a value for a given type and key, evicting the least recently used entry if the cache is full
+
+        :raises TypeError: If the type or key is not hashable.
+        """
+        type_key = self._type_key(py_type, create=True)
+        full_key: _Key = (type_key, key)
+        with self._lock:
+            self._purge_collected()
+            if self._maxsize is not None and self._maxsize <= 0:
+                return
+            on_class = self._values_on_class and isinstance(type_key, weakref.ref)
+            if on_class and self._store_on_class(py_type, key, value):
+                value = _ON_CLASS
+            else:
+                self._discard(full_key, self._data.get(full_key))
+            self._data[full_key] = value
+            self._data.move_to_end(full_key)
+            if isinstance(type_key, weakref.ref):
+                self._keys_by_ref.setdefault(type_key, set()).add(full_key)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is within its maximum size"""
+        while self._maxsize is not None and len(self._data) > self._maxsize:
+            (type_key, key), value = self._data.popitem(last=False)
+            self._discard((type_key, key), value)
+            if isinstance(type_key, weakref.ref):
+                keys = self._keys_by_ref.get(type_key)
+                if keys is not None:
+                    keys.discard((type_key, key))
+                    if not keys:
+                        del self._keys_by_ref[type_key]
+            self.evictions += 1
+
+    def resize(self, maxsize: Optional[int]) -> None:
+        """Change the maximum number of entries, evicting entries if required"""
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics"""
+        with self._lock:
+            for full_key, value in self._data.items():
+                self._discard(full_key, value)
+            self._data.clear()
+            self._keys_by_ref.clear()
+            self._collected.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Return the cache statistics"""
+        with self._lock:
+            self._purge_collected()
+            return CacheInfo(self.hits, self.misses, self.evictions, self._maxsize, len(self._data))
+
+    def __len__(self) -> int:
+        """Number of entries in the cache"""
+        return self.info().currsize
+
+
+def invalidate_caches() -> None:
+    """Clear all caches, for example because a global registry has changed"""
+    for cache in list(_CACHES):
+        cache.clear()
+
+
+def cached(maxsize: Optional[int] = DEFAULT_MAXSIZE, *, values_on_class: bool = False) -> Callable[[F], F]:
+    """
+    Decorator to cache a function taking a Python type as its first argument
+
+    The decorated function exposes ``cache_info()``, ``cache_clear()`` and ``cache_resize(maxsize)`` like
+    :func:`functools.lru_cache`. Calls with unhashable arguments are not cached. Omitted keyword-only arguments share
+    cache entries with calls passing their default values explicitly.
+
+    :param maxsize:         Maximum number of entries to keep. Use ``None`` for an unbounded cache.
+    :param values_on_class: Whether to store results on the class they are keyed by, for results referencing it.
+    """
+
+    def _decorator(func: F) -> F:
+        """Wrap the function with a new cache"""
+        cache = TypeCache(maxsize, values_on_class=values_on_class)
+        kwdefaults = func.__kwdefaults__ or {}
+
+        def _call_key(*args: Any, **kwargs: Any) -> Hashable:
+            """Return the cache key for the arguments after the Python type, including keyword-only defaults"""
+            return args, tuple(sorted({**kwdefaults, **kwargs}.items()))
+
+        @functools.wraps(func)
+        def _wrapper(py_type: Any, *args: Any, **kwargs: Any) -> Any:
+            """Return the cached result, calling the function on a cache miss"""
+            key = _call_key(*args, **kwargs)
+            try:
+                value = cache.get(py_type, key, _MISSING)
+            except TypeError:  # Unhashable arguments
+                return func(py_type, *args, **kwargs)
+            if value is _MISSING:
+                value = func(py_type, *args, **kwargs)
+                cache.set(py_type, key, value)
+            return value
+
+        _wrapper.cache = cache  # type: ignore
+        _wrapper.cache_info = cache.info  # type: ignore
+        _wrapper.cache_clear = cache.clear  # type: ignore
+        _wrapper.cache_resize = cache.resize  # type: ignore
+        _wrapper.cache_key = _call_key  # type: ignore
+        return _wrapper  # type: ignore
+
+    return _decorator
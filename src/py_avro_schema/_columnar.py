@@ -0,0 +1,646 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Columnar decoding and encoding of records in Avro binary encoding
+
+Fields of many records are decoded straight into one array per field, without building a Python object per record.
+Numbers, booleans, timestamps and dates are stored in :class:`array.array` objects, or NumPy arrays if NumPy is
+installed, strings and bytes as their concatenated encoded values with offsets, and nullable fields have a validity
+mask. Fields of nested records are flattened into columns named by their dotted path.
+
+Conversely, many records are encoded one field at a time: the values of a field are extracted from all records at once,
+converted and checked in bulk, and encoded by a single function per field rather than per record and field.
+"""
+
+import array
+import functools
+import importlib
+import itertools
+import os
+import struct
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from py_avro_schema import _binary, _decoder, _encoder
+from py_avro_schema._alias import is_opaque
+from py_avro_schema._cache import cached
+from py_avro_schema._encoder import _Compiler, record_annotations, record_attributes
+from py_avro_schema._fixed_layout import _unwrap, struct_codec
+from py_avro_schema._options import Option
+from py_avro_schema._schemas import (
+    DataclassSchema,
+    DateSchema,
+    DateTimeSchema,
+    PlainClassSchema,
+    PrimitiveSchema,
+    RecordSchema,
+    Schema,
+    StrSubclassSchema,
+    TypeNotSupportedError,
+    UnionSchema,
+    root_schema_obj,
+)
+
+Appender = Callable[[memoryview, int], int]
+"""Function reading a value from a buffer at a position into a column, returning the next position"""
+
+_TYPECODES = {
+    "boolean": "B",
+    "int": "q",
+    "long": "q",
+    "float": "f",
+    "double": "d",
+    "timestamp": "q",
+    "date": "q",
+}
+"""Array type codes of the columns of each kind of field"""
+
+_NUMPY_DTYPES = {
+    "boolean": "bool",
+    "int": "int64",
+    "long": "int64",
+    "float": "float32",
+    "double": "float64",
+}
+
+
+class Column(NamedTuple):
+    """
+    The decoded values of a record field
+
+    Without NumPy, numbers, booleans, timestamps and dates are stored in an :class:`array.array` of 64-bit integers
+    (timestamps as microseconds, or milliseconds with ``Option.MILLISECONDS``, and dates as days since the Unix epoch),
+    bytes for booleans and floats or doubles. With NumPy, columns are NumPy arrays of the corresponding types, with
+    timestamps and dates as ``datetime64`` values. Other fields are decoded into a list of Python values.
+    """
+
+    #: The values, or for strings and bytes the concatenated encoded values
+    values: Any
+    #: For strings and bytes, the position of each value in ``values`` followed by the end of the last value
+    offsets: Any = None
+    #: For nullable fields, whether each value is not null. Null values are stored as zero or an empty string.
+    validity: Any = None
+
+
+class _Field(NamedTuple):
+    """A step of reading a record: a field into a column, or skipped if it has no column name"""
+
+    name: Optional[str]
+    kind: str
+    read: _decoder.Reader
+    #: For nullable fields, the union branch indexes of null and of the values; otherwise ``-1``
+    null_index: int = -1
+    value_index: int = -1
+    #: For timestamps and dates, the ``datetime64`` unit
+    unit: str = ""
+
+
+def decode_columns(
+    source: Union[str, os.PathLike, Iterable[_decoder.Data]],
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+    use_numpy: Optional[bool] = None,
+) -> Dict[str, Column]:
+    """
+    Decode many records into columns of field values, without building an instance of the Python type per record
+
+    Numbers, booleans, timestamps and dates are decoded into typed arrays, strings and bytes into their concatenated
+    encoded values with the offsets of each value, and nullable fields of these types get a validity mask. Fields of
+    nested records are flattened into columns named by their dotted path, e.g. ``"owner.name"``. Other fields, for
+    example arrays or enums, are decoded into lists of Python values. See :class:`Column`.
+
+    Example::
+
+        columns = py_avro_schema.decode_columns("ships.avro", Ship)
+        total = sum(columns["tonnage"].values)
+
+    :param source:    The path of an Avro container file, or an iterable of Avro binary encoded records.
+    :param py_type:   The Python class of the records, a dataclass, Pydantic model, plain class or TypedDict.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :param use_numpy: Whether to return NumPy arrays instead of :class:`array.array` objects. Defaults to whether NumPy
+                      is installed.
+    :raises TypeNotSupportedError: If the type is not a record type or values of a type used by the schema cannot be
+                                   decoded.
+    :raises ValueError: If the data is invalid, or the file is not a container file written with the type's schema.
+    """
+    fields = _fields(py_type, namespace=namespace, options=options)
+    columns: Dict[str, Column] = {}
+    appenders = [_appender(field, columns) for field in fields]
+
+    def append_record(buf: memoryview, pos: int) -> int:
+        """Read a record into the columns"""
+        for append in appenders:
+            pos = append(buf, pos)
+        return pos
+
+    if isinstance(source, (str, os.PathLike)):
+        from py_avro_schema import (
+            container,  # Imported on use, since the container module imports this module
+        )
+
+        with container.MappedReader(source, py_type, namespace=namespace, options=options) as reader:
+            for i, block in enumerate(reader.index):
+                _decode_block(append_record, block.record_count, reader.block_data(i))
+    else:
+        for data in source:
+            _decode_block(append_record, 1, data)
+
+    if use_numpy is None or use_numpy:
+        try:
+            numpy = importlib.import_module("numpy")  # Optional dependency, imported on use only
+        except ImportError:
+            if use_numpy:
+                raise
+        else:
+            columns = {name: _to_numpy(numpy, field, columns[name]) for name, field in _named(fields).items()}
+    return columns
+
+
+def _decode_block(append_record: Appender, count: int, data: _decoder.Data) -> None:
+    """Read a given number of records from some data, which must be read entirely"""
+    buf = memoryview(data)
+    if buf.format != "B":
+        buf = buf.cast("B")
+    pos = 0
+    try:
+        for _ in range(count):
+            pos = append_record(buf, pos)
+    except (IndexError, struct.error):
+        raise ValueError("Invalid Avro data: unexpected end of data") from None
+    if pos != len(buf):
+        raise ValueError(f"Invalid Avro data: {len(buf) - pos} bytes left after decoding records")
+
+
+def _named(fields: List[_Field]) -> Dict[str, _Field]:
+    """Return the fields read into columns by column name"""
+    return {field.name: field for field in fields if field.name is not None}
+
+
+@cached()
+def _fields(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> List[_Field]:
+    """Return the steps of reading a record into columns, with nested records flattened"""
+    schema_obj = _unwrap(root_schema_obj(py_type, namespace=namespace, options=options))
+    if not isinstance(schema_obj, RecordSchema):
+        raise TypeNotSupportedError(f"Cannot decode {py_type} into columns: only record types are supported")
+    compiler = _Compiler(_decoder._compile)
+    compiler.compile(schema_obj)  # Registers all named schemas, for fields decoded into Python values
+    fields: List[_Field] = []
+    _add_record_fields(fields, schema_obj, "", compiler)
+    compiler.resolve_forward_refs()
+    return fields
+
+
+def _add_record_fields(fields: List[_Field], schema_obj: RecordSchema, prefix: str, compiler: _Compiler) -> None:
+    """Add the steps of reading a record's fields, prefixing column names with the names of enclosing records"""
+    for attr, field in zip(record_attributes(schema_obj), schema_obj.record_fields):
+        name = f"{prefix}{attr}"
+        field_schema = _unwrap(field.schema)
+        kind = _kind(field_schema)
+        if kind is not None:
+            fields.append(_Field(name, kind, _reader(kind, field_schema), unit=_unit(kind, field_schema)))
+            continue
+        if isinstance(field_schema, RecordSchema):
+            _add_record_fields(fields, field_schema, f"{name}.", compiler)
+            continue
+        nullable = _nullable_field(name, field_schema) if isinstance(field_schema, UnionSchema) else None
+        if nullable is not None:
+            fields.append(nullable)
+            continue
+        fields.append(_Field(name, "object", compiler.compile(field.schema)))
+    if Option.ADD_REFERENCE_ID in schema_obj.options:
+        fields.append(_Field(None, "skip", _decoder._read_reference_id))
+    if Option.ADD_RUNTIME_TYPE_FIELD in schema_obj.options and isinstance(
+        schema_obj, (DataclassSchema, PlainClassSchema)
+    ):
+        fields.append(_Field(None, "skip", _decoder._read_runtime_type))
+
+
+class _NullableItem(NamedTuple):
+    """The non-null item of a union of null and a type with a column kind"""
+
+    kind: str
+    schema_obj: Schema
+    null_index: int
+    value_index: int
+
+
+def _nullable_item(schema_obj: UnionSchema) -> Optional[_NullableItem]:
+    """Return the non-null item of a union of null and a type with a column kind, or None for other unions"""
+    item_schemas = [_unwrap(item_schema) for item_schema in schema_obj.item_schemas]
+    kinds = [_kind(item_schema) for item_schema in item_schemas]
+    indexes = schema_obj.branch_indexes()
+    if len(kinds) != 2 or "null" not in kinds or None in kinds or len(set(indexes)) != 2:
+        return None
+    null_index = kinds.index("null")
+    kind = kinds[1 - null_index]
+    assert kind is not None
+    return _NullableItem(kind, item_schemas[1 - null_index], indexes[null_index], indexes[1 - null_index])
+
+
+def _nullable_field(name: str, schema_obj: UnionSchema) -> Optional[_Field]:
+    """Return the step of reading a union of null and a type with a column kind, or None for other unions"""
+    item = _nullable_item(schema_obj)
+    if item is None:
+        return None
+    return _Field(
+        name,
+        item.kind,
+        _reader(item.kind, item.schema_obj),
+        item.null_index,
+        item.value_index,
+        _unit(item.kind, item.schema_obj),
+    )
+
+
+def _kind(schema_obj: Schema) -> Optional[str]:
+    """Return the kind of column of a schema object, or None if values are decoded into Python values"""
+    if isinstance(schema_obj, DateTimeSchema):
+        return "timestamp"
+    if isinstance(schema_obj, DateSchema):
+        return "date"
+    if isinstance(schema_obj, (PrimitiveSchema, StrSubclassSchema)):
+        return _decoder._primitive_type(schema_obj)
+    return None
+
+
+def _reader(kind: str, schema_obj: Schema) -> _decoder.Reader:
+    """Return the function reading the raw values of a column"""
+    if kind in ("string", "bytes"):
+        return _binary.read_bytes_view
+    return _decoder._PRIMITIVE_READERS[_decoder._primitive_type(schema_obj)]
+
+
+def _unit(kind: str, schema_obj: Schema) -> str:
+    """Return the ``datetime64`` unit of timestamps or dates"""
+    if kind == "timestamp":
+        return "ms" if Option.MILLISECONDS in schema_obj.options else "us"
+    return "D" if kind == "date" else ""
+
+
+def _appender(field: _Field, columns: Dict[str, Column]) -> Appender:
+    """Return the function reading a field into its column, creating the column"""
+    read = field.read
+    if field.name is None:
+
+        def skip(buf: memoryview, pos: int) -> int:
+            """Read a value without storing it"""
+            return read(buf, pos)[1]
+
+        return skip
+
+    append: Appender
+    validity = array.array("B") if field.null_index >= 0 else None
+    if field.kind in ("string", "bytes"):
+        data = bytearray()
+        offsets = array.array("q", [0])
+        columns[field.name] = Column(data, offsets, validity)
+        extend, append_offset = data.extend, offsets.append
+
+        def append_bytes(buf: memoryview, pos: int) -> int:
+            """Read a string or bytestring into the concatenated values"""
+            value, pos = read(buf, pos)
+            extend(value)
+            append_offset(len(data))
+            return pos
+
+        def append_empty() -> None:
+            """Store an empty value for a null"""
+            append_offset(len(data))
+
+        append, append_null = append_bytes, append_empty
+    else:
+        values: Any = array.array(_TYPECODES[field.kind]) if field.kind in _TYPECODES else []
+        columns[field.name] = Column(values, None, validity)
+        append_value = values.append
+
+        def append_read(buf: memoryview, pos: int) -> int:
+            """Read a value into the values"""
+            value, pos = read(buf, pos)
+            append_value(value)
+            return pos
+
+        def append_zero() -> None:
+            """Store zero for a null"""
+            append_value(0)
+
+        append, append_null = append_read, append_zero
+
+    if validity is None:
+        return append
+    read_long, append_valid = _binary.read_long, validity.append
+    null_index, value_index = field.null_index, field.value_index
+
+    def append_nullable(buf: memoryview, pos: int) -> int:
+        """Read a nullable value, storing whether it is not null"""
+        index, pos = read_long(buf, pos)
+        if index == value_index:
+            append_valid(1)
+            return append(buf, pos)
+        if index != null_index:
+            raise ValueError(f"Invalid Avro data: {index} is not a branch index")
+        append_valid(0)
+        append_null()
+        return pos
+
+    return append_nullable
+
+
+def _to_numpy(numpy: Any, field: _Field, column: Column) -> Column:
+    """Return a column with NumPy arrays, sharing the memory of the arrays"""
+    validity = None if column.validity is None else numpy.frombuffer(column.validity, dtype="bool")
+    if field.kind in ("string", "bytes"):
+        return Column(
+            numpy.frombuffer(column.values, dtype="uint8"), numpy.frombuffer(column.offsets, dtype="int64"), validity
+        )
+    if field.kind in _NUMPY_DTYPES:
+        return Column(numpy.frombuffer(column.values, dtype=_NUMPY_DTYPES[field.kind]), None, validity)
+    if field.kind in ("timestamp", "date"):
+        return Column(numpy.frombuffer(column.values, dtype=f"datetime64[{field.unit}]"), None, validity)
+    return Column(column.values, None, validity)
+
+
+ColumnEncoder = Callable[[List[Any]], List[List[Any]]]
+"""
+Function encoding the values of a column, returning lists of encoded parts, one item per value
+
+A value is encoded as its parts in all lists, in order.
+"""
+
+_VARINTS = [bytes((n,)) for n in range(0x80)] + [bytes(((n & 0x7F) | 0x80, n >> 7)) for n in range(0x80, 0x4000)]
+"""Variable-length encodings of integers fitting in one or two bytes, by integer"""
+
+_CONTINUED = [bytes(((n & 0x7F) | 0x80, (n >> 7) | 0x80)) for n in range(0x4000)]
+"""Variable-length encodings of the 14 lowest bits of integers larger than 14 bits, by the value of these bits"""
+
+_BOOLEANS = (b"\x00", b"\x01")
+
+
+class EncodedBatch(NamedTuple):
+    """Many records in Avro binary encoding"""
+
+    #: The concatenated encoded records
+    data: bytes
+    #: The position of each record in ``data`` followed by the end of the last record
+    offsets: "array.array[int]"
+
+
+def encode_batch(
+    instances: Iterable[Any],
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> EncodedBatch:
+    """
+    Encode many instances of a record type in Avro binary encoding, one field at a time
+
+    The values of each field are extracted from all instances at once, converted and checked in bulk, for example all
+    timestamps of a field at once, and encoded by a single function per field. The encoded records are then joined into
+    a single buffer. This is faster than encoding the instances one by one for large batches of records with many
+    fields of primitive types, timestamps or dates. Fields of other types are encoded value by value. Records with a
+    fixed layout are packed using a :class:`struct.Struct`, see :func:`py_avro_schema.struct_codec`. To write a batch as
+    blocks of an Avro container file, use :meth:`py_avro_schema.container.Writer.write_batch`.
+
+    Example::
+
+        batch = py_avro_schema.encode_batch(ships, Ship)
+        second_ship = batch.data[batch.offsets[1] : batch.offsets[2]]
+
+    :param instances: The instances to encode.
+    :param py_type:   The Python class of the instances, a dataclass, Pydantic model, plain class or TypedDict.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :raises TypeNotSupportedError: If the type is not a record type or values of a type used by the schema cannot be
+                                   encoded.
+    """
+    values = instances if isinstance(instances, list) else list(instances)
+    codec = struct_codec(py_type, namespace=namespace, options=options)
+    if codec is not None:  # Records with a fixed layout are packed into a single buffer
+        return EncodedBatch(
+            bytes(codec.encode_many(values)), array.array("q", range(0, codec.size * len(values) + 1, codec.size))
+        )
+    parts = _batch_encoder(py_type, namespace=namespace, options=options)(values) or [[b""] * len(values)]
+    sizes = map(sum, zip(*[list(map(len, part)) for part in parts]))
+    offsets = array.array("q", itertools.accumulate(sizes, initial=0))
+    return EncodedBatch(b"".join(itertools.chain.from_iterable(zip(*parts))), offsets)
+
+
+@cached()
+def _batch_encoder(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> ColumnEncoder:
+    """Return the function encoding a list of instances of a record type into lists of encoded parts"""
+    schema_obj = _unwrap(root_schema_obj(py_type, namespace=namespace, options=options))
+    if not isinstance(schema_obj, RecordSchema):
+        raise TypeNotSupportedError(f"Cannot encode {py_type} in batches: only record types are supported")
+    compiler = _Compiler()
+    compiler.compile(schema_obj)  # Registers all named schemas, for fields encoded value by value
+    encode = _record_encoder(schema_obj, compiler)
+    compiler.resolve_forward_refs()
+    return encode
+
+
+def _record_encoder(schema_obj: RecordSchema, compiler: _Compiler) -> ColumnEncoder:
+    """Return the function encoding the instances of a record type, one field at a time"""
+    fields = []
+    for attr, annotation, field in zip(
+        record_attributes(schema_obj), record_annotations(schema_obj), schema_obj.record_fields
+    ):
+        if is_opaque(annotation):
+            encode = _writer_encoder(_encoder._write_opaque)
+        else:
+            encode = _column_encoder(field.schema, compiler)
+        fields.append((_encoder._field_getter(schema_obj, attr, field.schema), encode))
+    # Reference ids are not tracked, hence written as nulls
+    reference_id = Option.ADD_REFERENCE_ID in schema_obj.options
+    encode_runtime_types = None
+    if Option.ADD_RUNTIME_TYPE_FIELD in schema_obj.options and isinstance(
+        schema_obj, (DataclassSchema, PlainClassSchema)
+    ):
+        encode_runtime_types = _writer_encoder(_encoder.write_runtime_type)
+
+    def encode_records(values: List[Any]) -> List[List[Any]]:
+        """Encode the fields of records, extracting each field from all records at once"""
+        parts: List[List[Any]] = []
+        for get, encode in fields:
+            parts += encode(list(map(get, values)))
+        if reference_id:
+            parts.append([b"\x00"] * len(values))
+        if encode_runtime_types is not None:
+            parts += encode_runtime_types(values)
+        return parts
+
+    return encode_records
+
+
+def _column_encoder(schema_obj: Schema, compiler: _Compiler) -> ColumnEncoder:
+    """Return the function encoding the values of a column"""
+    schema_obj = _unwrap(schema_obj)
+    kind = _kind(schema_obj)
+    if kind is not None:
+        return _kind_encoder(kind, schema_obj)
+    if isinstance(schema_obj, RecordSchema):
+        return _record_encoder(schema_obj, compiler)
+    item = _nullable_item(schema_obj) if isinstance(schema_obj, UnionSchema) else None
+    if item is not None:
+        null_prefix, value_prefix = bytearray(), bytearray()
+        _binary.write_long(null_prefix, item.null_index)
+        _binary.write_long(value_prefix, item.value_index)
+        return functools.partial(
+            _encode_nullable, _kind_encoder(item.kind, item.schema_obj), bytes(null_prefix), bytes(value_prefix)
+        )
+    return _writer_encoder(compiler.compile(schema_obj))
+
+
+def _kind_encoder(kind: str, schema_obj: Schema) -> ColumnEncoder:
+    """Return the function encoding the values of a column of a given kind"""
+    if kind == "timestamp":
+        unit = _encoder._MILLISECOND if Option.MILLISECONDS in schema_obj.options else _encoder._MICROSECOND
+        return functools.partial(_encode_datetimes, unit)
+    return _KIND_ENCODERS[kind]
+
+
+def _encode_longs(
+    values: List[int], name: str = "long", low: int = _binary._LONG_MIN, high: int = _binary._LONG_MAX
+) -> List[List[Any]]:
+    """Encode integers as zig-zag encoded variable-length integers, checking their range at once"""
+    if values and not (low <= min(values) and max(values) <= high):
+        value = next(value for value in values if not low <= value <= high)
+        raise ValueError(f"{value!r} is out of range for an Avro {name}")
+    varints, size = _VARINTS, len(_VARINTS)
+    return [[varints[n] if (n := (value << 1) ^ (value >> 63)) < size else _varint(n) for value in values]]
+
+
+def _encode_ints(values: List[int]) -> List[List[Any]]:
+    """Encode 32-bit integers as zig-zag encoded variable-length integers, checking their range at once"""
+    return _encode_longs(values, "int", _binary._INT_MIN, _binary._INT_MAX)
+
+
+def _varints(numbers: List[int]) -> List[bytes]:
+    """Return the variable-length encodings of non-negative integers"""
+    varints, size = _VARINTS, len(_VARINTS)
+    return [varints[n] if n < size else _varint(n) for n in numbers]
+
+
+def _varint(n: int) -> bytes:
+    """Return the variable-length encoding of a non-negative integer, looking up 14 bits at a time"""
+    varints, continued = _VARINTS, _CONTINUED
+    if n < 0x4000:
+        return varints[n]
+    if n < 0x1000_0000:
+        return continued[n & 0x3FFF] + varints[n >> 14]
+    if n < 0x400_0000_0000:
+        return continued[n & 0x3FFF] + continued[(n >> 14) & 0x3FFF] + varints[n >> 28]
+    if n < 0x100_0000_0000_0000:  # For example timestamps in microseconds
+        return continued[n & 0x3FFF] + continued[(n >> 14) & 0x3FFF] + continued[(n >> 28) & 0x3FFF] + varints[n >> 42]
+    parts = []
+    while n >= 0x4000:
+        parts.append(continued[n & 0x3FFF])
+        n >>= 14
+    parts.append(varints[n])
+    return b"".join(parts)
+
+
+def _encode_booleans(values: List[bool]) -> List[List[Any]]:
+    """Encode booleans as single bytes"""
+    return [[_BOOLEANS[1 if value else 0] for value in values]]
+
+
+def _encode_floats(values: List[float]) -> List[List[Any]]:
+    """Encode 32-bit floating-point numbers"""
+    return [list(map(_binary._FLOAT.pack, values))]
+
+
+def _encode_doubles(values: List[float]) -> List[List[Any]]:
+    """Encode 64-bit floating-point numbers"""
+    return [list(map(_binary._DOUBLE.pack, values))]
+
+
+def _encode_bytes(values: List[bytes]) -> List[List[Any]]:
+    """Encode bytestrings as their lengths followed by the bytestrings"""
+    return [_varints([len(value) << 1 for value in values]), values]
+
+
+def _encode_strings(values: List[str]) -> List[List[Any]]:
+    """Encode strings as the lengths of their UTF-8 encoding followed by the encoded strings"""
+    return _encode_bytes(list(map(str.encode, values)))
+
+
+def _encode_nulls(values: List[None]) -> List[List[Any]]:
+    """Encode nulls, as nothing"""
+    return []
+
+
+def _encode_datetimes(unit: Any, values: List[Any]) -> List[List[Any]]:
+    """Encode datetimes as the number of milli- or microseconds since the Unix epoch, naive datetimes being UTC"""
+    epoch, epoch_utc = _encoder._EPOCH, _encoder._EPOCH_UTC
+    return _encode_longs([(value - (epoch if value.tzinfo is None else epoch_utc)) // unit for value in values])
+
+
+def _encode_dates(values: List[Any]) -> List[List[Any]]:
+    """Encode dates as the number of days since the Unix epoch"""
+    epoch = _encoder._EPOCH_ORDINAL
+    return _encode_ints([value.toordinal() - epoch for value in values])
+
+
+_KIND_ENCODERS: Dict[str, ColumnEncoder] = {
+    "null": _encode_nulls,
+    "boolean": _encode_booleans,
+    "int": _encode_ints,
+    "long": _encode_longs,
+    "float": _encode_floats,
+    "double": _encode_doubles,
+    "bytes": _encode_bytes,
+    "string": _encode_strings,
+    "date": _encode_dates,
+}
+
+
+def _encode_nullable(
+    encode: ColumnEncoder, null_prefix: bytes, value_prefix: bytes, values: List[Any]
+) -> List[List[Any]]:
+    """Encode the values of a union of null and another type, encoding the values which are not null at once"""
+    present = [value for value in values if value is not None]
+    parts = encode(present)
+    if len(present) == len(values):
+        return [[value_prefix] * len(values), *parts]
+    expanded = [[null_prefix if value is None else value_prefix for value in values]]
+    for part in parts:
+        items = iter(part)
+        expanded.append([b"" if value is None else next(items) for value in values])
+    return expanded
+
+
+def _writer_encoder(write: _encoder.Writer) -> ColumnEncoder:
+    """Return the function encoding the values of a column one by one using a writer"""
+
+    def encode_values(values: List[Any]) -> List[List[Any]]:
+        """Encode values one by one"""
+        parts = []
+        for value in values:
+            out = bytearray()
+            write(out, value)
+            parts.append(out)
+        return [parts]
+
+    return encode_values
@@ -0,0 +1,611 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Avro binary decoders compiled from the schema objects of Python types
+
+Like an encoder, a decoder is compiled once per Python type from the tree of schema objects the Avro schema is generated
+from. Records are read into instances of the dataclasses, Pydantic models, plain classes or TypedDicts the schema was
+generated for, without building intermediate dictionaries. Data is read from a :class:`memoryview`, such that the
+encoded data is not copied.
+"""
+
+import collections
+import datetime
+import decimal
+import functools
+import inspect
+import struct
+import uuid
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import orjson
+
+from py_avro_schema import _binary
+from py_avro_schema._alias import is_opaque
+from py_avro_schema._cache import cached
+from py_avro_schema._encoder import (
+    _Compiler,
+    missing_marker,
+    record_annotations,
+    record_attributes,
+)
+from py_avro_schema._options import Option
+from py_avro_schema._schemas import (
+    TD_MISSING_MARKER,
+    DataclassSchema,
+    DateSchema,
+    DateTimeSchema,
+    DecimalSchema,
+    DictSchema,
+    EnumSchema,
+    FinalSchema,
+    ForwardSchema,
+    LiteralSchema,
+    NamesRegistry,
+    PlainClassSchema,
+    PrimitiveSchema,
+    PydanticSchema,
+    RecordSchema,
+    Schema,
+    SequenceSchema,
+    SetSchema,
+    StrSubclassSchema,
+    TimeDeltaSchema,
+    TimeSchema,
+    TypeAsJSONSchema,
+    TypedDictSchema,
+    TypeNotSupportedError,
+    UnionSchema,
+    UUIDSchema,
+    _type_from_annotated,
+    root_schema_obj,
+)
+
+Reader = Callable[[memoryview, int], Tuple[Any, int]]
+"""Function reading a Python value in Avro binary encoding from a buffer at a position, returning the next position"""
+
+Data = Union[bytes, bytearray, memoryview]
+"""Avro binary encoded data"""
+
+_PRIMITIVE_READERS: Dict[str, Reader] = {
+    "null": _binary.read_null,
+    "boolean": _binary.read_boolean,
+    "int": _binary.read_int,
+    "long": _binary.read_long,
+    "float": _binary.read_float,
+    "double": _binary.read_double,
+    "bytes": _binary.read_bytes,
+    "string": _binary.read_string,
+}
+
+_EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_MILLISECOND = datetime.timedelta(milliseconds=1)
+_DURATION = struct.Struct("<III")
+_TD_MISSING_BYTES = TD_MISSING_MARKER.encode()
+
+
+@cached(values_on_class=True)
+def decoder(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Callable[[Data], Any]:
+    """
+    Return a function decoding instances of a given Python type from Avro binary encoding
+
+    The decoder is compiled from the same schema objects as the schema returned by :func:`py_avro_schema.generate` with
+    the same arguments, and is cached. It reads data written with that exact schema. Records are built directly as
+    instances of their Python classes: dataclasses through their constructor, Pydantic models without validating them
+    again, plain classes without calling their constructor and TypedDicts as dictionaries without keys marked missing.
+
+    :param py_type:   The Python class to decode instances of.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :raises TypeNotSupportedError: If values of a type used by the schema cannot be decoded.
+    """
+    return whole_data_decoder(reader(py_type, namespace=namespace, options=options))
+
+
+def whole_data_decoder(read: Reader) -> Callable[[Data], Any]:
+    """Return a function decoding a value using a reader, checking that the data is read entirely"""
+
+    def decode(data: Data) -> Any:
+        """Return the value encoded in some data, which must be read entirely"""
+        buf = memoryview(data)
+        if buf.format != "B":
+            buf = buf.cast("B")
+        try:
+            value, pos = read(buf, 0)
+        except (IndexError, struct.error):
+            raise ValueError("Invalid Avro data: unexpected end of data") from None
+        if pos != len(buf):
+            raise ValueError(f"Invalid Avro data: {len(buf) - pos} bytes left after decoding a value")
+        return value
+
+    return decode
+
+
+@cached(values_on_class=True)
+def reader(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Reader:
+    """
+    Return a function reading instances of a given Python type from a buffer in Avro binary encoding
+
+    This is like :func:`decoder`, but reading a value from a :class:`memoryview` at a given position and returning the
+    value and the position after it, for example to decode many values from a single buffer.
+    """
+    compiler = _Compiler(_compile)
+    read = compiler.compile(root_schema_obj(py_type, namespace=namespace, options=options))
+    compiler.resolve_forward_refs()
+    return read
+
+
+@functools.singledispatch
+def _compile(schema_obj: Schema, compiler: _Compiler) -> Reader:
+    """
+    Return the reader for a schema object
+
+    Schema classes without a dedicated reader are supported if their schema is a primitive Avro type, in which case
+    values are read as is.
+    """
+    data = schema_obj.data(names=NamesRegistry())
+    type_ = data.get("type") if isinstance(data, dict) else data
+    if isinstance(type_, str) and type_ in _PRIMITIVE_READERS:
+        return _PRIMITIVE_READERS[type_]
+    raise TypeNotSupportedError(f"Cannot decode values for schema class {type(schema_obj).__name__}")
+
+
+def _primitive_type(schema_obj: Schema) -> str:
+    """Return the Avro primitive type a schema object is rendered as, e.g. ``"long"`` for a timestamp"""
+    data: Any = schema_obj.data(names=NamesRegistry())
+    return data["type"] if isinstance(data, dict) else data
+
+
+@_compile.register
+def _(schema_obj: PrimitiveSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a primitive Avro type"""
+    return _PRIMITIVE_READERS[_primitive_type(schema_obj)]
+
+
+@_compile.register
+def _(schema_obj: StrSubclassSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a ``str`` subclass, read as an Avro string"""
+    py_class = _type_from_annotated(schema_obj.py_type)
+    read_string = _binary.read_string
+
+    def read_str_subclass(buf: memoryview, pos: int) -> Tuple[str, int]:
+        """Read a string as an instance of a subclass of str"""
+        value, pos = read_string(buf, pos)
+        return py_class(value), pos
+
+    return read_str_subclass
+
+
+@_compile.register
+def _(schema_obj: LiteralSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a ``Literal``, using the schema of its values"""
+    return compiler.compile(schema_obj.literal_value_schema)
+
+
+@_compile.register
+def _(schema_obj: FinalSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a ``Final`` type, using the schema of the wrapped type"""
+    return compiler.compile(schema_obj.real_schema)
+
+
+@_compile.register
+def _(schema_obj: TypeAsJSONSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a type read as JSON"""
+    return _read_json
+
+
+def _read_json(buf: memoryview, pos: int) -> Tuple[Any, int]:
+    """Read a value serialized as JSON, whether the schema is "bytes" or "string" as both are UTF-8 encoded"""
+    view, pos = _binary.read_bytes_view(buf, pos)
+    return orjson.loads(view), pos
+
+
+def _read_opaque(buf: memoryview, pos: int) -> Tuple[Any, int]:
+    """Read the value of a field annotated with :class:`Opaque` from a JSON string, or the TypedDict missing marker"""
+    view, pos = _binary.read_bytes_view(buf, pos)
+    if view == _TD_MISSING_BYTES:
+        return TD_MISSING_MARKER, pos
+    return orjson.loads(view), pos
+
+
+@_compile.register
+def _(schema_obj: UUIDSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a UUID, read as a string"""
+
+    def read_uuid(buf: memoryview, pos: int) -> Tuple[uuid.UUID, int]:
+        """Read a UUID from a string"""
+        value, pos = _binary.read_string(buf, pos)
+        return uuid.UUID(value), pos
+
+    return read_uuid
+
+
+@_compile.register
+def _(schema_obj: DateSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a date, read as days since the Unix epoch"""
+    read_int = _binary.read_int
+
+    def read_date(buf: memoryview, pos: int) -> Tuple[datetime.date, int]:
+        """Read a date from the number of days since the Unix epoch"""
+        days, pos = read_int(buf, pos)
+        return datetime.date.fromordinal(days + _EPOCH_ORDINAL), pos
+
+    return read_date
+
+
+@_compile.register
+def _(schema_obj: TimeSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a time of day, read as milli- or microseconds since midnight"""
+    read_int = _PRIMITIVE_READERS[_primitive_type(schema_obj)]
+    multiplier = 1000 if Option.MILLISECONDS in schema_obj.options else 1
+
+    def read_time(buf: memoryview, pos: int) -> Tuple[datetime.time, int]:
+        """Read a time from the number of milli- or microseconds after midnight"""
+        value, pos = read_int(buf, pos)
+        seconds, micros = divmod(value * multiplier, 1_000_000)
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return datetime.time(hours, minutes, seconds, micros), pos
+
+    return read_time
+
+
+@_compile.register
+def _(schema_obj: DateTimeSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a datetime, read as milli- or microseconds since the Unix epoch"""
+    read_long = _binary.read_long
+    unit = _MILLISECOND if Option.MILLISECONDS in schema_obj.options else _MICROSECOND
+
+    def read_datetime(buf: memoryview, pos: int) -> Tuple[datetime.datetime, int]:
+        """Read a UTC datetime from the number of milli- or microseconds since the Unix epoch"""
+        value, pos = read_long(buf, pos)
+        return _EPOCH_UTC + value * unit, pos
+
+    return read_datetime
+
+
+@_compile.register
+def _(schema_obj: TimeDeltaSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a timedelta, read as an Avro duration"""
+
+    def read_timedelta(buf: memoryview, pos: int) -> Tuple[datetime.timedelta, int]:
+        """Read a timedelta from an Avro duration: months, days and milliseconds as unsigned little-endian integers"""
+        months, days, millis = _DURATION.unpack_from(buf, pos)
+        if months:
+            raise ValueError(f"Avro duration of {months} months cannot be decoded as a timedelta")
+        return datetime.timedelta(days=days, milliseconds=millis), pos + 12
+
+    return read_timedelta
+
+
+@_compile.register
+def _(schema_obj: DecimalSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a decimal, read as a big-endian two's complement unscaled integer"""
+    meta = schema_obj._decimal_meta(schema_obj.py_type)
+    exponent = -(meta.scale or 0)
+    context = decimal.Context(prec=meta.precision)  # Scaling is exact within the schema's precision
+    read_bytes_view = _binary.read_bytes_view
+
+    def read_decimal(buf: memoryview, pos: int) -> Tuple[decimal.Decimal, int]:
+        """Read a decimal from the big-endian two's complement bytes of its unscaled value"""
+        view, pos = read_bytes_view(buf, pos)
+        unscaled = int.from_bytes(view, "big", signed=True)
+        return decimal.Decimal(unscaled).scaleb(exponent, context), pos
+
+    return read_decimal
+
+
+def _read_reference_id(buf: memoryview, pos: int) -> Tuple[Optional[int], int]:
+    """Read a reference id, a union of null and long"""
+    index, pos = _binary.read_long(buf, pos)
+    if index:
+        return _binary.read_long(buf, pos)
+    return None, pos
+
+
+def _read_runtime_type(buf: memoryview, pos: int) -> Tuple[Optional[str], int]:
+    """Read a runtime type name, a union of null and string"""
+    index, pos = _binary.read_long(buf, pos)
+    if index:
+        return _binary.read_string(buf, pos)
+    return None, pos
+
+
+def sequence_class(schema_obj: SequenceSchema) -> Optional[type]:
+    """Return the class to convert the list of a sequence's items to, or None to keep the list"""
+    if isinstance(schema_obj, SetSchema):
+        return set
+    origin = get_origin(_type_from_annotated(schema_obj.py_type))
+    return tuple if inspect.isclass(origin) and issubclass(origin, tuple) else None
+
+
+@_compile.register
+def _(schema_obj: SequenceSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a sequence, read as Avro array blocks"""
+    return array_reader(
+        compiler.compile(schema_obj.items_schema),
+        sequence_class(schema_obj),
+        wrapped=Option.WRAP_INTO_RECORDS in schema_obj.options,
+    )
+
+
+def array_reader(read_item: Reader, convert: Optional[type], *, wrapped: bool = False) -> Reader:
+    """Return the reader for an array, converting the list of items to a given class unless None"""
+    read_long = _binary.read_long
+
+    def read_array(buf: memoryview, pos: int) -> Tuple[Any, int]:
+        """Read blocks of items until an empty block"""
+        if wrapped:
+            _, pos = _read_reference_id(buf, pos)
+        items: List[Any] = []
+        append = items.append
+        count, pos = read_long(buf, pos)
+        while count:
+            if count < 0:  # Block size in bytes follows the negated count
+                count = -count
+                _, pos = read_long(buf, pos)
+            for _ in range(count):
+                item, pos = read_item(buf, pos)
+                append(item)
+            count, pos = read_long(buf, pos)
+        return (items if convert is None else convert(items)), pos
+
+    return read_array
+
+
+@_compile.register
+def _(schema_obj: DictSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a dict, read as Avro map blocks"""
+    return map_reader(
+        compiler.compile(schema_obj.values_schema),
+        map_key_class(schema_obj),
+        wrapped=Option.WRAP_INTO_RECORDS in schema_obj.options,
+    )
+
+
+def map_key_class(schema_obj: DictSchema) -> Optional[type]:
+    """Return the class to convert the keys of a map to, string enums, or None to keep strings"""
+    key_class = get_args(_type_from_annotated(schema_obj.py_type))[0]
+    return None if key_class is str else key_class
+
+
+def map_reader(read_value: Reader, convert_key: Optional[type], *, wrapped: bool = False) -> Reader:
+    """Return the reader for a map, converting keys to a given class unless None"""
+    read_long = _binary.read_long
+    read_string = _binary.read_string
+
+    def read_map(buf: memoryview, pos: int) -> Tuple[Dict[str, Any], int]:
+        """Read blocks of key-value pairs until an empty block"""
+        if wrapped:
+            _, pos = _read_reference_id(buf, pos)
+        items = {}
+        count, pos = read_long(buf, pos)
+        while count:
+            if count < 0:  # Block size in bytes follows the negated count
+                count = -count
+                _, pos = read_long(buf, pos)
+            for _ in range(count):
+                key, pos = read_string(buf, pos)
+                if convert_key is not None:
+                    key = convert_key(key)
+                items[key], pos = read_value(buf, pos)
+            count, pos = read_long(buf, pos)
+        return items, pos
+
+    return read_map
+
+
+@_compile.register
+def _(schema_obj: ForwardSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a reference to a named schema, resolved once all named schemas are compiled"""
+    ref = compiler.forward_ref(schema_obj.data(names=NamesRegistry()))
+    if ref.func is not None:
+        return ref.func
+
+    def read_forward(buf: memoryview, pos: int) -> Tuple[Any, int]:
+        """Read a value of a named schema compiled after this reference"""
+        return ref.func(buf, pos)
+
+    return read_forward
+
+
+@_compile.register
+def _(schema_obj: EnumSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for an enum, read as a symbol index or as a string if the enum is not a valid Avro enum"""
+    py_type: Any = _type_from_annotated(schema_obj.py_type)
+    if not schema_obj._is_valid_enum():  # Rendered as a string schema
+
+        def read_enum_value(buf: memoryview, pos: int) -> Tuple[Any, int]:
+            """Read an enum member from its value"""
+            value, pos = _binary.read_string(buf, pos)
+            return py_type(value), pos
+
+        return read_enum_value
+
+    members = list(py_type)
+    read_int = _binary.read_int
+
+    def read_enum(buf: memoryview, pos: int) -> Tuple[Any, int]:
+        """Read an enum member from the index of its symbol"""
+        index, pos = read_int(buf, pos)
+        if not 0 <= index < len(members):
+            raise ValueError(f"Invalid Avro data: {index} is not a symbol index of {py_type}")
+        return members[index], pos
+
+    return read_enum
+
+
+@_compile.register
+def _(schema_obj: RecordSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a record, read field by field"""
+    fields: List[Tuple[str, Reader]] = []  # Filled in below, once this reader is registered
+    trailing: List[Reader] = []
+    if Option.ADD_REFERENCE_ID in schema_obj.options:
+        trailing.append(_read_reference_id)
+    if Option.ADD_RUNTIME_TYPE_FIELD in schema_obj.options and isinstance(
+        schema_obj, (DataclassSchema, PlainClassSchema)
+    ):
+        trailing.append(_read_runtime_type)
+    build = record_builder(schema_obj)
+
+    def read_record(buf: memoryview, pos: int) -> Tuple[Any, int]:
+        """Read the fields of a record and build its Python instance"""
+        values = {}
+        for name, read in fields:
+            values[name], pos = read(buf, pos)
+        for read in trailing:
+            _, pos = read(buf, pos)
+        return build(values), pos
+
+    compiler.register_named(schema_obj, schema_obj.fullname, read_record)
+    for attr, annotation, field in zip(
+        record_attributes(schema_obj), record_annotations(schema_obj), schema_obj.record_fields
+    ):
+        fields.append((attr, _read_opaque if is_opaque(annotation) else compiler.compile(field.schema)))
+    return read_record
+
+
+def record_builder(schema_obj: RecordSchema) -> Callable[[Dict[str, Any]], Any]:
+    """Return a function building the Python instance of a record from its field values by attribute name"""
+    py_class: Any = _type_from_annotated(schema_obj.py_type)
+    if isinstance(schema_obj, DataclassSchema):
+        no_init = [field.name for field in schema_obj.py_fields if not field.init]
+        if not no_init:
+            return functools.partial(_build_with_kwargs, py_class)
+        return functools.partial(_build_dataclass, py_class, no_init)
+    if isinstance(schema_obj, PydanticSchema):
+        # Values are built with the field types already, hence are not validated again
+        return functools.partial(_build_with_kwargs, py_class.model_construct)
+    if isinstance(schema_obj, PlainClassSchema):
+        return functools.partial(_build_plain_object, py_class)
+    if isinstance(schema_obj, TypedDictSchema):
+        markers = {
+            attr: marker
+            for attr, field in zip(record_attributes(schema_obj), schema_obj.record_fields)
+            if (marker := missing_marker(field.schema)) is not None
+        }
+        if markers:
+            return functools.partial(_build_typed_dict, markers)
+    return _build_dict
+
+
+def _build_with_kwargs(func: Callable[..., Any], values: Dict[str, Any]) -> Any:
+    """Build an instance calling a function with the field values as keyword arguments"""
+    return func(**values)
+
+
+def _build_dataclass(py_class: type, no_init: List[str], values: Dict[str, Any]) -> Any:
+    """Build a dataclass instance, setting fields excluded from the constructor afterwards"""
+    no_init_values = [(name, values.pop(name)) for name in no_init if name in values]
+    instance = py_class(**values)
+    for name, value in no_init_values:
+        object.__setattr__(instance, name, value)  # Works for frozen dataclasses too
+    return instance
+
+
+def _build_plain_object(py_class: Any, values: Dict[str, Any]) -> Any:
+    """Build a plain class instance without calling its constructor, setting the field values as attributes"""
+    instance = py_class.__new__(py_class)
+    try:
+        instance.__dict__.update(values)
+    except AttributeError:  # Class with slots
+        for name, value in values.items():
+            setattr(instance, name, value)
+    return instance
+
+
+def _build_typed_dict(markers: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a TypedDict, removing keys whose value is the missing marker"""
+    for key, marker in markers.items():
+        if values[key] == marker:
+            del values[key]
+    return values
+
+
+def _build_dict(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a TypedDict, or a dictionary for other record schemas"""
+    return values
+
+
+@_compile.register
+def _(schema_obj: UnionSchema, compiler: _Compiler) -> Reader:
+    """Return the reader for a union, read as a branch index followed by the branch value"""
+    branch_indexes = schema_obj.branch_indexes()
+    # Item schemas rendering as the same schema share a branch
+    branches: Dict[int, List[Schema]] = collections.defaultdict(list)
+    for item_schema, index in zip(schema_obj.item_schemas, branch_indexes):
+        branches[index].append(item_schema)
+    readers = [_branch_reader(branches[index], compiler) for index in range(len(branches))]
+    if len(readers) == 1:  # Item schemas all render as the same schema, which is not a union
+        return readers[0]
+    read_long = _binary.read_long
+
+    def read_union(buf: memoryview, pos: int) -> Tuple[Any, int]:
+        """Read the index of a union branch followed by the value"""
+        index, pos = read_long(buf, pos)
+        if not 0 <= index < len(readers):
+            raise ValueError(f"Invalid Avro data: {index} is not a branch index of {schema_obj.py_type}")
+        return readers[index](buf, pos)
+
+    return read_union
+
+
+def _branch_reader(item_schemas: List[Schema], compiler: _Compiler) -> Reader:
+    """
+    Return the reader for a union branch shared by one or more item schemas
+
+    Values are read using the first item schema, except for string enums with symbols which are not valid Avro names.
+    These are rendered as strings and share a branch with strings, in which case string values are converted to
+    members of the first enum having them.
+    """
+    enum_classes = [
+        _type_from_annotated(item_schema.py_type) for item_schema in item_schemas if isinstance(item_schema, EnumSchema)
+    ]
+    other = next((item_schema for item_schema in item_schemas if not isinstance(item_schema, EnumSchema)), None)
+    if not enum_classes or other is None:
+        return compiler.compile(item_schemas[0])
+    read_other = compiler.compile(other)
+
+    def read_enum_or_string(buf: memoryview, pos: int) -> Tuple[Any, int]:
+        """Read a string as an enum member if it is the value of one"""
+        value, pos = read_other(buf, pos)
+        for enum_class in enum_classes:
+            try:
+                return enum_class(value), pos
+            except ValueError:
+                pass
+        return value, pos
+
+    return read_enum_or_string
@@ -0,0 +1,231 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Persistent on-disk cache for generated schemas
+
+The cache is enabled by setting the environment variable ``PY_AVRO_SCHEMA_CACHE_DIR`` to a directory. Entries are keyed
+by a fingerprint of everything the schema depends on: the Python type and, recursively, all classes it references
+including the contents of the source files they are defined in, the schema classes handling them, the namespace, the
+options, registered aliases and the library version. A changed class therefore changes the key, such that stale entries
+are never read and the schema is generated again instead.
+
+Types which cannot be fingerprinted reliably, for example classes created dynamically or defined interactively, are not
+cached on disk. The reason is logged at debug level.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import typing
+from typing import Any, Dict, List, Optional, Tuple
+
+import py_avro_schema
+import py_avro_schema._alias
+import py_avro_schema._schemas
+from py_avro_schema._options import Option
+from py_avro_schema._type_hints import type_hints
+
+CACHE_DIR_ENV_VAR = "PY_AVRO_SCHEMA_CACHE_DIR"
+
+_FILE_SUFFIX = ".avsc"
+
+_FILE_DIGESTS: Dict[str, Tuple[int, int, str]] = {}
+"""Digest of each source file's contents, with the file's modification time and size when the digest was computed"""
+
+_FILE_DIGESTS_LOCK = threading.Lock()
+
+_MEMORY_ADDRESS = re.compile(r" at 0x[0-9A-Fa-f]+")
+"""Memory address in the default representation of objects, which differs in every process"""
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _NotFingerprintable(Exception):
+    """Raised when a type's schema cannot be cached on disk because its dependencies cannot be fingerprinted"""
+
+
+def cache_dir() -> Optional[str]:
+    """Return the cache directory configured by the environment, if any"""
+    return os.environ.get(CACHE_DIR_ENV_VAR) or None
+
+
+def cache_key(py_type: Any, namespace: Optional[str], options: Option) -> Optional[str]:
+    """Return the hex digest identifying the schema for the given arguments, or ``None`` if it cannot be cached"""
+    hash_ = hashlib.sha256()
+    try:
+        for part in _fingerprint_parts(py_type, namespace, options):
+            hash_.update(part.encode())
+            hash_.update(b"\0")
+    except _NotFingerprintable as e:
+        _LOGGER.debug("Not caching the schema for %r on disk: %s", py_type, e)
+        return None
+    return hash_.hexdigest()
+
+
+def load(directory: str, key: str) -> Optional[bytes]:
+    """Return the schema stored for a given key, if any"""
+    try:
+        with open(_path(directory, key), "rb") as fh:
+            return fh.read()
+    except OSError:
+        return None
+
+
+def store(directory: str, key: str, schema_json: bytes) -> None:
+    """
+    Store a schema for a given key
+
+    The file is written to a temporary file first and then renamed such that concurrent readers never see a partially
+    written file and concurrent writers do not corrupt each other's files. Errors writing to the cache are ignored.
+    """
+    path = _path(directory, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=_FILE_SUFFIX)
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(schema_json)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _path(directory: str, key: str) -> str:
+    """Return the file path for a given key, sharded by the first characters of the key"""
+    return os.path.join(directory, key[:2], key + _FILE_SUFFIX)
+
+
+def _fingerprint_parts(py_type: Any, namespace: Optional[str], options: Option) -> List[str]:
+    """Return the strings identifying everything the schema for the given arguments depends on"""
+    parts = [
+        py_avro_schema.__version__,
+        repr(namespace),
+        str(options.value),
+        repr(sorted((fqn, sorted(aliases)) for fqn, aliases in py_avro_schema._alias._ALIASES.items())),
+    ]
+    parts.extend(_type_fingerprints(py_type))
+    return parts
+
+
+def _type_fingerprints(py_type: Any) -> List[str]:
+    """
+    Return the fingerprints of a type hint and, recursively, of all classes it references
+
+    The schema classes handling the type hints are fingerprinted too, but not other registered schema classes.
+    """
+    parts: List[str] = []
+    seen = set()
+    schema_classes: Dict[type, None] = {}  # In order of first use
+    stack = [py_type]
+    while stack:
+        hint = stack.pop()
+        if isinstance(hint, type) and not typing.get_args(hint):
+            if hint in seen:
+                continue
+            seen.add(hint)
+            _add_schema_class(schema_classes, hint)
+            parts.extend(_class_fingerprint(cls) for cls in hint.__mro__)
+            stack.extend(reversed(list(_class_hints(hint))))
+        elif isinstance(hint, (str, typing.ForwardRef)):
+            raise _NotFingerprintable(f"Unresolved forward reference {hint!r}")
+        elif typing.get_origin(hint) is not None:  # Generic aliases, unions, literals and annotated types
+            args = typing.get_args(hint)
+            _add_schema_class(schema_classes, hint)
+            parts.append(f"{_value_token(typing.get_origin(hint))}[{len(args)}]")
+            stack.extend(reversed(args))
+        else:  # Literal values and annotations
+            parts.append(_value_token(hint))
+    for schema_class in schema_classes:
+        parts.extend(_class_fingerprint(cls) for cls in schema_class.__mro__)
+    return parts
+
+
+def _add_schema_class(schema_classes: Dict[type, None], hint: Any) -> None:
+    """Add the schema class handling a type hint, if any: some hints are handled by the class of an enclosing type"""
+    try:
+        schema_classes[py_avro_schema._schemas._schema_class(hint)] = None
+    except py_avro_schema._schemas.TypeNotSupportedError:
+        pass
+
+
+def _value_token(value: Any) -> str:
+    """
+    Return a string identifying a value, like a literal value or annotation metadata, which is the same in every process
+
+    Objects represented by default with their memory address are identified by their class and attributes instead.
+    """
+    token = repr(value)
+    if not _MEMORY_ADDRESS.search(token):
+        return token
+    attrs = getattr(value, "__dict__", None)
+    if type(value).__repr__ is not object.__repr__ or attrs is None:
+        raise _NotFingerprintable(f"{token} is not represented the same in every process")
+    fields = ", ".join(f"{name}={_value_token(attr)}" for name, attr in sorted(attrs.items()))
+    return f"{_class_fingerprint(type(value))}({fields})"
+
+
+def _class_hints(cls: type) -> List[Any]:
+    """Return the resolved type hints of a class, excluding class variables"""
+    if sys.modules.get(cls.__module__) is None or cls.__module__ in sys.builtin_module_names:
+        return []
+    try:
+        hints = type_hints(cls)
+    except Exception as e:
+        raise _NotFingerprintable(f"Cannot resolve type hints for {cls!r}") from e
+    return [hint for hint in hints.values() if typing.get_origin(hint) is not typing.ClassVar]
+
+
+def _class_fingerprint(cls: type) -> str:
+    """Return a string identifying a class by its import path and the contents of the file it is defined in"""
+    module_name, qualname = cls.__module__, cls.__qualname__
+    module = sys.modules.get(module_name)
+    if module_name in sys.builtin_module_names:
+        return f"{module_name}:{qualname}"
+    file_path = getattr(module, "__file__", None)
+    if not file_path:
+        raise _NotFingerprintable(f"{cls!r} is not defined in a source file")
+    obj: Any = module
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr, None)
+    if obj is not cls:
+        raise _NotFingerprintable(f"{cls!r} cannot be imported by its qualified name")
+    return f"{module_name}:{qualname}:{_file_digest(file_path)}"
+
+
+def _file_digest(path: str) -> str:
+    """Return the digest of a file's contents, recomputing it only if the file has changed"""
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        raise _NotFingerprintable(f"Cannot read {path}") from e
+    with _FILE_DIGESTS_LOCK:
+        cached = _FILE_DIGESTS.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    try:
+        with open(path, "rb") as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+    except OSError as e:
+        raise _NotFingerprintable(f"Cannot read {path}") from e
+    with _FILE_DIGESTS_LOCK:
+        _FILE_DIGESTS[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
@@ -0,0 +1,640 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Avro binary encoders compiled from the schema objects of Python types
+
+An encoder is compiled once per Python type by walking the same tree of schema objects the Avro schema is generated
+from. Each schema object is compiled into a writer function for its values, with field accessors, union branches and
+logical type conversions resolved upfront, such that encoding a value does not interpret the schema again.
+"""
+
+import datetime
+import decimal
+import functools
+import inspect
+import operator
+import uuid
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, TypeVar
+
+import orjson
+
+from py_avro_schema import _binary
+from py_avro_schema._alias import is_opaque
+from py_avro_schema._cache import cached
+from py_avro_schema._options import Option
+from py_avro_schema._schemas import (
+    BYTES_TD_MISSING_MARKER,
+    TD_MISSING_MARKER,
+    BytesTDMissingMarker,
+    DataclassSchema,
+    DateSchema,
+    DateTimeSchema,
+    DecimalSchema,
+    DictSchema,
+    EnumSchema,
+    FinalSchema,
+    ForwardSchema,
+    LiteralSchema,
+    NamedSchema,
+    NamesRegistry,
+    PlainClassSchema,
+    PrimitiveSchema,
+    PydanticSchema,
+    RecordSchema,
+    Schema,
+    SequenceSchema,
+    StrSubclassSchema,
+    TDMissingMarker,
+    TimeDeltaSchema,
+    TimeSchema,
+    TypeAsJSONSchema,
+    TypedDictSchema,
+    TypeNotSupportedError,
+    UnionSchema,
+    UUIDSchema,
+    _type_from_annotated,
+    root_schema_obj,
+)
+from py_avro_schema._validators import compile_validator
+
+Writer = Callable[[bytearray, Any], None]
+"""Function writing a Python value to a buffer in Avro binary encoding"""
+
+_PRIMITIVE_WRITERS: Dict[str, Writer] = {
+    "null": _binary.write_null,
+    "boolean": _binary.write_boolean,
+    "int": _binary.write_int,
+    "long": _binary.write_long,
+    "float": _binary.write_float,
+    "double": _binary.write_double,
+    "bytes": _binary.write_bytes,
+    "string": _binary.write_string,
+}
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=datetime.timezone.utc)
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_MILLISECOND = datetime.timedelta(milliseconds=1)
+_UINT32_MAX = (1 << 32) - 1
+
+T = TypeVar("T")
+
+
+@cached()
+def encoder(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Callable[[Any], bytes]:
+    """
+    Return a function encoding instances of a given Python type in Avro binary encoding
+
+    The encoder is compiled from the same schema objects as the schema returned by :func:`py_avro_schema.generate` with
+    the same arguments, and is cached. Values are not validated beyond what is required to encode them.
+
+    :param py_type:   The Python class to encode instances of.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :raises TypeNotSupportedError: If values of a type used by the schema cannot be encoded.
+    """
+    write = writer(py_type, namespace=namespace, options=options)
+
+    def encode(value: Any) -> bytes:
+        """Return a value in Avro binary encoding"""
+        out = bytearray()
+        write(out, value)
+        return bytes(out)
+
+    return encode
+
+
+@cached()
+def writer(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Writer:
+    """
+    Return a function writing instances of a given Python type to a buffer in Avro binary encoding
+
+    This is like :func:`encoder`, but appending to a given :class:`bytearray`, for example to encode many values into a
+    single buffer.
+    """
+    compiler = _Compiler()
+    write = compiler.compile(root_schema_obj(py_type, namespace=namespace, options=options))
+    compiler.resolve_forward_refs()
+    return write
+
+
+def resolve_name(named: Mapping[str, T], name: str, namespace: Optional[str]) -> Optional[T]:
+    """
+    Return the named schema a name refers to, given named schemas by full name
+
+    Like Avro, a name without namespace refers to a named schema in the enclosing namespace. Failing that, it refers to
+    the only named schema with that name in any namespace, if there is just one.
+
+    :param named:     Named schemas by full name.
+    :param name:      The name, with or without namespace.
+    :param namespace: The namespace of the enclosing named schema, if any.
+    :raises TypeNotSupportedError: If a name without namespace refers to named schemas in several other namespaces.
+    """
+    if "." in name or not namespace:
+        found = named.get(name)
+    else:
+        found = named.get(f"{namespace}.{name}")
+    if found is not None or "." in name:
+        return found
+    fullnames = [fullname for fullname in named if fullname.rpartition(".")[2] == name]
+    if len(fullnames) > 1:
+        raise TypeNotSupportedError(f"Name {name!r} is ambiguous: it refers to {', '.join(sorted(fullnames))}")
+    return named[fullnames[0]] if fullnames else None
+
+
+class _ForwardRef:
+    """A reference to a named schema which might be compiled later only"""
+
+    __slots__ = ("name", "namespace", "schema_obj", "func")
+
+    def __init__(self, name: str, namespace: Optional[str]):
+        """
+        A reference to a named schema which might be compiled later only
+
+        :param name:      The name, with or without namespace.
+        :param namespace: The namespace of the enclosing named schema, if any.
+        """
+        self.name = name
+        self.namespace = namespace
+        self.schema_obj: Optional[Schema] = None
+        self.func: Any = None
+
+
+class _Compiler:
+    """
+    State for compiling functions for a single tree of schema objects
+
+    The same state is used to compile writers and readers, given the function compiling a single schema object.
+    """
+
+    def __init__(self, compile_func: Optional[Callable[[Schema, "_Compiler"], Any]] = None):
+        """State for compiling functions for a single tree of schema objects"""
+        self.compile_func = compile_func or _compile
+        #: Functions by schema object id, such that shared and recursive schema objects are compiled once only. Schema
+        #: objects without name are shared across namespaces though, and names they reference depend on the namespace.
+        self.funcs: Dict[Any, Any] = {}
+        #: Named schema objects by full name, to resolve forward references
+        self.named: Dict[str, Tuple[Schema, Any]] = {}
+        self.forward_refs: List[_ForwardRef] = []
+        #: Namespaces of the named schemas being compiled, innermost last, to resolve names without namespace
+        self.namespaces: List[Optional[str]] = []
+
+    def compile(self, schema_obj: Schema) -> Any:
+        """Return the function for a schema object"""
+        if not isinstance(schema_obj, NamedSchema):
+            key = (id(schema_obj), self.namespaces[-1] if self.namespaces else None)
+            if key not in self.funcs:
+                self.funcs[key] = self.compile_func(schema_obj, self)
+            return self.funcs[key]
+        if id(schema_obj) in self.funcs:
+            return self.funcs[id(schema_obj)]
+        self.namespaces.append(schema_obj.namespace)
+        try:
+            func = self.funcs[id(schema_obj)] = self.compile_func(schema_obj, self)
+        finally:
+            self.namespaces.pop()
+        self.named.setdefault(schema_obj.fullname, (schema_obj, func))
+        return func
+
+    def register_named(self, schema_obj: Schema, fullname: str, func: Any) -> None:
+        """Register the function of a named schema before compiling its children, which might reference it"""
+        self.funcs[id(schema_obj)] = func
+        self.named.setdefault(fullname, (schema_obj, func))
+
+    def forward_ref(self, name: str) -> _ForwardRef:
+        """Return a reference to a named schema, resolved once all schema objects are compiled"""
+        ref = _ForwardRef(name, self.namespaces[-1] if self.namespaces else None)
+        # Until all schema objects are compiled, names are resolved in the enclosing namespace only
+        entry = self.named.get(name if "." in name or not ref.namespace else f"{ref.namespace}.{name}")
+        if entry is None:
+            self.forward_refs.append(ref)
+        else:
+            ref.schema_obj, ref.func = entry
+        return ref
+
+    def resolve_forward_refs(self) -> None:
+        """Resolve all forward references to named schemas"""
+        for ref in self.forward_refs:
+            entry = resolve_name(self.named, ref.name, ref.namespace)
+            if entry is None:
+                raise TypeNotSupportedError(f"Cannot compile values of unknown named schema {ref.name!r}")
+            ref.schema_obj, ref.func = entry
+
+
+@functools.singledispatch
+def _compile(schema_obj: Schema, compiler: _Compiler) -> Writer:
+    """
+    Return the writer for a schema object
+
+    Schema classes without a dedicated writer are supported if their schema is a primitive Avro type, in which case
+    values are written as is.
+    """
+    data = schema_obj.data(names=NamesRegistry())
+    type_ = data.get("type") if isinstance(data, dict) else data
+    if isinstance(type_, str) and type_ in _PRIMITIVE_WRITERS:
+        return _PRIMITIVE_WRITERS[type_]
+    raise TypeNotSupportedError(f"Cannot encode values for schema class {type(schema_obj).__name__}")
+
+
+def _primitive_type(schema_obj: Schema) -> str:
+    """Return the Avro primitive type a schema object is rendered as, e.g. ``"long"`` for a timestamp"""
+    data: Any = schema_obj.data(names=NamesRegistry())
+    return data["type"] if isinstance(data, dict) else data
+
+
+@_compile.register
+def _(schema_obj: PrimitiveSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a primitive Avro type"""
+    return _PRIMITIVE_WRITERS[_primitive_type(schema_obj)]
+
+
+@_compile.register
+def _(schema_obj: StrSubclassSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a ``str`` subclass, written as an Avro string"""
+    return _binary.write_string
+
+
+@_compile.register
+def _(schema_obj: LiteralSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a ``Literal``, using the schema of its values"""
+    return compiler.compile(schema_obj.literal_value_schema)
+
+
+@_compile.register
+def _(schema_obj: FinalSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a ``Final`` type, using the schema of the wrapped type"""
+    return compiler.compile(schema_obj.real_schema)
+
+
+@_compile.register
+def _(schema_obj: TypeAsJSONSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a type written as JSON"""
+
+    # JSON is UTF-8 encoded, hence is written the same whether the schema is "bytes" or "string"
+    def write_json(out: bytearray, value: Any) -> None:
+        """Write a value serialized as JSON"""
+        _binary.write_bytes(out, orjson.dumps(value))
+
+    return write_json
+
+
+@_compile.register
+def _(schema_obj: UUIDSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a UUID, written as a string"""
+
+    def write_uuid(out: bytearray, value: uuid.UUID) -> None:
+        """Write a UUID as a string"""
+        _binary.write_string(out, str(value))
+
+    return write_uuid
+
+
+@_compile.register
+def _(schema_obj: DateSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a date, written as days since the Unix epoch"""
+    write_int = _binary.write_int
+
+    def write_date(out: bytearray, value: datetime.date) -> None:
+        """Write a date as the number of days since the Unix epoch"""
+        write_int(out, value.toordinal() - _EPOCH_ORDINAL)
+
+    return write_date
+
+
+@_compile.register
+def _(schema_obj: TimeSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a time of day, written as milli- or microseconds since midnight"""
+    write_int = _PRIMITIVE_WRITERS[_primitive_type(schema_obj)]
+    divisor = 1000 if Option.MILLISECONDS in schema_obj.options else 1
+
+    def write_time(out: bytearray, value: datetime.time) -> None:
+        """Write a time as the number of milli- or microseconds after midnight"""
+        micros = ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+        write_int(out, micros // divisor)
+
+    return write_time
+
+
+@_compile.register
+def _(schema_obj: DateTimeSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a datetime, written as milli- or microseconds since the Unix epoch"""
+    write_long = _binary.write_long
+    unit = _MILLISECOND if Option.MILLISECONDS in schema_obj.options else _MICROSECOND
+
+    def write_datetime(out: bytearray, value: datetime.datetime) -> None:
+        """Write a datetime as the number of milli- or microseconds since the Unix epoch, naive datetimes being UTC"""
+        write_long(out, (value - (_EPOCH if value.tzinfo is None else _EPOCH_UTC)) // unit)
+
+    return write_datetime
+
+
+@_compile.register
+def _(schema_obj: TimeDeltaSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a timedelta, written as an Avro duration"""
+
+    def write_timedelta(out: bytearray, value: datetime.timedelta) -> None:
+        """Write a timedelta as an Avro duration: months, days and milliseconds as unsigned little-endian integers"""
+        millis = value.seconds * 1000 + value.microseconds // 1000
+        if not 0 <= value.days <= _UINT32_MAX:
+            raise ValueError(f"{value!r} cannot be encoded as an Avro duration, which cannot be negative")
+        out += (0).to_bytes(4, "little") + value.days.to_bytes(4, "little") + millis.to_bytes(4, "little")
+
+    return write_timedelta
+
+
+@_compile.register
+def _(schema_obj: DecimalSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a decimal, written as a big-endian two's complement unscaled integer"""
+    meta = schema_obj._decimal_meta(schema_obj.py_type)
+    scale = meta.scale or 0
+    max_unscaled = 10**meta.precision
+    write_bytes = _binary.write_bytes
+
+    def write_decimal(out: bytearray, value: decimal.Decimal) -> None:
+        """Write a decimal as the big-endian two's complement bytes of its unscaled value"""
+        sign, digits, exp = value.as_tuple()
+        if not isinstance(exp, int):
+            raise ValueError(f"{value!r} cannot be encoded as an Avro decimal")
+        delta = exp + scale
+        if delta < 0:
+            raise ValueError(f"{value!r} has a scale greater than the schema's scale {scale}")
+        unscaled = 0
+        for digit in digits:
+            unscaled = unscaled * 10 + digit
+        unscaled *= 10**delta
+        if unscaled >= max_unscaled:
+            raise ValueError(f"{value!r} has a precision greater than the schema's precision {meta.precision}")
+        if sign:
+            unscaled = -unscaled
+        write_bytes(out, unscaled.to_bytes((unscaled.bit_length() + 8) // 8, "big", signed=True))
+
+    return write_decimal
+
+
+@_compile.register
+def _(schema_obj: SequenceSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a sequence, written as Avro array blocks"""
+    write_item = compiler.compile(schema_obj.items_schema)
+    write_long = _binary.write_long
+    wrapped = Option.WRAP_INTO_RECORDS in schema_obj.options
+
+    def write_array(out: bytearray, value: Any) -> None:
+        """Write a sequence as a single block of items followed by an empty block"""
+        if wrapped:
+            out.append(0)  # The wrapping record's null reference id
+        if value:
+            write_long(out, len(value))
+            for item in value:
+                write_item(out, item)
+        out.append(0)
+
+    return write_array
+
+
+@_compile.register
+def _(schema_obj: DictSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a dict, written as Avro map blocks"""
+    write_value = compiler.compile(schema_obj.values_schema)
+    write_long = _binary.write_long
+    write_string = _binary.write_string
+    wrapped = Option.WRAP_INTO_RECORDS in schema_obj.options
+
+    def write_map(out: bytearray, value: Any) -> None:
+        """Write a mapping as a single block of key-value pairs followed by an empty block"""
+        if wrapped:
+            out.append(0)  # The wrapping record's null reference id
+        if value:
+            write_long(out, len(value))
+            for key, item in value.items():
+                write_string(out, key)
+                write_value(out, item)
+        out.append(0)
+
+    return write_map
+
+
+@_compile.register
+def _(schema_obj: ForwardSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a reference to a named schema, resolved once all named schemas are compiled"""
+    ref = compiler.forward_ref(schema_obj.data(names=NamesRegistry()))
+    if ref.func is not None:
+        return ref.func
+
+    def write_forward(out: bytearray, value: Any) -> None:
+        """Write a value of a named schema compiled after this reference"""
+        ref.func(out, value)
+
+    return write_forward
+
+
+@_compile.register
+def _(schema_obj: EnumSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for an enum, written as a symbol index or as a string if the enum is not a valid Avro enum"""
+    if not schema_obj._is_valid_enum():  # Rendered as a string schema
+
+        def write_enum_value(out: bytearray, value: Any) -> None:
+            """Write an enum member's value"""
+            _binary.write_string(out, value.value)
+
+        return write_enum_value
+
+    py_type: Any = _type_from_annotated(schema_obj.py_type)
+    indexes = {member: i for i, member in enumerate(py_type)}
+    indexes.update((member.value, i) for i, member in enumerate(py_type))
+    write_int = _binary.write_int
+
+    def write_enum(out: bytearray, value: Any) -> None:
+        """Write an enum member as the index of its symbol"""
+        try:
+            index = indexes[value]
+        except (KeyError, TypeError):
+            raise ValueError(f"{value!r} is not a member of {py_type}") from None
+        write_int(out, index)
+
+    return write_enum
+
+
+@_compile.register
+def _(schema_obj: RecordSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a record, written field by field"""
+    fields: List[Tuple[Callable[[Any], Any], Writer]] = []  # Filled in below, once this writer is registered
+    # Reference ids are not tracked, hence written as nulls
+    reference_id = Option.ADD_REFERENCE_ID in schema_obj.options
+    runtime_type = Option.ADD_RUNTIME_TYPE_FIELD in schema_obj.options and isinstance(
+        schema_obj, (DataclassSchema, PlainClassSchema)
+    )
+
+    def write_record(out: bytearray, value: Any) -> None:
+        """Write the fields of a record"""
+        for get, write in fields:
+            write(out, get(value))
+        if reference_id:
+            out.append(0)
+        if runtime_type:
+            write_runtime_type(out, value)
+
+    compiler.register_named(schema_obj, schema_obj.fullname, write_record)
+    for attr, annotation, field in zip(
+        record_attributes(schema_obj), record_annotations(schema_obj), schema_obj.record_fields
+    ):
+        write = _write_opaque if is_opaque(annotation) else compiler.compile(field.schema)
+        fields.append((_field_getter(schema_obj, attr, field.schema), write))
+    return write_record
+
+
+def write_runtime_type(out: bytearray, value: Any) -> None:
+    """Write the runtime type field of a record, a union of null and string, as the name of the value's class"""
+    out.append(2)  # Branch index 1, zigzag encoded
+    _binary.write_string(out, type(value).__name__)
+
+
+def record_attributes(schema_obj: RecordSchema) -> List[str]:
+    """Return, for each field of a record schema, the name of the Python attribute or key holding its value"""
+    if isinstance(schema_obj, DataclassSchema):
+        return [field.name for field in schema_obj.py_fields]
+    if isinstance(schema_obj, (PydanticSchema, TypedDictSchema)):
+        return list(schema_obj.py_fields)
+    if isinstance(schema_obj, PlainClassSchema):
+        return [name for name, _ in schema_obj.py_fields]
+    return [field.name for field in schema_obj.record_fields]
+
+
+def record_annotations(schema_obj: RecordSchema) -> List[Any]:
+    """Return, for each field of a record schema, the Python type annotation of the field including any metadata"""
+    if isinstance(schema_obj, DataclassSchema):
+        return [field.type for field in schema_obj.py_fields]
+    if isinstance(schema_obj, PydanticSchema):
+        return [schema_obj._annotation(name) for name in schema_obj.py_fields]
+    if isinstance(schema_obj, TypedDictSchema):
+        return list(schema_obj.py_fields.values())
+    if isinstance(schema_obj, PlainClassSchema):
+        return [py_type for _, py_type in schema_obj.py_fields]
+    return [field.py_type for field in schema_obj.record_fields]
+
+
+def _write_opaque(out: bytearray, value: Any) -> None:
+    """Write the value of a field annotated with :class:`Opaque` as a JSON string, unless serialized already"""
+    _binary.write_bytes(out, value.encode() if isinstance(value, str) else orjson.dumps(value, default=_json_default))
+
+
+def _json_default(value: Any) -> Any:
+    """Return JSON serializable data for objects :mod:`orjson` does not serialize natively"""
+    if hasattr(value, "__pydantic_private__"):  # Pydantic model, see :class:`PydanticSchema`
+        return value.model_dump(mode="json")
+    if hasattr(value, "__dict__"):
+        return vars(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _field_getter(schema_obj: RecordSchema, attr: str, field_schema: Schema) -> Callable[[Any], Any]:
+    """Return a function getting a field's value from a record's Python instance"""
+    if not isinstance(schema_obj, TypedDictSchema):
+        return operator.attrgetter(attr)
+    # Keys missing from a TypedDict are written as the missing marker, if the schema has a branch for it
+    marker = missing_marker(field_schema)
+    if marker is not None:
+        return functools.partial(_get_item_or_marker, key=attr, marker=marker)
+    return operator.itemgetter(attr)
+
+
+def missing_marker(field_schema: Schema) -> Any:
+    """Return the marker for keys missing from a TypedDict if a field's schema is a union including it, else None"""
+    if isinstance(field_schema, UnionSchema):
+        for item_schema in field_schema.item_schemas:
+            if item_schema.py_type is TDMissingMarker:
+                return TD_MISSING_MARKER
+            if item_schema.py_type is BytesTDMissingMarker:
+                return BYTES_TD_MISSING_MARKER
+    return None
+
+
+def _get_item_or_marker(value: Any, key: str, marker: Any) -> Any:
+    """Return a TypedDict's value for a key, or the missing marker if the key is missing"""
+    return value.get(key, marker)
+
+
+@_compile.register
+def _(schema_obj: UnionSchema, compiler: _Compiler) -> Writer:
+    """Return the writer for a union, written as a branch index followed by the branch value"""
+    branch_indexes = schema_obj.branch_indexes()
+    # Item schemas may all render as the same schema, in which case the schema is not a union
+    is_union = any(branch_indexes)
+    by_class: Dict[type, Tuple[bytes, Writer]] = {}
+    checks: List[Tuple[Callable[[Any], bool], bytes, Writer]] = []
+    for item_schema, index in zip(schema_obj.item_schemas, branch_indexes):
+        write = compiler.compile(item_schema)
+        py_class, check = _union_item_check(item_schema, compiler)
+        prefix = bytearray()
+        if is_union:
+            _binary.write_long(prefix, index)
+        if py_class is not None:
+            by_class.setdefault(py_class, (bytes(prefix), write))
+        checks.append((check, bytes(prefix), write))
+    py_type = schema_obj.py_type
+
+    def write_union(out: bytearray, value: Any) -> None:
+        """Write the index of the first union branch matching the value, followed by the value"""
+        try:
+            prefix, write = by_class[type(value)]
+        except KeyError:
+            for check, prefix, write in checks:
+                if check(value):
+                    break
+            else:
+                raise TypeError(f"{value!r} does not match any type of {py_type}") from None
+        out += prefix
+        write(out, value)
+
+    return write_union
+
+
+def _union_item_check(item_schema: Schema, compiler: _Compiler) -> Tuple[Optional[type], Callable[[Any], bool]]:
+    """
+    Return the class of a union item's values if known exactly, and a function checking whether a value matches the item
+
+    Values are matched like :func:`typeguard.check_type` does, like for default values.
+    """
+    if isinstance(item_schema, ForwardSchema):
+        ref = compiler.forward_ref(item_schema.data(names=NamesRegistry()))
+
+        def is_forward_instance(value: Any) -> bool:
+            """Whether the value is an instance of the referenced named schema's class"""
+            return ref.schema_obj is not None and isinstance(value, _type_from_annotated(ref.schema_obj.py_type))
+
+        return None, is_forward_instance
+    py_type = item_schema.py_type
+    unwrapped = _type_from_annotated(py_type)
+    py_class: Optional[type] = unwrapped if inspect.isclass(unwrapped) else None
+    check = compile_validator(py_type)
+    if check is None:
+        origin = getattr(unwrapped, "__origin__", None) or py_class
+        if not inspect.isclass(origin):
+            raise TypeNotSupportedError(f"Cannot encode union values of type {py_type}")
+        check = functools.partial(_is_instance, py_class=origin)
+    return py_class, check
+
+
+def _is_instance(value: Any, py_class: type) -> bool:
+    """Whether the value is an instance of a class"""
+    return isinstance(value, py_class)
@@ -0,0 +1,241 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Avro Parsing Canonical Form and schema fingerprints
+
+See https://avro.apache.org/docs/1.11.1/specification/#parsing-canonical-form-for-schemas. The canonical form is
+computed from the schema data generated for a Python type, without serializing and parsing the schema again.
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from py_avro_schema._cache import cached
+from py_avro_schema._options import Option
+
+CRC_64_AVRO = "CRC-64-AVRO"
+"""Name of the 64-bit Rabin fingerprint algorithm defined by the Avro specification"""
+
+_PRIMITIVE_TYPES = frozenset({"null", "boolean", "int", "long", "float", "double", "bytes", "string"})
+
+_IGNORED_OPTIONS = Option.NO_DOC | Option.JSON_INDENT_2 | Option.JSON_SORT_KEYS | Option.JSON_APPEND_NEWLINE
+"""Options not affecting the canonical form, such that schemas generated with or without them share cache entries"""
+
+_CRC_64_EMPTY = 0xC15D213AA4D7A795
+
+
+def _crc_64_table() -> Tuple[int, ...]:
+    """Return the lookup table for the 64-bit Rabin fingerprint"""
+    table = []
+    for i in range(256):
+        fp = i
+        for _ in range(8):
+            fp = (fp >> 1) ^ (_CRC_64_EMPTY & -(fp & 1))
+        table.append(fp)
+    return tuple(table)
+
+
+_CRC_64_TABLE = _crc_64_table()
+
+
+def crc_64_avro(data: bytes) -> bytes:
+    """Return the 64-bit Rabin fingerprint of some data as 8 bytes in little-endian order, like Avro's Java library"""
+    fp = _CRC_64_EMPTY
+    table = _CRC_64_TABLE
+    for byte in data:
+        fp = (fp >> 8) ^ table[(fp ^ byte) & 0xFF]
+    return fp.to_bytes(8, "little")
+
+
+def canonical_form(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> str:
+    """
+    Return the Avro Parsing Canonical Form of the schema for a given Python class
+
+    The canonical form is the schema without documentation, defaults, aliases and other attributes not relevant for
+    reading data, with fully qualified names and without whitespace. Two schemas with the same canonical form are
+    guaranteed to read data in the same way. The result is cached.
+
+    :param py_type:   The Python class to generate a schema for.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    """
+    return _canonical_form_bytes(py_type, namespace=namespace, options=options & ~_IGNORED_OPTIONS).decode()
+
+
+def fingerprint(
+    py_type: Any,
+    *,
+    algorithm: str = CRC_64_AVRO,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> bytes:
+    """
+    Return the fingerprint of the schema for a given Python class
+
+    The fingerprint is computed from the schema's Parsing Canonical Form, like the reference Avro implementations. The
+    result is cached.
+
+    :param py_type:   The Python class to generate a schema for.
+    :param algorithm: ``"CRC-64-AVRO"`` (the default) for the 64-bit Rabin fingerprint, ``"MD5"``, ``"SHA-256"`` or
+                      any other algorithm supported by :mod:`hashlib`.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :raises ValueError: If the algorithm is not supported.
+    """
+    return _fingerprint(py_type, algorithm=algorithm, namespace=namespace, options=options & ~_IGNORED_OPTIONS)
+
+
+def resolution_form(py_type: Any, *, namespace: Optional[str] = None, options: Option = Option(0)) -> bytes:
+    """
+    Return the Parsing Canonical Form with logical types of the schema for a given Python class, as UTF-8 bytes
+
+    Unlike the canonical form, this identifies the Python values data is read as, to compare a writer's schema with the
+    schema for a Python type. The result is cached.
+    """
+    return _canonical_form_bytes(py_type, namespace=namespace, options=options & ~_IGNORED_OPTIONS, logical_types=True)
+
+
+@cached()
+def _fingerprint(
+    py_type: Any, *, algorithm: str, namespace: Optional[str], options: Option, logical_types: bool = False
+) -> bytes:
+    """
+    Return the fingerprint of the schema for a given Python class
+
+    :param logical_types: Whether to keep logical type attributes, see :func:`canonical_schema_data`.
+    """
+    data = _canonical_form_bytes(py_type, namespace=namespace, options=options, logical_types=logical_types)
+    if algorithm == CRC_64_AVRO:
+        return crc_64_avro(data)
+    try:
+        hash_ = hashlib.new(algorithm.replace("-", "").lower(), data)  # Java algorithm names like "SHA-256"
+    except ValueError:
+        raise ValueError(f"Unsupported fingerprint algorithm {algorithm!r}") from None
+    return hash_.digest()
+
+
+@cached()
+def _canonical_form_bytes(
+    py_type: Any, *, namespace: Optional[str], options: Option, logical_types: bool = False
+) -> bytes:
+    """
+    Return the UTF-8 encoded Parsing Canonical Form of the schema for a given Python class
+
+    :param logical_types: Whether to keep logical type attributes, see :func:`canonical_schema_data`.
+    """
+    # Imported on first use to keep importing this package fast
+    import orjson
+
+    import py_avro_schema
+    from py_avro_schema._schemas import schema
+
+    schema_data = schema(py_type, namespace=namespace, options=options)
+    canonical_data = canonical_schema_data(schema_data, logical_types=logical_types)
+    try:
+        return orjson.dumps(canonical_data)
+    except orjson.JSONEncodeError as e:
+        if "recursion" not in str(e).lower():
+            raise
+        return py_avro_schema._dumps_nested(canonical_data, option=0)
+
+
+def canonical_schema_data(schema_data: Any, logical_types: bool = False) -> Any:
+    """
+    Return the Parsing Canonical Form of some Avro schema data, as JSON data
+
+    Primitive schemas are converted to their simple form, names are fully qualified, attributes not relevant for reading
+    data are removed and the remaining attributes are ordered as per the specification. Serializing the returned data
+    as compact JSON gives the canonical form. Schemas are traversed using an explicit stack such that deeply nested
+    schemas are supported.
+
+    The canonical form drops logical types, although the same data is read as different values with different logical
+    types, like timestamps in milliseconds or microseconds. To compare schemas for reading data into Python values,
+    pass ``logical_types=True``: logical type attributes are then kept, after all other attributes, and primitive
+    schemas with a logical type keep their full form.
+    """
+    root: List[Any] = [None]
+    names: Set[str] = set()
+    # Schema data, enclosing namespace, container to store the canonical data in and the index or key to store it at
+    stack: List[Tuple[Any, Optional[str], Any, Any]] = [(schema_data, None, root, 0)]
+    while stack:
+        data, namespace, target, key = stack.pop()
+        children: List[Tuple[Any, Optional[str], Any, Any]] = []
+        if isinstance(data, str):
+            canonical: Any = data if data in _PRIMITIVE_TYPES else _fullname(data, namespace)
+        elif isinstance(data, list):  # Union
+            canonical = [None] * len(data)
+            children = [(item, namespace, canonical, i) for i, item in enumerate(data)]
+        else:
+            type_ = data["type"]
+            if not isinstance(type_, str):  # Schema nested in the type attribute
+                children = [(type_, namespace, target, key)]
+                canonical = None
+            elif type_ in ("record", "error", "enum", "fixed"):
+                fullname = _fullname(data["name"], data.get("namespace", namespace))
+                if fullname in names:
+                    canonical = fullname
+                else:
+                    names.add(fullname)
+                    canonical = {"name": fullname, "type": type_}
+                    if type_ == "enum":
+                        canonical["symbols"] = data["symbols"]
+                    elif type_ == "fixed":
+                        canonical["size"] = data["size"]
+                        if logical_types:
+                            canonical.update(_logical_type_attributes(data))
+                    else:
+                        canonical["fields"] = fields = [
+                            {"name": field["name"], "type": None} for field in data["fields"]
+                        ]
+                        inner_namespace = fullname.rpartition(".")[0] or None
+                        children = [
+                            (field["type"], inner_namespace, canonical_field, "type")
+                            for field, canonical_field in zip(data["fields"], fields)
+                        ]
+            elif type_ == "array":
+                canonical = {"type": "array", "items": None}
+                children = [(data["items"], namespace, canonical, "items")]
+            elif type_ == "map":
+                canonical = {"type": "map", "values": None}
+                children = [(data["values"], namespace, canonical, "values")]
+            else:  # Primitive, possibly with a logical type, or a reference to a named schema
+                canonical = type_ if type_ in _PRIMITIVE_TYPES else _fullname(type_, namespace)
+                if logical_types and "logicalType" in data:
+                    canonical = {"type": canonical, **_logical_type_attributes(data)}
+        if canonical is not None:
+            target[key] = canonical
+        # Children are processed in order of appearance such that named schemas are defined before references
+        stack.extend(reversed(children))
+    return root[0]
+
+
+def _logical_type_attributes(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the attributes of a schema defining its logical type, if any, with the default scale of decimals"""
+    if "logicalType" not in data:
+        return {}
+    attributes = {"logicalType": data["logicalType"]}
+    if data["logicalType"] == "decimal":
+        attributes.update(precision=data.get("precision"), scale=data.get("scale", 0))
+    return attributes
+
+
+def _fullname(name: str, namespace: Optional[str]) -> str:
+    """Return the full name for a name, qualifying it with the namespace unless the name contains dots already"""
+    if "." in name or not namespace:
+        return name
+    return f"{namespace}.{name}"
@@ -0,0 +1,271 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Struct-packed encoding of records with a fixed layout
+
+Records whose fields are all booleans, floating-point numbers, durations or records of such fields are encoded in Avro
+binary encoding with the same size and layout whatever their values. Such records are detected from their schema
+objects, see :meth:`py_avro_schema._schemas.Schema.struct_format`, and are encoded and decoded with a single
+:class:`struct.Struct`, without encoding each field separately.
+"""
+
+import datetime
+import functools
+import operator
+import struct
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from py_avro_schema._cache import cached
+from py_avro_schema._decoder import Data, record_builder
+from py_avro_schema._encoder import _UINT32_MAX, record_attributes
+from py_avro_schema._options import Option
+from py_avro_schema._schemas import (
+    FinalSchema,
+    LiteralSchema,
+    RecordSchema,
+    Schema,
+    TimeDeltaSchema,
+    TypedDictSchema,
+    root_schema_obj,
+)
+
+FlatReader = Callable[[Sequence[Any], int], Tuple[Any, int]]
+"""Function building a value from a sequence of unpacked values at a position, returning the next position"""
+
+
+@cached()
+def struct_codec(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Optional["StructCodec"]:
+    """
+    Return an encoder and decoder of a record type using a :class:`struct.Struct`, if records have a fixed layout
+
+    The Avro binary encoding of records whose fields are all booleans, floats (``Option.FLOAT_32``), doubles,
+    timedeltas (Avro durations) or records of such fields has the same size and layout for all values. Such records are
+    encoded and decoded with a single :class:`struct.Struct`, instead of field by field. The codec is cached.
+
+    Example::
+
+        codec = py_avro_schema.struct_codec(Reading)
+        if codec is not None:
+            data = codec.encode_many(readings)
+            readings = list(codec.iter_decode(data))
+
+    :param py_type:   The Python class of the records, a dataclass, Pydantic model, plain class or TypedDict.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :returns: The codec, or None if the type is not a record type with a fixed layout.
+    """
+    schema_obj = _unwrap(root_schema_obj(py_type, namespace=namespace, options=options))
+    if not isinstance(schema_obj, RecordSchema):
+        return None
+    struct_format = schema_obj.struct_format()
+    if struct_format is None:
+        return None
+    return StructCodec(struct.Struct(f"<{struct_format}"), _values_getter(schema_obj), _builder(schema_obj))
+
+
+class StructCodec:
+    """
+    Encoder and decoder of a record type with a fixed layout in Avro binary encoding, using a :class:`struct.Struct`
+
+    Use :func:`struct_codec` to create a codec for a Python type.
+    """
+
+    def __init__(
+        self, struct_: struct.Struct, get_values: Callable[[Any], Sequence[Any]], build: Callable[[Sequence[Any]], Any]
+    ):
+        """Encoder and decoder of a record type with a fixed layout in Avro binary encoding"""
+        #: The struct of the records' encoding
+        self.struct = struct_
+        #: The size in bytes of an encoded record
+        self.size = struct_.size
+        self._get_values = get_values
+        self._build = build
+
+    def encode(self, value: Any) -> bytes:
+        """Return a record in Avro binary encoding"""
+        return self.struct.pack(*self._get_values(value))
+
+    def pack_into(self, buffer: Any, offset: int, value: Any) -> None:
+        """Write a record in Avro binary encoding into a writable buffer at a given offset"""
+        self.struct.pack_into(buffer, offset, *self._get_values(value))
+
+    def encode_many(self, values: Sequence[Any]) -> bytearray:
+        """Return many records in Avro binary encoding, written into a single preallocated buffer"""
+        out = bytearray(self.size * len(values))
+        pack_into, get_values = self.struct.pack_into, self._get_values
+        for offset, value in zip(range(0, len(out), self.size), values):
+            pack_into(out, offset, *get_values(value))
+        return out
+
+    def decode(self, data: Data) -> Any:
+        """Return a record decoded from Avro binary encoding"""
+        if len(data) != self.size:
+            raise ValueError(f"Invalid Avro data: {len(data)} bytes instead of {self.size}")
+        return self._build(self.struct.unpack(data))
+
+    def unpack_from(self, buffer: Data, offset: int = 0) -> Any:
+        """Return a record decoded from Avro binary encoding at a given offset in a buffer"""
+        try:
+            return self._build(self.struct.unpack_from(buffer, offset))
+        except struct.error:
+            raise ValueError("Invalid Avro data: unexpected end of data") from None
+
+    def iter_decode(self, data: Data) -> Iterator[Any]:
+        """Yield the records decoded from concatenated records in Avro binary encoding"""
+        if len(data) % self.size:
+            raise ValueError(f"Invalid Avro data: {len(data)} bytes is not a multiple of {self.size}")
+        return map(self._build, self.struct.iter_unpack(data))
+
+
+def _unwrap(schema_obj: Schema) -> Schema:
+    """Return the schema object values are encoded with, unwrapping literal and final types"""
+    while isinstance(schema_obj, (LiteralSchema, FinalSchema)):
+        if isinstance(schema_obj, LiteralSchema):
+            schema_obj = schema_obj.literal_value_schema
+        else:
+            schema_obj = schema_obj.real_schema
+    return schema_obj
+
+
+def _values_getter(schema_obj: RecordSchema) -> Callable[[Any], Sequence[Any]]:
+    """Return the function returning the values to pack for a record, with nested records flattened"""
+    paths: List[Tuple[Tuple[bool, str], ...]] = []
+    durations: List[bool] = []
+
+    def add_fields(schema_obj: RecordSchema, path: Tuple[Tuple[bool, str], ...]) -> None:
+        """Add the paths to the values of a record's fields, each step being whether it is a key, and the name"""
+        is_key = isinstance(schema_obj, TypedDictSchema)
+        for attr, field in zip(record_attributes(schema_obj), schema_obj.record_fields):
+            field_schema = _unwrap(field.schema)
+            if isinstance(field_schema, RecordSchema):
+                add_fields(field_schema, (*path, (is_key, attr)))
+            else:
+                paths.append((*path, (is_key, attr)))
+                durations.append(isinstance(field_schema, TimeDeltaSchema))
+
+    add_fields(schema_obj, ())
+    if not any(durations):
+        if not any(is_key for path in paths for is_key, _ in path):
+            # A single C-level call, for example ``attrgetter("x", "y", "position.z")``
+            return _as_tuple(operator.attrgetter(*(".".join(name for _, name in path) for path in paths)), len(paths))
+        if all(len(path) == 1 for path in paths):
+            return _as_tuple(operator.itemgetter(*(path[0][1] for path in paths)), len(paths))
+    getters = [(_path_getter(path), is_duration) for path, is_duration in zip(paths, durations)]
+
+    def get_values(value: Any) -> List[Any]:
+        """Return the values to pack for a record"""
+        values: List[Any] = []
+        for get, is_duration in getters:
+            if is_duration:
+                values += _duration(get(value))
+            else:
+                values.append(get(value))
+        return values
+
+    return get_values
+
+
+def _as_tuple(get: Callable[[Any], Any], count: int) -> Callable[[Any], Sequence[Any]]:
+    """Return a getter of many values as a tuple, since getters of a single value return the value itself"""
+    if count > 1:
+        return get
+
+    def get_one(value: Any) -> Tuple[Any]:
+        """Return a single value as a tuple"""
+        return (get(value),)
+
+    return get_one
+
+
+def _path_getter(path: Tuple[Tuple[bool, str], ...]) -> Callable[[Any], Any]:
+    """Return the function getting a value by its path of attributes or keys"""
+    getters = [operator.itemgetter(name) if is_key else operator.attrgetter(name) for is_key, name in path]
+    if len(getters) == 1:
+        return getters[0]
+
+    def get_path(value: Any) -> Any:
+        """Return a value by its path of attributes or keys"""
+        for get in getters:
+            value = get(value)
+        return value
+
+    return get_path
+
+
+def _duration(value: datetime.timedelta) -> Tuple[int, int, int]:
+    """Return the months, days and milliseconds of an Avro duration for a timedelta"""
+    if not 0 <= value.days <= _UINT32_MAX:
+        raise ValueError(f"{value!r} cannot be encoded as an Avro duration, which cannot be negative")
+    return 0, value.days, value.seconds * 1000 + value.microseconds // 1000
+
+
+def _builder(schema_obj: RecordSchema) -> Callable[[Sequence[Any]], Any]:
+    """Return the function building a record from its unpacked values"""
+    attrs = record_attributes(schema_obj)
+    if not any(
+        isinstance(_unwrap(field.schema), (RecordSchema, TimeDeltaSchema)) for field in schema_obj.record_fields
+    ):
+        return functools.partial(_build_flat, record_builder(schema_obj), attrs)
+    read = _record_reader(schema_obj)
+
+    def build(values: Sequence[Any]) -> Any:
+        """Build a record from its unpacked values"""
+        return read(values, 0)[0]
+
+    return build
+
+
+def _build_flat(build: Callable[[Any], Any], attrs: List[str], values: Sequence[Any]) -> Any:
+    """Build a record without nested records or durations from its unpacked values"""
+    return build(dict(zip(attrs, values)))
+
+
+def _record_reader(schema_obj: RecordSchema) -> FlatReader:
+    """Return the function building a record from unpacked values at a position"""
+    fields: List[Tuple[str, FlatReader]] = []
+    for attr, field in zip(record_attributes(schema_obj), schema_obj.record_fields):
+        field_schema = _unwrap(field.schema)
+        if isinstance(field_schema, RecordSchema):
+            fields.append((attr, _record_reader(field_schema)))
+        elif isinstance(field_schema, TimeDeltaSchema):
+            fields.append((attr, _read_duration))
+        else:
+            fields.append((attr, _read_value))
+    build = record_builder(schema_obj)
+
+    def read_record(values: Sequence[Any], pos: int) -> Tuple[Any, int]:
+        """Build a record from unpacked values at a position"""
+        field_values = {}
+        for attr, read in fields:
+            field_values[attr], pos = read(values, pos)
+        return build(field_values), pos
+
+    return read_record
+
+
+def _read_value(values: Sequence[Any], pos: int) -> Tuple[Any, int]:
+    """Return an unpacked value as is"""
+    return values[pos], pos + 1
+
+
+def _read_duration(values: Sequence[Any], pos: int) -> Tuple[datetime.timedelta, int]:
+    """Return a timedelta from the unpacked months, days and milliseconds of an Avro duration"""
+    months, days, millis = values[pos : pos + 3]
+    if months:
+        raise ValueError(f"Avro duration of {months} months cannot be decoded as a timedelta")
+    return datetime.timedelta(days=days, milliseconds=millis), pos + 3
@@ -0,0 +1,121 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Schema generation options
+
+This module is kept free of heavy imports such that ``import py_avro_schema`` is fast.
+"""
+
+import enum
+
+
+class Option(enum.Flag):
+    """
+    Schema generation options
+
+    Options can be passed in to the function :func:`py_avro_schema.generate`. Multiple values are specified like this::
+
+       Option.INT_32 | Option.FLOAT_32
+    """
+
+    # The JSON options' values are the values of orjson's option constants ``orjson.OPT_INDENT_2`` etc. They are
+    # spelled out such that importing this module does not import orjson.
+
+    #: Format JSON data using 2 spaces indentation
+    JSON_INDENT_2 = 1
+
+    #: Sort keys in JSON data
+    JSON_SORT_KEYS = 32
+
+    #: Append a newline character at the end of the JSON data
+    JSON_APPEND_NEWLINE = 1024
+
+    #: Use ``int`` schemas (32-bit) instead of ``long`` schemas (64-bit) for Python :class:`int`.
+    INT_32 = enum.auto()
+
+    #: Use ``float`` schemas (32-bit) instead of ``double`` schemas (64-bit) for Python class :class:`float`.
+    FLOAT_32 = enum.auto()
+
+    #: Use milliseconds instead of microseconds precision for (date)time schemas
+    MILLISECONDS = enum.auto()
+
+    #: Mandate default values to be specified for all dataclass fields. This option may be used to enforce default
+    #: values on Avro record fields to support schema evolution/resolution.
+    DEFAULTS_MANDATORY = enum.auto()
+
+    #: Model ``Dict[str, Any]`` fields as string schemas instead of byte schemas (with logical type ``json``, to support
+    #: JSON serialization inside Avro).
+    LOGICAL_JSON_STRING = enum.auto()
+
+    #: Do not populate namespaces automatically based on the package a Python class is defined in.
+    NO_AUTO_NAMESPACE = enum.auto()
+
+    #: Automatically populate namespaces using full (dotted) module names instead of top-level package names.
+    AUTO_NAMESPACE_MODULE = enum.auto()
+
+    #: Do not populate ``doc`` schema attributes based on Python docstrings
+    NO_DOC = enum.auto()
+
+    #: Use an alias specified as part of a class instead of the class name itself.
+    #: This currently affects Pydantic models only.
+    #: See https://docs.pydantic.dev/dev/api/config/#pydantic.config.ConfigDict.title
+    USE_CLASS_ALIAS = enum.auto()
+
+    #: Use the alias specified in a class field instead of the field/attribute name itself.
+    #: This currently affects Pydantic models only.
+    #: See https://docs.pydantic.dev/dev/api/fields/#pydantic.fields.Field
+    USE_FIELD_ALIAS = enum.auto()
+
+    #: TypedDict marked with ``total=False`` are valid structures when a field is missing. When of the field is also
+    # optional, we need to have a way to distinguish between a `None` and a non-set field. With this option, the type
+    # of each field is extended with `string`. This way, clients can add markers (e.g., `__td_missing__`) to discern
+    # the two cases.
+    MARK_NON_TOTAL_TYPED_DICTS = enum.auto()
+
+    #: Adds a _runtime_type field to the record schemas that contains the name of the class
+    ADD_RUNTIME_TYPE_FIELD = enum.auto()
+
+    #: Add an __id field to records to track the id of mutable objects
+    ADD_REFERENCE_ID = enum.auto()
+
+    # Use deterministic default values for volatile types like datetime or strings like UUIDs. Non-deterministic
+    # factories might a problem when comparing schemas, as they change every time a schema is generated by definition.
+    DETERMINISTIC_DEFAULTS = enum.auto()
+
+    #: Wraps lists and maps into a record type
+    WRAP_INTO_RECORDS = enum.auto()
+
+
+JSON_OPTIONS = [opt for opt in Option if opt.name and opt.name.startswith("JSON_")]
+
+RENDER_OPTIONS = (
+    Option.JSON_INDENT_2
+    | Option.JSON_SORT_KEYS
+    | Option.JSON_APPEND_NEWLINE
+    | Option.INT_32
+    | Option.FLOAT_32
+    | Option.MILLISECONDS
+    | Option.LOGICAL_JSON_STRING
+    | Option.NO_DOC
+    | Option.ADD_RUNTIME_TYPE_FIELD
+    | Option.ADD_REFERENCE_ID
+    | Option.WRAP_INTO_RECORDS
+)
+"""
+Options which affect rendering schema data only, not building the tree of schema objects
+
+Built-in schema classes consider these options only when rendering schema data or default values, not in ``__init__``.
+This way, a tree of schema objects is built once and rendered with different combinations of these options. Trees with
+schema classes registered by users are built with all options instead, as such classes may consider any option in
+``__init__``.
+"""
@@ -0,0 +1,578 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Decoders of data written with another schema than the schema of a Python type
+
+See https://avro.apache.org/docs/1.11.1/specification/#schema-resolution. The writer's schema is resolved against the
+schema objects of the reader's Python type once, and the resolution is compiled into a decoder: writer fields are read
+into the matching reader fields, by name or alias, in the writer's order; writer fields unknown to the reader are
+skipped without decoding them; reader fields missing from the writer take their default values; numbers are promoted
+and unknown enum symbols are read as the reader's default symbol.
+"""
+
+import copy
+import dataclasses
+import functools
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import orjson
+
+import py_avro_schema
+from py_avro_schema import _binary, _decoder
+from py_avro_schema._alias import get_aliases, is_opaque
+from py_avro_schema._cache import TypeCache
+from py_avro_schema._decoder import Data, Reader
+from py_avro_schema._encoder import (
+    _Compiler,
+    missing_marker,
+    record_annotations,
+    record_attributes,
+    resolve_name,
+)
+from py_avro_schema._fingerprint import (
+    _logical_type_attributes,
+    canonical_schema_data,
+    crc_64_avro,
+    resolution_form,
+)
+from py_avro_schema._options import Option
+from py_avro_schema._schemas import (
+    TD_MISSING_MARKER,
+    DataclassSchema,
+    DictSchema,
+    EnumSchema,
+    FinalSchema,
+    ForwardSchema,
+    LiteralSchema,
+    NamesRegistry,
+    PydanticSchema,
+    RecordSchema,
+    Schema,
+    SequenceSchema,
+    TypeNotSupportedError,
+    UnionSchema,
+    _type_from_annotated,
+    root_schema_obj,
+)
+
+Skipper = Callable[[memoryview, int], int]
+"""Function skipping a value in Avro binary encoding in a buffer at a position, returning the next position"""
+
+_FIXED_SIZES = {"null": 0, "boolean": 1, "float": 4, "double": 8}
+
+_SAME_ENCODING = {("int", "long"), ("string", "bytes"), ("bytes", "string")}
+"""Promotions of writer to reader types with the same binary encoding"""
+
+_TO_FLOAT = {("int", "float"), ("int", "double"), ("long", "float"), ("long", "double"), ("float", "double")}
+"""Promotions of writer to reader types converting values to floats"""
+
+_MILLIS_OR_MICROS = [{"timestamp-millis", "timestamp-micros"}, {"time-millis", "time-micros"}]
+"""Logical types read as the same Python values, in milli- or microseconds depending on ``Option.MILLISECONDS``"""
+
+_DECODERS = TypeCache(values_on_class=True)
+"""Compiled decoders by reader Python type and fingerprint of the writer's schema with logical types"""
+
+
+def resolving_decoder(
+    writer_schema: Union[str, bytes, Any],
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Callable[[Data], Any]:
+    """
+    Return a function decoding instances of a Python type from data written with another Avro schema
+
+    The writer's schema is resolved against the schema for the Python type as per the Avro specification: fields are
+    matched by name or alias, writer fields unknown to the Python type are skipped, missing fields take their default
+    values, numbers are promoted to wider types and enum symbols unknown to the Python type are read as its first
+    member. Logical types must match, except that timestamps and times are converted between milli- and microseconds.
+    Decoders are cached by Python type and the fingerprint of the writer's schema including logical types. If the
+    writer's schema is the schema for the Python type, this returns the decoder returned by
+    :func:`py_avro_schema.decoder`.
+
+    :param writer_schema: The schema the data was written with, as JSON or as parsed JSON data.
+    :param py_type:       The Python class to decode instances of.
+    :param namespace:     The Avro namespace to add to the schema for the Python type.
+    :param options:       Schema generation options as defined by :class:`Option` enum values.
+    :raises ValueError: If the writer's schema cannot be resolved against the schema for the Python type.
+    :raises TypeNotSupportedError: If values of a type used by the schema cannot be decoded.
+    """
+    if isinstance(writer_schema, (str, bytes)):
+        writer_schema = orjson.loads(writer_schema)
+    # Parsing Canonical Form with logical types, which the canonical form alone drops
+    writer_form = orjson.dumps(canonical_schema_data(writer_schema, logical_types=True))
+    key = (crc_64_avro(writer_form), namespace, options)
+    try:
+        decode = _DECODERS.get(py_type, key)
+    except TypeError:  # Unhashable type hint
+        return _compile(writer_form, py_type, namespace, options)
+    if decode is None:
+        decode = _compile(writer_form, py_type, namespace, options)
+        _DECODERS.set(py_type, key, decode)
+    return decode
+
+
+resolving_decoder.cache_info = _DECODERS.info  # type: ignore
+resolving_decoder.cache_clear = _DECODERS.clear  # type: ignore
+
+
+def _compile(writer_form: bytes, py_type: Any, namespace: Optional[str], options: Option) -> Callable[[Data], Any]:
+    """
+    Return the decoder for data written with a schema into a Python type
+
+    :param writer_form: The writer's schema in Parsing Canonical Form with logical types.
+    """
+    if writer_form == resolution_form(py_type, namespace=namespace, options=options):
+        return py_avro_schema.decoder(py_type, namespace=namespace, options=options)
+    if Option.WRAP_INTO_RECORDS in options:
+        raise TypeNotSupportedError("Schema resolution is not supported with Option.WRAP_INTO_RECORDS")
+    reader_schema = root_schema_obj(py_type, namespace=namespace, options=options)
+    resolver = _Resolver(orjson.loads(writer_form), reader_schema)
+    return _decoder.whole_data_decoder(resolver.resolve(resolver.writer_schema, reader_schema))
+
+
+class _Resolver:
+    """State for resolving a writer's schema against a tree of reader schema objects"""
+
+    def __init__(self, writer_schema: Any, reader_schema: Schema):
+        """State for resolving a writer's schema against a tree of reader schema objects"""
+        self.writer_schema = writer_schema
+        #: Writer's named schemas by full name
+        self.writer_named: Dict[str, Dict[str, Any]] = _writer_named(writer_schema)
+        #: Reader's named schema objects by full name, to resolve forward references
+        self.reader_named: Dict[str, Schema] = _reader_named(reader_schema)
+        #: Readers of writer records by writer full name and reader schema object id, for recursive schemas
+        self.records: Dict[Tuple[str, int], Reader] = {}
+        #: Skippers of writer records by full name, for recursive schemas
+        self.skippers: Dict[str, Skipper] = {}
+        #: Namespaces of the reader records being resolved, innermost last, to resolve names without namespace
+        self.namespaces: List[Optional[str]] = []
+        self.leaf_compiler = _Compiler(_decoder._compile)
+
+    def resolve(self, writer: Any, reader: Schema) -> Reader:
+        """
+        Return the reader of values written with a writer's schema into a reader schema object
+
+        :raises ValueError: If the schemas do not match.
+        """
+        writer = self.writer_named.get(writer, writer) if isinstance(writer, str) else writer
+        reader = self.unwrap(reader)
+        if isinstance(writer, list):
+            return self._writer_union(writer, reader)
+        if isinstance(reader, UnionSchema):
+            return self._reader_union(writer, reader)
+        writer_type = writer if isinstance(writer, str) else writer["type"]
+        if isinstance(reader, RecordSchema):
+            self._check(writer_type == "record" and self._same_name(writer["name"], reader), writer, reader)
+            return self._record(writer, reader)
+        if isinstance(reader, EnumSchema) and reader._is_valid_enum():
+            self._check(writer_type == "enum" and self._same_name(writer["name"], reader), writer, reader)
+            return self._enum(writer, reader)
+        if isinstance(reader, SequenceSchema):
+            self._check(writer_type == "array", writer, reader)
+            return _decoder.array_reader(
+                self.resolve(writer["items"], reader.items_schema), _decoder.sequence_class(reader)
+            )
+        if isinstance(reader, DictSchema):
+            self._check(writer_type == "map", writer, reader)
+            return _decoder.map_reader(
+                self.resolve(writer["values"], reader.values_schema), _decoder.map_key_class(reader)
+            )
+        return self._leaf(writer, writer_type, reader)
+
+    def unwrap(self, reader: Schema) -> Schema:
+        """Return the schema object values are read with, following references and wrapping schema objects"""
+        while True:
+            if isinstance(reader, LiteralSchema):
+                reader = reader.literal_value_schema
+            elif isinstance(reader, FinalSchema):
+                reader = reader.real_schema
+            elif isinstance(reader, ForwardSchema):
+                name = reader.data(names=NamesRegistry())
+                named = resolve_name(self.reader_named, name, self.namespaces[-1] if self.namespaces else None)
+                if named is None:
+                    raise TypeNotSupportedError(f"Cannot compile values of unknown named schema {name!r}")
+                reader = named
+            else:
+                return reader
+
+    def _matches(self, writer: Any, reader: Schema, exact: bool) -> bool:
+        """Whether values written with a writer's schema can be read into a reader schema object"""
+        writer = self.writer_named.get(writer, writer) if isinstance(writer, str) else writer
+        reader = self.unwrap(reader)
+        writer_type = "union" if isinstance(writer, list) else writer if isinstance(writer, str) else writer["type"]
+        if isinstance(reader, UnionSchema):
+            return False
+        if isinstance(reader, RecordSchema):
+            return writer_type == "record" and self._same_name(writer["name"], reader, exact)
+        if isinstance(reader, EnumSchema) and reader._is_valid_enum():
+            return writer_type == "enum" and self._same_name(writer["name"], reader, exact)
+        if isinstance(reader, SequenceSchema):
+            return writer_type == "array"
+        if isinstance(reader, DictSchema):
+            return writer_type == "map"
+        reader_type = _decoder._primitive_type(reader)
+        if writer_type != reader_type and (
+            exact or ((writer_type, reader_type) not in _SAME_ENCODING and (writer_type, reader_type) not in _TO_FLOAT)
+        ):
+            return False
+        return self._logical_reader(writer, reader) is not None
+
+    @staticmethod
+    def _same_name(writer_name: str, reader: Schema, exact: bool = False) -> bool:
+        """
+        Whether a writer's named schema matches a named reader schema object by full name, alias or, unless exact, by
+        name without namespace
+        """
+        reader_fullname: str = reader.fullname  # type: ignore
+        names = {reader_fullname, *get_aliases(reader_fullname)}
+        if writer_name in names:
+            return True
+        return not exact and writer_name.rpartition(".")[2] == reader_fullname.rpartition(".")[2]
+
+    @staticmethod
+    def _check(matches: bool, writer: Any, reader: Schema) -> None:
+        """Raise an error if a writer's schema does not match a reader schema object"""
+        if not matches:
+            raise ValueError(_mismatch(writer, reader))
+
+    def _writer_union(self, writer: List[Any], reader: Schema) -> Reader:
+        """Return the reader of a union, resolving each branch written against the reader schema object"""
+        branches = []
+        for item in writer:
+            try:
+                branches.append(self.resolve(item, reader))
+            except ValueError as e:  # Fails when reading data of this branch only
+                branches.append(functools.partial(_raise, str(e)))
+        read_long = _binary.read_long
+
+        def read_union(buf: memoryview, pos: int) -> Tuple[Any, int]:
+            """Read the index of a union branch followed by the value"""
+            index, pos = read_long(buf, pos)
+            if not 0 <= index < len(branches):
+                raise ValueError(f"Invalid Avro data: {index} is not a branch index of the writer's union")
+            return branches[index](buf, pos)
+
+        return read_union
+
+    def _reader_union(self, writer: Any, reader: UnionSchema) -> Reader:
+        """
+        Return the reader of a value into the first branch of a reader union matching the writer's schema
+
+        :raises ValueError: If a writer's named schema matches several branches by name without namespace only.
+        """
+        groups: Dict[int, List[Schema]] = {}
+        for item_schema, index in zip(reader.item_schemas, reader.branch_indexes()):
+            groups.setdefault(index, []).append(item_schema)
+        for exact in (True, False):  # Prefer branches not requiring promotions
+            matching = [group for group in groups.values() if self._matches(writer, group[0], exact)]
+            if not matching:
+                continue
+            named = self.writer_named.get(writer, writer) if isinstance(writer, str) else writer
+            if not exact and len(matching) > 1 and isinstance(named, dict) and named["type"] in ("record", "enum"):
+                fullnames = ", ".join(self.unwrap(group[0]).fullname for group in matching)  # type: ignore
+                raise ValueError(f"Writer's schema {named['name']!r} matches several union branches: {fullnames}")
+            group = matching[0]
+            if len(group) > 1:  # String enums rendered as strings sharing a branch with strings
+                return _decoder._branch_reader(group, self.leaf_compiler)
+            return self.resolve(writer, group[0])
+        raise ValueError(_mismatch(writer, reader))
+
+    def _leaf(self, writer: Any, writer_type: str, reader: Schema) -> Reader:
+        """Return the reader of a value into a schema object rendered as a primitive or fixed schema"""
+        logical_reader = self._logical_reader(writer, reader)
+        if logical_reader is None:
+            raise ValueError(_mismatch(writer, reader))
+        reader = logical_reader
+        reader_type = _decoder._primitive_type(reader)
+        if writer_type == "fixed":
+            reader_data: Any = reader.data(names=NamesRegistry())
+            self._check(reader_type == "fixed" and writer["size"] == reader_data["size"], writer, reader)
+        elif (writer_type, reader_type) in _TO_FLOAT:
+            read_number = _decoder._PRIMITIVE_READERS[writer_type]
+
+            def read_promoted(buf: memoryview, pos: int) -> Tuple[float, int]:
+                """Read a number as a float"""
+                value, pos = read_number(buf, pos)
+                return float(value), pos
+
+            return read_promoted
+        else:
+            self._check(writer_type == reader_type or (writer_type, reader_type) in _SAME_ENCODING, writer, reader)
+        return self.leaf_compiler.compile(reader)
+
+    @staticmethod
+    def _logical_reader(writer: Any, reader: Schema) -> Optional[Schema]:
+        """
+        Return the schema object to read values of a writer's logical type into, None if the logical types differ
+
+        Readers without logical type read the underlying values. Timestamps and times are read as milli- or
+        microseconds like the writer's, using a copy of the reader's schema object with ``Option.MILLISECONDS`` toggled.
+        """
+        reader_data: Any = reader.data(names=NamesRegistry())
+        reader_logical = _logical_type_attributes(reader_data) if isinstance(reader_data, dict) else {}
+        writer_logical = _logical_type_attributes(writer) if isinstance(writer, dict) else {}
+        if not reader_logical or writer_logical == reader_logical:
+            return reader
+        logical_types = {writer_logical.get("logicalType"), reader_logical["logicalType"]}
+        if logical_types in _MILLIS_OR_MICROS:
+            converting = copy.copy(reader)
+            converting.options = reader.options ^ Option.MILLISECONDS
+            return converting
+        if logical_types == {"decimal"}:  # Same scale and no loss of precision
+            precision_ok = writer_logical["precision"] <= reader_logical["precision"]
+            return reader if precision_ok and writer_logical["scale"] == reader_logical["scale"] else None
+        return None
+
+    def _enum(self, writer: Dict[str, Any], reader: EnumSchema) -> Reader:
+        """Return the reader of an enum, reading symbols unknown to the reader as its default, first, member"""
+        members = {member.value: member for member in _type_from_annotated(reader.py_type)}
+        default = next(iter(members.values()))
+        by_index = [members.get(symbol, default) for symbol in writer["symbols"]]
+        read_int = _binary.read_int
+
+        def read_enum(buf: memoryview, pos: int) -> Tuple[Any, int]:
+            """Read an enum member from the index of its symbol in the writer's schema"""
+            index, pos = read_int(buf, pos)
+            if not 0 <= index < len(by_index):
+                raise ValueError(f"Invalid Avro data: {index} is not a symbol index of {writer['name']}")
+            return by_index[index], pos
+
+        return read_enum
+
+    def _record(self, writer: Dict[str, Any], reader: RecordSchema) -> Reader:
+        """Return the reader of a record, reading fields in the writer's order and skipping unknown fields"""
+        key = (writer["name"], id(reader))
+        if key in self.records:
+            return self.records[key]
+        steps: List[Tuple[Optional[str], Any]] = []  # Attribute name and reader, or None and skipper
+        defaults: Dict[str, Any] = {}
+        build = _decoder.record_builder(reader)
+
+        def read_record(buf: memoryview, pos: int) -> Tuple[Any, int]:
+            """Read the fields of a record in the writer's order and build the reader's Python instance"""
+            values = dict(defaults)
+            for attr, step in steps:
+                if attr is None:
+                    pos = step(buf, pos)
+                else:
+                    values[attr], pos = step(buf, pos)
+            return build(values), pos
+
+        self.records[key] = read_record
+        reader_fields: Dict[str, Tuple[str, Any, Any]] = {}
+        for attr, annotation, field in zip(record_attributes(reader), record_annotations(reader), reader.record_fields):
+            for name in (field.name, *field.aliases):
+                reader_fields.setdefault(name, (attr, annotation, field))
+        read_fields: Set[str] = set()
+        self.namespaces.append(reader.namespace)
+        try:
+            for writer_field in writer["fields"]:
+                match = reader_fields.get(writer_field["name"])
+                if match is None or match[0] in read_fields:
+                    steps.append((None, self.skipper(writer_field["type"])))
+                    continue
+                attr, annotation, field = match
+                read_fields.add(attr)
+                if is_opaque(annotation):  # Read from a JSON string
+                    matches = self._matches(writer_field["type"], field.schema, exact=False)
+                    self._check(matches, writer_field["type"], field.schema)
+                    steps.append((attr, _decoder._read_opaque))
+                else:
+                    steps.append((attr, self.resolve(writer_field["type"], field.schema)))
+        finally:
+            self.namespaces.pop()
+        for attr, field in zip(record_attributes(reader), reader.record_fields):
+            if attr not in read_fields:
+                defaults.update(self._default(attr, field, reader))
+        steps[:] = _merge_skips(steps)
+        return read_record
+
+    @staticmethod
+    def _default(attr: str, field: Any, reader: RecordSchema) -> Dict[str, Any]:
+        """Return the default value of a reader field not written, unless set when building the instance"""
+        if field.default is dataclasses.MISSING:
+            raise ValueError(f"Field {field.name!r} of {reader.py_type} is not written and has no default value")
+        if isinstance(reader, (DataclassSchema, PydanticSchema)):
+            return {}  # Set by the constructor, calling any default factory
+        if field.default == TD_MISSING_MARKER:
+            return {attr: missing_marker(field.schema)}  # Removed when building the TypedDict
+        return {attr: field.default}
+
+    def skipper(self, writer: Any) -> Skipper:
+        """Return the skipper of values written with a writer's schema"""
+        if isinstance(writer, str) and writer in self.writer_named:
+            if writer in self.skippers:
+                return self.skippers[writer]
+            writer = self.writer_named[writer]
+        size = self._fixed_size(writer, set())
+        if size is not None:
+            return functools.partial(_binary.skip_fixed, size)
+        if isinstance(writer, list):
+            return _union_skipper([self.skipper(item) for item in writer])
+        writer_type = writer if isinstance(writer, str) else writer["type"]
+        if writer_type in ("int", "long", "enum"):
+            return _binary.skip_long
+        if writer_type in ("string", "bytes"):
+            return _binary.skip_bytes
+        if writer_type == "array":
+            return _blocks_skipper(self.skipper(writer["items"]))
+        if writer_type == "map":
+            return _blocks_skipper(self.skipper(writer["values"]), key=True)
+        skips: List[Tuple[Optional[str], Any]] = []
+
+        def skip_record(buf: memoryview, pos: int) -> int:
+            """Skip the fields of a record"""
+            for _, skip in skips:
+                pos = skip(buf, pos)
+            return pos
+
+        self.skippers[writer["name"]] = skip_record
+        skips.extend(_merge_skips([(None, self.skipper(field["type"])) for field in writer["fields"]]))
+        return skip_record
+
+    def _fixed_size(self, writer: Any, seen: Set[str]) -> Optional[int]:
+        """Return the size of values written with a writer's schema if it is always the same, else None"""
+        if isinstance(writer, str):
+            if writer in _FIXED_SIZES:
+                return _FIXED_SIZES[writer]
+            if writer not in self.writer_named or writer in seen:
+                return None
+            writer = self.writer_named[writer]
+        if isinstance(writer, list):
+            return None
+        if writer["type"] in _FIXED_SIZES:  # Primitive with a logical type
+            return _FIXED_SIZES[writer["type"]]
+        if writer["type"] == "fixed":
+            return writer["size"]
+        if writer["type"] == "record":
+            seen = seen | {writer["name"]}
+            sizes = [self._fixed_size(field["type"], seen) for field in writer["fields"]]
+            return None if None in sizes else sum(sizes)  # type: ignore
+        return None
+
+
+def _writer_named(writer_schema: Any) -> Dict[str, Dict[str, Any]]:
+    """Return the named schemas defined in a schema in Parsing Canonical Form with logical types, by full name"""
+    named = {}
+    stack = [writer_schema]
+    while stack:
+        data = stack.pop()
+        if isinstance(data, list):
+            stack.extend(data)
+        elif isinstance(data, dict):
+            if "name" in data:
+                named[data["name"]] = data
+            stack.extend(field["type"] for field in data.get("fields", ()))
+            stack.extend(data[key] for key in ("items", "values") if key in data)
+    return named
+
+
+def _reader_named(reader_schema: Schema) -> Dict[str, Schema]:
+    """Return the named schema objects in a tree of schema objects, by full name"""
+    named: Dict[str, Schema] = {}
+    seen: Set[int] = set()
+    stack = [reader_schema]
+    while stack:
+        schema_obj = stack.pop()
+        if id(schema_obj) in seen:
+            continue
+        seen.add(id(schema_obj))
+        if isinstance(schema_obj, (RecordSchema, EnumSchema)):
+            named.setdefault(schema_obj.fullname, schema_obj)
+        if isinstance(schema_obj, RecordSchema):
+            stack.extend(field.schema for field in schema_obj.record_fields)
+        elif isinstance(schema_obj, SequenceSchema):
+            stack.append(schema_obj.items_schema)
+        elif isinstance(schema_obj, DictSchema):
+            stack.append(schema_obj.values_schema)
+        elif isinstance(schema_obj, UnionSchema):
+            stack.extend(schema_obj.item_schemas)
+        elif isinstance(schema_obj, LiteralSchema):
+            stack.append(schema_obj.literal_value_schema)
+        elif isinstance(schema_obj, FinalSchema):
+            stack.append(schema_obj.real_schema)
+    return named
+
+
+def _mismatch(writer: Any, reader: Schema) -> str:
+    """Return the error message for a writer's schema not matching a reader schema object"""
+    writer_json = orjson.dumps(writer).decode()
+    if len(writer_json) > 100:
+        writer_json = writer_json[:97] + "..."
+    return f"Cannot read data written with schema {writer_json} as {reader.py_type}"
+
+
+def _raise(message: str, buf: memoryview, pos: int) -> Tuple[Any, int]:
+    """Raise an error when reading a value written with a schema not matching the reader's schema"""
+    raise ValueError(message)
+
+
+def _merge_skips(steps: List[Tuple[Optional[str], Any]]) -> List[Tuple[Optional[str], Any]]:
+    """Merge consecutive skips of values of fixed size into a single skip, dropping skips of nothing"""
+    merged: List[Tuple[Optional[str], Any]] = []
+    for attr, step in steps:
+        size = _skipped_size(step) if attr is None else None
+        if size == 0:
+            continue
+        previous_size = _skipped_size(merged[-1][1]) if merged and merged[-1][0] is None else None
+        if size is not None and previous_size is not None:
+            merged[-1] = (None, functools.partial(_binary.skip_fixed, previous_size + size))
+        else:
+            merged.append((attr, step))
+    return merged
+
+
+def _skipped_size(skip: Any) -> Optional[int]:
+    """Return the number of bytes a skipper skips if always the same, else None"""
+    if isinstance(skip, functools.partial) and skip.func is _binary.skip_fixed:
+        return skip.args[0]
+    return None
+
+
+def _union_skipper(skippers: List[Skipper]) -> Skipper:
+    """Return the skipper of a union given the skippers of its branches"""
+    read_long = _binary.read_long
+
+    def skip_union(buf: memoryview, pos: int) -> int:
+        """Skip the index of a union branch and the value"""
+        index, pos = read_long(buf, pos)
+        if not 0 <= index < len(skippers):
+            raise ValueError(f"Invalid Avro data: {index} is not a branch index of the writer's union")
+        return skippers[index](buf, pos)
+
+    return skip_union
+
+
+def _blocks_skipper(skip_item: Skipper, key: bool = False) -> Skipper:
+    """Return the skipper of an array, or of a map if keys precede items, skipping blocks with a known size at once"""
+    read_long = _binary.read_long
+    skip_bytes = _binary.skip_bytes
+
+    def skip_blocks(buf: memoryview, pos: int) -> int:
+        """Skip blocks of items until an empty block"""
+        count, pos = read_long(buf, pos)
+        while count:
+            if count < 0:  # Block size in bytes follows the negated count
+                size, pos = read_long(buf, pos)
+                pos = _binary.skip_fixed(size, buf, pos)
+            else:
+                for _ in range(count):
+                    if key:
+                        pos = skip_bytes(buf, pos)
+                    pos = skip_item(buf, pos)
+            count, pos = read_long(buf, pos)
+        return pos
+
+    return skip_blocks
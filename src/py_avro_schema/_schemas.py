@@ -17,24 +17,33 @@ Module to generate Avro schemas for Python types/classes
 from __future__ import annotations
 
 import abc
+import bisect
 import collections.abc
+import copy
 import dataclasses
 import datetime
 import decimal
 import enum
 import inspect
+import itertools
 import re
 import sys
+import threading
 import types
 import uuid
+import weakref
 from enum import StrEnum
 from typing import (
     TYPE_CHECKING,
     Annotated,
     Any,
+    Callable,
     Dict,
     Final,
     ForwardRef,
+    Generator,
+    Iterable,
+    Iterator,
     List,
     Literal,
     NotRequired,
@@ -44,15 +53,16 @@ from typing import (
     Union,
     get_args,
     get_origin,
-    get_type_hints,
 )
 
-import more_itertools
 import orjson
-import typeguard
 
 import py_avro_schema._typing
 from py_avro_schema._alias import get_aliases, get_field_aliases_and_actual_type
+from py_avro_schema._cache import TypeCache, cached, invalidate_caches
+from py_avro_schema._options import RENDER_OPTIONS, Option
+from py_avro_schema._type_hints import raw_annotations, type_hints
+from py_avro_schema._validators import compile_validator
 
 if TYPE_CHECKING:
     # Pydantic not necessarily required at runtime
@@ -69,7 +79,63 @@ JSONObj = Dict[str, Any]
 JSONArray = List[Any]
 JSONType = Union[JSONStr, JSONObj, JSONArray]
 
-NamesType = List[str]
+
+class NamesRegistry:
+    """
+    Avro schema names defined so far when rendering schema data, in order of definition
+
+    Named schemas are defined once only and referenced by name thereafter. Unlike a list, checking whether a name has
+    been defined takes constant time, such that rendering schemas with many named types does not take quadratic time.
+    """
+
+    __slots__ = ("_names",)
+
+    def __init__(self, names: Iterable[str] = ()):
+        """
+        A registry of Avro schema names
+
+        :param names: Names defined previously.
+        """
+        self._names: Dict[str, None] = dict.fromkeys(names)  # Dicts are ordered, unlike sets
+
+    def __contains__(self, name: object) -> bool:
+        """Whether a name has been defined"""
+        return name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the names in order of definition"""
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        """Return the number of names"""
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        """Return a string representation of the registry"""
+        return f"{type(self).__name__}({list(self._names)!r})"
+
+    def append(self, name: str) -> None:
+        """Add a name, like :meth:`list.append`"""
+        self._names[name] = None
+
+
+NamesType = Union[NamesRegistry, List[str]]
+"""Names defined so far when rendering schema data: a :class:`NamesRegistry` or, for backward compatibility, a list"""
+
+DataSteps = Generator["Schema", JSONType, JSONType]
+"""Generator yielding child schema objects to render, each sent back as its schema data, returning the schema data"""
+
+
+def _render_data(schema_obj: Any, names: NamesType) -> JSONType:
+    """
+    Return the schema data of a schema object, rendering its child schema objects without recursion
+
+    Schema classes with child schemas implement ``data`` as ``data = _render_data`` and an ``_iter_data(names)``
+    generator, yielding child schema objects and receiving their schema data. Deeply nested schemas are then rendered
+    without being limited by Python's recursion limit.
+    """
+    return _with_names_registry(names, lambda registry: _render(schema_obj._iter_data(registry), registry))
+
 
 RUNTIME_TYPE_KEY = "_runtime_type"
 REF_ID_KEY = "__id"
@@ -104,85 +170,21 @@ class TypeNotSupportedError(TypeError):
     """Error raised when a Avro schema cannot be generated for a given Python type"""
 
 
-class Option(enum.Flag):
-    """
-    Schema generation options
-
-    Options can be passed in to the function :func:`py_avro_schema.generate`. Multiple values are specified like this::
-
-       Option.INT_32 | Option.FLOAT_32
-    """
-
-    #: Format JSON data using 2 spaces indentation
-    JSON_INDENT_2 = orjson.OPT_INDENT_2
-
-    #: Sort keys in JSON data
-
-    JSON_SORT_KEYS = orjson.OPT_SORT_KEYS
-
-    #: Append a newline character at the end of the JSON data
-    JSON_APPEND_NEWLINE = orjson.OPT_APPEND_NEWLINE  # type: ignore
-
-    #: Use ``int`` schemas (32-bit) instead of ``long`` schemas (64-bit) for Python :class:`int`.
-    INT_32 = enum.auto()
+_SCHEMA_CLASSES: List[Type[Schema]] = []
+"""Registered schema classes, kept sorted by priority (and registration order within the same priority)"""
 
-    #: Use ``float`` schemas (32-bit) instead of ``double`` schemas (64-bit) for Python class :class:`float`.
-    FLOAT_32 = enum.auto()
+_DISPATCH_BY_CLASS: weakref.WeakKeyDictionary[type, Type[Schema]] = weakref.WeakKeyDictionary()
+"""Schema class resolved for a plain Python class. Weak keys so that dynamically created classes can be collected."""
 
-    #: Use milliseconds instead of microseconds precision for (date)time schemas
-    MILLISECONDS = enum.auto()
+_DISPATCH_BY_KEY: Dict[Any, Type[Schema]] = {}
+"""Schema class resolved for any other type hint (generic alias, ``Annotated``, forward reference etc.)"""
 
-    #: Mandate default values to be specified for all dataclass fields. This option may be used to enforce default
-    #: values on Avro record fields to support schema evolution/resolution.
-    DEFAULTS_MANDATORY = enum.auto()
+_DISPATCH_BY_KEY_MAXSIZE = 4096
 
-    #: Model ``Dict[str, Any]`` fields as string schemas instead of byte schemas (with logical type ``json``, to support
-    #: JSON serialization inside Avro).
-    LOGICAL_JSON_STRING = enum.auto()
 
-    #: Do not populate namespaces automatically based on the package a Python class is defined in.
-    NO_AUTO_NAMESPACE = enum.auto()
-
-    #: Automatically populate namespaces using full (dotted) module names instead of top-level package names.
-    AUTO_NAMESPACE_MODULE = enum.auto()
-
-    #: Do not populate ``doc`` schema attributes based on Python docstrings
-    NO_DOC = enum.auto()
-
-    #: Use an alias specified as part of a class instead of the class name itself.
-    #: This currently affects Pydantic models only.
-    #: See https://docs.pydantic.dev/dev/api/config/#pydantic.config.ConfigDict.title
-    USE_CLASS_ALIAS = enum.auto()
-
-    #: Use the alias specified in a class field instead of the field/attribute name itself.
-    #: This currently affects Pydantic models only.
-    #: See https://docs.pydantic.dev/dev/api/fields/#pydantic.fields.Field
-    USE_FIELD_ALIAS = enum.auto()
-
-    #: TypedDict marked with ``total=False`` are valid structures when a field is missing. When of the field is also
-    # optional, we need to have a way to distinguish between a `None` and a non-set field. With this option, the type
-    # of each field is extended with `string`. This way, clients can add markers (e.g., `__td_missing__`) to discern
-    # the two cases.
-    MARK_NON_TOTAL_TYPED_DICTS = enum.auto()
-
-    #: Adds a _runtime_type field to the record schemas that contains the name of the class
-    ADD_RUNTIME_TYPE_FIELD = enum.auto()
-
-    #: Add an __id field to records to track the id of mutable objects
-    ADD_REFERENCE_ID = enum.auto()
-
-    # Use deterministic default values for volatile types like datetime or strings like UUIDs. Non-deterministic
-    # factories might a problem when comparing schemas, as they change every time a schema is generated by definition.
-    DETERMINISTIC_DEFAULTS = enum.auto()
-
-    #: Wraps lists and maps into a record type
-    WRAP_INTO_RECORDS = enum.auto()
-
-
-JSON_OPTIONS = [opt for opt in Option if opt.name and opt.name.startswith("JSON_")]
-
-
-_SCHEMA_CLASSES = []
+def _schema_priority(cls: type) -> int:
+    """Return the priority a schema class was registered with"""
+    return getattr(cls, "__py_avro_priority", 0)
 
 
 def register_schema(cls: type | None = None, *, priority: int = 0):
@@ -190,7 +192,8 @@ def register_schema(cls: type | None = None, *, priority: int = 0):
     Decorator to register a class as a known ``Schema``
     It also accept a priority value to sort the list of schemas. Default schemas have priority 0.
 
-    Schema classes are instantiated when calling ``schema``. Example use::
+    Schema classes are instantiated when calling ``schema``, receiving all options including render options like
+    ``Option.INT_32``. Example use::
 
       @register_schema
       class MySchema(Schema):
@@ -201,14 +204,24 @@ def register_schema(cls: type | None = None, *, priority: int = 0):
     """
 
     def _wrapper(_cls):
-        """Wrapper function to attach priority and sort the list of schemas."""
+        """Wrapper function to attach priority and insert the class in the sorted list of schemas."""
         _cls.__py_avro_priority = priority
-        _SCHEMA_CLASSES.append(_cls)
+        # Insert after any class with the same priority such that registration order is preserved
+        index = bisect.bisect_right(_SCHEMA_CLASSES, priority, key=_schema_priority)
+        _SCHEMA_CLASSES.insert(index, _cls)
+        _clear_dispatch_tables()
+        invalidate_caches()
         return _cls
 
     return _wrapper if not cls else _wrapper(cls)
 
 
+def _clear_dispatch_tables() -> None:
+    """Forget all previously resolved schema classes, e.g. because the registry changed"""
+    _DISPATCH_BY_CLASS.clear()
+    _DISPATCH_BY_KEY.clear()
+
+
 def schema(
     py_type: Type,
     namespace: Optional[str] = None,
@@ -223,30 +236,174 @@ def schema(
 
     :param py_type:   The type/class to generate the schema for.
     :param namespace: The Avro namespace to add to all named schemas.
-    :param names:     Sequence of Avro schema names to track previously defined named schemas.
+    :param names:     Registry or list of Avro schema names to track previously defined named schemas.
     :param options:   Schema generation options as defined by :class:`Option` enum values. Specify multiple values like
                       this: ``Option.INT_32 | Option.FLOAT_32``.
     """
-    if names is None:
-        names = []
-    schema_obj = _schema_obj(py_type, namespace=namespace, options=options, processing=processing)
-    schema_data = schema_obj.data(names=names)
-    return schema_data
+    if processing is None and getattr(_BUILD_STATE, "traversal", None) is None:
+        schema_obj = root_schema_obj(py_type, namespace=namespace, options=options)
+    else:
+        schema_obj = _schema_obj(py_type, namespace=namespace, options=options, processing=processing)
+    return _with_names_registry(names, schema_obj.data)
+
+
+def root_schema_obj(py_type: Type, namespace: Optional[str] = None, options: Option = Option(0)) -> Schema:
+    """
+    Return the tree of schema objects for a given Python type, like :func:`schema` uses to render the schema data
+
+    The tree is built once per namespace and build options and shared by all callers. It must not be modified.
+
+    :param py_type:   The type/class to return the schema objects for.
+    :param namespace: The Avro namespace to add to all named schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    """
+    tree = _schema_tree(py_type, namespace=namespace, options=options & ~RENDER_OPTIONS)
+    render_options = options & RENDER_OPTIONS
+    if not render_options:
+        return tree.root
+    if not tree.builtin_only:  # Schema classes registered by users may consider render options in ``__init__``
+        return _schema_tree(py_type, namespace=namespace, options=options).root
+    return tree.with_render_options(render_options)
+
+
+_SCHEMA_TREES = TypeCache(maxsize=128, values_on_class=True)
+"""
+Trees of schema objects built for a Python type, namespace and build options, to be rendered with any render options
+
+Trees of schema classes registered by users are also built with render options, which such classes may consider in
+``__init__``. Schema objects reference their Python types, hence trees are stored on the classes themselves.
+"""
+
+
+def _schema_tree(py_type: Type, namespace: Optional[str], options: Option) -> _SchemaTree:
+    """Return the cached tree of schema objects for a given Python type, building it if required"""
+    key = (namespace, options)
+    try:
+        tree = _SCHEMA_TREES.get(py_type, key)
+    except TypeError:  # Unhashable type hint
+        return _build_tree(py_type, namespace=namespace, options=options)
+    if tree is None:
+        tree = _build_tree(py_type, namespace=namespace, options=options)
+        _SCHEMA_TREES.set(py_type, key, tree)
+    return tree
+
+
+class _SchemaTree:
+    """
+    A tree of schema objects, which can be copied cheaply to render it with additional render options
+
+    The tree is walked once to find all schema objects and record fields and the attributes linking them. Copies are
+    then made without walking the tree again.
+    """
+
+    def __init__(self, root: Schema, builtin_only: bool = True):
+        """
+        A tree of schema objects
+
+        :param root:         The root schema object.
+        :param builtin_only: Whether all schema objects are instances of built-in schema classes.
+        """
+        self.root = root
+        self.builtin_only = builtin_only
+        self._nodes: Optional[List[Any]] = None  # Schema objects and record fields, the root first
+        self._links: List[Tuple[int, str, Union[int, List[Tuple[bool, Any]]]]] = []  # Node index, attribute, target
+        self._lock = threading.Lock()
+
+    def with_render_options(self, render_options: Option) -> Schema:
+        """
+        Return a copy of the tree with additional render options
+
+        Schema objects and record fields are copied shallowly, sharing everything else with the original tree. Schema
+        objects referenced more than once are copied once.
+        """
+        with self._lock:
+            if self._nodes is None:
+                self._find_nodes()
+        assert self._nodes is not None
+        combined_options: Dict[Option, Option] = {}
+        copies = []
+        for node in self._nodes:
+            node_class = type(node)
+            if isinstance(node, Schema) and node_class.__new__ is not Schema.__new__:
+                copied = node.__copy__()  # Schema class with its own ``__new__``
+            else:
+                copied = object.__new__(node_class)
+                copied.__dict__.update(node.__dict__)
+            node_options = node.options
+            options = combined_options.get(node_options)
+            if options is None:
+                options = combined_options[node_options] = node_options | render_options
+            copied.options = options
+            copies.append(copied)
+        for index, attr, target in self._links:
+            if isinstance(target, int):
+                copies[index].__dict__[attr] = copies[target]
+            else:
+                copies[index].__dict__[attr] = [copies[item] if is_node else item for is_node, item in target]
+        return copies[0]
+
+    def _find_nodes(self) -> None:
+        """Walk the tree once, indexing the schema objects and record fields and the attributes linking them"""
+        nodes: List[Any] = []
+        indexes: Dict[int, int] = {}
+
+        def _index(node: Any) -> int:
+            """Return the index of a node, adding it if new"""
+            index = indexes.get(id(node))
+            if index is None:
+                index = indexes[id(node)] = len(nodes)
+                nodes.append(node)
+            return index
+
+        _index(self.root)
+        position = 0
+        while position < len(nodes):  # Nodes are appended whilst iterating
+            for attr, value in nodes[position].__dict__.items():
+                if isinstance(value, (Schema, RecordField)):
+                    self._links.append((position, attr, _index(value)))
+                elif isinstance(value, list) and any(isinstance(item, (Schema, RecordField)) for item in value):
+                    target = [
+                        (True, _index(item)) if isinstance(item, (Schema, RecordField)) else (False, item)
+                        for item in value
+                    ]
+                    self._links.append((position, attr, target))
+            position += 1
+        self._nodes = nodes
 
 
 def _fullname_for_forward_ref(py_type: Type, namespace: Optional[str], options: Option) -> str:
     """Computes the fully-qualified name to be used in a ForwardRef ot break cycles."""
     name = py_type.__name__
-    if namespace is None and Option.NO_AUTO_NAMESPACE not in options:
-        module = inspect.getmodule(py_type)
-        if module and module.__name__ != "builtin":
-            if Option.AUTO_NAMESPACE_MODULE in options:
-                namespace = module.__name__
-            else:
-                namespace = module.__name__.split(".", 1)[0]
+    namespace = _resolve_namespace(py_type, namespace, options)
     return f"{namespace}.{name}" if namespace else name
 
 
+def _resolve_namespace(py_type: Any, namespace: Optional[str], options: Option) -> Optional[str]:
+    """Return the namespace for a Python type, taking into account auto-namespace options and any override"""
+    if namespace is None and Option.NO_AUTO_NAMESPACE not in options:
+        return _auto_namespace(py_type, full_module=Option.AUTO_NAMESPACE_MODULE in options)
+    return namespace
+
+
+@cached()
+def _auto_namespace(py_type: Any, *, full_module: bool) -> Optional[str]:
+    """
+    Return the namespace derived from the module a Python type is defined in, if any
+
+    Finding a type's module is slow, hence this is computed once per type.
+
+    :param py_type:     The Python type.
+    :param full_module: Whether to use the full (dotted) module name instead of the top-level package name.
+    """
+    module = inspect.getmodule(py_type)
+    if module and module.__name__ != "builtin":
+        if full_module:
+            return module.__name__
+        else:
+            return module.__name__.split(".", 1)[0]  # top-level package
+    return None
+
+
 def _schema_obj(
     py_type: Type,
     namespace: Optional[str] = None,
@@ -256,24 +413,365 @@ def _schema_obj(
     """
     Dispatch to relevant schema classes
 
+    The tree of schema objects is built without recursion. Calls made whilst building a schema object of a built-in
+    schema class, typically from its ``__init__``, return the child schema object immediately but initialize it only
+    once the calling schema object's ``__init__`` has returned. Any other caller, including schema classes registered by
+    users, receives a child schema object which is already initialized, along with its own children.
+
     :param py_type:   The Python class to generate a schema for.
     :param namespace: The Avro namespace to add to schemas.
     :param options:   Schema generation options.
     """
-    processing = processing or set()
-    # If py_type is currently being processed further up the stack, emit a ForwardRef to break the cycle
-    unwrapped = _type_from_annotated(py_type)
-    if unwrapped in processing and hasattr(unwrapped, "__name__"):
-        py_type = ForwardRef(_fullname_for_forward_ref(unwrapped, namespace, options))  # type: ignore
-    # Find concrete Schema subclasses defined in the current module
-    for schema_class in sorted(_SCHEMA_CLASSES, key=lambda c: getattr(c, "__py_avro_priority", 0)):
-        # Find the first schema class that handles py_type
-        schema_obj = schema_class(py_type, namespace=namespace, options=options, processing=processing)  # type: ignore
-        if schema_obj:
-            return schema_obj
+    traversal = getattr(_BUILD_STATE, "traversal", None)
+    if traversal is not None:
+        return traversal.schema_obj(py_type, namespace=namespace, options=options, processing=processing)
+    return _build_tree(py_type, namespace=namespace, options=options, processing=processing).root
+
+
+def _build_tree(
+    py_type: Type,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+    processing: set[type] | None = None,
+) -> _SchemaTree:
+    """Build the entire tree of schema objects for a given Python type"""
+    traversal = _BUILD_STATE.traversal = _Traversal()
+    try:
+        root = traversal.schema_obj(py_type, namespace=namespace, options=options, processing=processing)
+    finally:
+        _BUILD_STATE.traversal = None
+    return _SchemaTree(root, builtin_only=traversal.builtin_only)
+
+
+def _when_built(schema_obj: Schema, callback: collections.abc.Callable[[], None]) -> None:
+    """
+    Call a function once a schema object and all schema objects it depends on are initialized
+
+    This is to be used by schema classes that need to inspect their child schema objects at build time.
+    """
+    traversal = getattr(_BUILD_STATE, "traversal", None)
+    build = traversal.builds.get(id(schema_obj)) if traversal is not None else None
+    if build is None:
+        callback()
+    else:
+        build.callbacks.append(callback)
+
+
+_BUILD_STATE = threading.local()
+
+_REUSABLE_SCHEMA_OBJS_MAXSIZE = 8
+"""Maximum number of schema objects to keep for reuse for the same key, but built in different recursion contexts"""
+
+_CHECKED_TYPES_MAXSIZE = 256
+"""Maximum number of types checked for circular references to track for a schema object"""
+
+# States of a schema object being built
+_PENDING = 0
+_INITIALIZING = 1
+_INITIALIZED = 2
+_COMPLETED = 3
+
+
+class _Build:
+    """A schema object being built by a traversal"""
+
+    __slots__ = ("schema_obj", "init_args", "parent", "entry", "state", "children", "checked", "borrowed", "callbacks")
+
+    def __init__(
+        self,
+        schema_obj: Optional[Schema],
+        init_args: Optional[Tuple[Type, Optional[str], Option, set[type]]],
+        parent: Optional[_Build],
+        entry: Optional[_CachedSchemaObj],
+    ):
+        """
+        A schema object being built by a traversal
+
+        :param schema_obj: The schema object, not yet initialized.
+        :param init_args:  The arguments to initialize the schema object with: type, namespace, options, processing.
+        :param parent:     The build of the schema object which requested this schema object.
+        :param entry:      The entry for this schema object in the traversal's schema objects for reuse, if any.
+        """
+        self.schema_obj = schema_obj
+        self.init_args = init_args
+        self.parent = parent
+        self.entry = entry
+        self.state = _PENDING
+        #: Builds of child schema objects requested whilst initializing the schema object
+        self.children: List[_Build] = []
+        #: Named types checked for circular references whilst building the schema object and its children. ``None`` if
+        #: there are too many to track.
+        self.checked: Optional[set] = set()
+        #: Builds of reused schema objects which were not completed when they were reused
+        self.borrowed: List[_Build] = []
+        #: Functions to call once the schema object is completed
+        self.callbacks: List[collections.abc.Callable[[], None]] = []
+
+    def record_checked(self, py_types: Optional[collections.abc.Iterable[Type]]) -> None:
+        """Record types checked for circular references, ``None`` if too many to track"""
+        if self.checked is None:
+            return
+        if py_types is None:
+            self.checked = None
+            return
+        self.checked.update(py_types)
+        if len(self.checked) > _CHECKED_TYPES_MAXSIZE:
+            self.checked = None
+
+
+class _Traversal:
+    """
+    State shared by all nested calls of :func:`_schema_obj` whilst building a single schema
+
+    Schema objects are initialized depth-first, in the same order as if they were built recursively, using an explicit
+    stack. Schema objects built previously are reused where possible.
+    """
+
+    def __init__(self):
+        """State shared by all nested calls of :func:`_schema_obj` whilst building a single schema"""
+        #: Schema objects built so far, keyed by type, namespace and options
+        self.schema_objs: Dict[Tuple[Any, Optional[str], Option], List[_CachedSchemaObj]] = {}
+        #: Builds of schema objects not yet completed, by object id
+        self.builds: Dict[int, _Build] = {}
+        self.root = _Build(None, None, None, None)
+        self.root.state = _INITIALIZED
+        #: The build of the schema object currently being initialized
+        self.current = self.root
+        #: Whether all schema objects built are instances of built-in schema classes
+        self.builtin_only = True
+
+    def schema_obj(
+        self,
+        py_type: Type,
+        namespace: Optional[str],
+        options: Option,
+        processing: set[type] | None,
+    ) -> Schema:
+        """
+        Return a new schema object for a given type, or a previously built one
+
+        The schema object is completed before it is returned, unless it is requested by a built-in schema class which
+        does not inspect its child schema objects at build time.
+        """
+        schema_obj = self._request(py_type, namespace, options, processing)
+        if type(self.current.schema_obj) not in _DEFERRING_SCHEMA_CLASSES:
+            build = self.builds.get(id(schema_obj))
+            if build is not None and build.state == _PENDING:
+                self.complete(build)
+        return schema_obj
+
+    def _request(
+        self,
+        py_type: Type,
+        namespace: Optional[str],
+        options: Option,
+        processing: set[type] | None,
+    ) -> Schema:
+        """Return a new, not yet initialized schema object for a given type, or a previously built one"""
+        processing = processing or set()
+        # If py_type is currently being processed further up the stack, emit a ForwardRef to break the cycle
+        unwrapped = _type_from_annotated(py_type)
+        if hasattr(unwrapped, "__name__"):
+            self.current.record_checked((unwrapped,))
+            if unwrapped in processing:
+                py_type = ForwardRef(_fullname_for_forward_ref(unwrapped, namespace, options))  # type: ignore
+                return self._start(py_type, namespace, options, processing, entries=None)
+
+        try:
+            key = (_type_key(py_type), namespace, options)
+            entries = self.schema_objs.setdefault(key, [])
+        except TypeError:  # Unhashable type hint, e.g. ``Annotated`` with unhashable metadata. Don't reuse.
+            return self._start(py_type, namespace, options, processing, entries=None)
+        for entry in entries:
+            if entry.is_valid(processing):
+                if entry.build is None:
+                    self.current.record_checked(entry.checked)
+                else:
+                    self.current.borrowed.append(entry.build)
+                return entry.schema_obj
+        return self._start(py_type, namespace, options, processing, entries=entries)
+
+    def _start(
+        self,
+        py_type: Type,
+        namespace: Optional[str],
+        options: Option,
+        processing: set[type],
+        entries: Optional[List[_CachedSchemaObj]],
+    ) -> Schema:
+        """Return a new schema object for a given type, to be initialized later"""
+        schema_class = _schema_class(py_type)
+        if schema_class.__module__ != __name__:
+            self.builtin_only = False
+        schema_obj = _new_schema_obj(schema_class, py_type, namespace, options, processing)
+        build = _Build(schema_obj, (py_type, namespace, options, processing), parent=self.current, entry=None)
+        if entries is not None:
+            build.entry = _CachedSchemaObj(schema_obj, processing=frozenset(processing), build=build)
+            # Most recent first. Whilst building deeply nested types, schema objects requested further up the stack may
+            # only be completed much later. To avoid scanning all of them, keep just the most recent ones.
+            entries.insert(0, build.entry)
+            del entries[_REUSABLE_SCHEMA_OBJS_MAXSIZE:]
+        self.builds[id(schema_obj)] = build
+        self.current.children.append(build)
+        return schema_obj
+
+    def complete(self, build: _Build) -> None:
+        """Initialize a schema object and, depth-first, all schema objects it depends on"""
+        stack = [(build, False)]
+        while stack:
+            build, initialized = stack.pop()
+            if initialized:
+                self._finish(build)
+            elif build.state == _PENDING:
+                self._initialize(build)
+                stack.append((build, True))
+                stack.extend((child, False) for child in reversed(build.children))
+
+    def _initialize(self, build: _Build) -> None:
+        """Call the schema object's ``__init__``, collecting the child schema objects it requests"""
+        assert build.init_args
+        py_type, namespace, options, processing = build.init_args
+        previous, self.current = self.current, build
+        build.state = _INITIALIZING
+        try:
+            init = build.schema_obj.__init__  # type: ignore
+            init(py_type, namespace=namespace, options=options, processing=processing)
+        finally:
+            self.current = previous
+        build.state = _INITIALIZED
+
+    def _finish(self, build: _Build) -> None:
+        """Complete a schema object once all its child schema objects are completed"""
+        build.state = _COMPLETED
+        del self.builds[id(build.schema_obj)]
+        # Schema objects reused whilst building this one may have been completed since
+        unresolved, seen = [], set()
+        while build.borrowed:
+            other = build.borrowed.pop()
+            if id(other) in seen:
+                continue
+            seen.add(id(other))
+            if other.state == _COMPLETED:
+                build.record_checked(other.checked)
+                build.borrowed.extend(other.borrowed)
+            else:
+                unresolved.append(other)
+        build.borrowed = unresolved
+        if build.entry is not None and build.checked is not None and not unresolved:
+            build.entry.resolve(frozenset(build.checked))
+        assert build.parent
+        build.parent.record_checked(build.checked)
+        build.parent.borrowed.extend(unresolved)
+        for callback in build.callbacks:
+            callback()
+        build.callbacks.clear()
+
+
+class _CachedSchemaObj:
+    """
+    A schema object built previously and the recursion context it is valid in
+
+    Whilst building a schema object, types which are currently being processed further up the stack are replaced by
+    forward references. The schema object can therefore be reused in any context where the same types are being
+    processed, considering only the types that were actually checked whilst building the object. Until those are known,
+    or if there are too many to track, the schema object can be reused only where exactly the same types are being
+    processed.
+    """
+
+    __slots__ = ("schema_obj", "checked", "processing", "build")
+
+    def __init__(self, schema_obj: Schema, processing: frozenset, build: Optional[_Build]):
+        """
+        A schema object built previously and the recursion context it is valid in
+
+        :param schema_obj: The schema object.
+        :param processing: The types being processed when the schema object was requested.
+        :param build:      The build of the schema object, until the types checked whilst building it are known.
+        """
+        self.schema_obj = schema_obj
+        #: All named types checked for circular references whilst building the schema object, once known
+        self.checked: Optional[frozenset] = None
+        #: The types being processed, limited to the checked types once known
+        self.processing = processing
+        self.build = build
+
+    def resolve(self, checked: frozenset) -> None:
+        """Record the types checked whilst building the schema object"""
+        self.checked = checked
+        self.processing = checked.intersection(self.processing)
+        self.build = None
+
+    def is_valid(self, processing: set[type]) -> bool:
+        """Whether the schema object can be reused when the given types are being processed"""
+        if self.checked is None:
+            return processing == self.processing
+        return self.checked.intersection(processing) == self.processing
+
+
+def _schema_class(py_type: Type) -> Type[Schema]:
+    """
+    Return the first registered schema class (in priority order) that handles a given Python type
+
+    Resolved classes are stored in lookup tables such that each distinct type is probed against the registered classes'
+    :meth:`Schema.handles_type` only once.
+    """
+    if isinstance(py_type, type) and not get_args(py_type):
+        table: collections.abc.MutableMapping[Any, Type[Schema]] = _DISPATCH_BY_CLASS
+        key: Any = py_type
+    else:
+        table = _DISPATCH_BY_KEY
+        key = _type_key(py_type)
+    try:
+        return table[key]
+    except KeyError:
+        pass
+    except TypeError:  # Unhashable type hint, e.g. ``Annotated`` with unhashable metadata. Don't cache.
+        return _probe_schema_classes(py_type)
+    schema_class = _probe_schema_classes(py_type)
+    if table is _DISPATCH_BY_KEY and len(table) >= _DISPATCH_BY_KEY_MAXSIZE:
+        del table[next(iter(table))]  # Evict the oldest entry
+    table[key] = schema_class
+    return schema_class
+
+
+def _new_schema_obj(
+    schema_class: Type[Schema],
+    py_type: Type,
+    namespace: Optional[str],
+    options: Option,
+    processing: set[type],
+) -> Schema:
+    """
+    Return a new, not yet initialized instance of a schema class known to handle a given type
+
+    Unless the schema class defines its own ``__new__``, this bypasses the check in :meth:`Schema.__new__`.
+    """
+    if schema_class.__new__ is Schema.__new__:
+        return super(Schema, schema_class).__new__(schema_class)
+    return schema_class.__new__(schema_class, py_type, namespace=namespace, options=options, processing=processing)
+
+
+def _probe_schema_classes(py_type: Type) -> Type[Schema]:
+    """Return the first registered schema class (in priority order) whose ``handles_type`` accepts a given type"""
+    for schema_class in _SCHEMA_CLASSES:
+        if schema_class.handles_type(py_type):
+            return schema_class
     raise TypeNotSupportedError(f"Cannot generate Avro schema for Python type {py_type}")
 
 
+def _type_key(py_type: Any) -> Any:
+    """
+    Return a hashable key identifying a type hint
+
+    Unlike the type hints themselves, keys are sensitive to the order of union members. For example
+    ``Union[int, str] == Union[str, int]`` but their keys differ.
+    """
+    origin = get_origin(py_type)
+    if origin is None:
+        return py_type if isinstance(py_type, type) else (type(py_type), py_type)
+    return origin, tuple(_type_key(arg) for arg in get_args(py_type))
+
+
 # See https://avro.apache.org/docs/1.11.1/specification/#names
 _AVRO_NAME_PATTERN = re.compile(r"^[A-Za-z]([A-Za-z0-9_])*$")
 _UUID_PATTERN = re.compile(r"^[0-9a-f]{8}(?:-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})?$", re.IGNORECASE)
@@ -337,6 +835,12 @@ class Schema(abc.ABC):
         self._namespace = namespace  # Namespace override
         self.processing = processing or set()
 
+    def __copy__(self):
+        """Return a shallow copy of the schema object"""
+        copied = _new_schema_obj(type(self), self.py_type, self._namespace, self.options, self.processing)
+        copied.__dict__.update(self.__dict__)
+        return copied
+
     @property
     def namespace_override(self) -> Optional[str]:
         """Manually set namespace, if any"""
@@ -345,14 +849,7 @@ class Schema(abc.ABC):
     @property
     def namespace(self) -> Optional[str]:
         """The namespace, taking into account auto-namespace options and any override"""
-        if self._namespace is None and Option.NO_AUTO_NAMESPACE not in self.options:
-            module = inspect.getmodule(self.py_type)
-            if module and module.__name__ != "builtin":
-                if Option.AUTO_NAMESPACE_MODULE in self.options:
-                    return module.__name__
-                else:
-                    return module.__name__.split(".", 1)[0]  # top-level package
-        return self._namespace  # The override
+        return _resolve_namespace(self.py_type, self._namespace, self.options)
 
     @abc.abstractmethod
     def data(self, names: NamesType) -> JSONType:
@@ -372,11 +869,15 @@ class Schema(abc.ABC):
         """
         return py_default
 
-    def _wrap_as_record(
-        self,
-        names: NamesType,
-        build_inner: collections.abc.Callable[[NamesType], JSONObj],
-    ) -> JSONType:
+    def struct_format(self) -> Optional[str]:
+        """
+        Return the :mod:`struct` format of values if their Avro binary encoding has a fixed size, else None
+
+        The format has no byte order character: values are little-endian. For example, doubles are ``"d"``.
+        """
+        return None
+
+    def _wrap_as_record(self, names: NamesType, inner: DataSteps) -> DataSteps:
         """
         Wrap a container schema into an Avro record with ``__id`` and ``__data`` fields. The wrapper's
         fullname is reserved in ``names`` before internal data is computed. This is to avoid a recursive inner type
@@ -392,7 +893,7 @@ class Schema(abc.ABC):
             "name": record_name,
             "fields": [
                 {"name": REF_ID_KEY, "type": ["null", "long"], "default": None},
-                {"name": REF_DATA_KEY, "type": build_inner(names)},
+                {"name": REF_DATA_KEY, "type": (yield from inner)},
             ],
         }
         if self.namespace:
@@ -440,6 +941,10 @@ class PrimitiveSchema(Schema):
                 if _is_class(self.py_type, type_, include_subclasses=include_subclasses)
             )
 
+    def struct_format(self) -> Optional[str]:
+        """Return the :mod:`struct` format of booleans and floating-point numbers, which have a fixed size"""
+        return {"boolean": "?", "float": "f", "double": "d"}.get(self.data(names=NamesRegistry()))
+
 
 @register_schema
 class StrSubclassSchema(Schema):
@@ -502,9 +1007,15 @@ class LiteralSchema(Schema):
         py_type = _type_from_annotated(py_type)
         return get_origin(py_type) is Literal
 
-    def data(self, names: NamesType) -> JSONType:
+    data = _render_data
+
+    def _iter_data(self, names: NamesType) -> DataSteps:
         """Return the schema data"""
-        return self.literal_value_schema.data(names=names)
+        return (yield self.literal_value_schema)
+
+    def struct_format(self) -> Optional[str]:
+        """Return the :mod:`struct` format of the literal values, if fixed-size"""
+        return self.literal_value_schema.struct_format()
 
 
 @register_schema
@@ -527,9 +1038,15 @@ class FinalSchema(Schema):
             raise TypeError("Can't generate Avro schema from Python typing.Final without a type parameter")
         self.real_schema = _schema_obj(real_type, namespace=namespace, options=options)
 
-    def data(self, names: NamesType) -> JSONType:
+    data = _render_data
+
+    def _iter_data(self, names: NamesType) -> DataSteps:
         """Return the schema data"""
-        return self.real_schema.data(names=names)
+        return (yield self.real_schema)
+
+    def struct_format(self) -> Optional[str]:
+        """Return the :mod:`struct` format of the values, if fixed-size"""
+        return self.real_schema.struct_format()
 
     @classmethod
     def handles_type(cls, py_type: Type) -> bool:
@@ -686,6 +1203,10 @@ class TimeDeltaSchema(Schema):
             f"value `None`"
         )
 
+    def struct_format(self) -> Optional[str]:
+        """Return the :mod:`struct` format of Avro durations: months, days and milliseconds as unsigned integers"""
+        return "III"
+
 
 @register_schema
 class ForwardSchema(Schema):
@@ -826,14 +1347,17 @@ class SequenceSchema(Schema):
         args = get_args(py_type)  # TODO: validate if args has exactly 1 item?
         self.items_schema = _schema_obj(args[0], namespace=namespace, options=options, processing=self.processing)
 
-    def data(self, names: NamesType) -> JSONType:
+    data = _render_data
+
+    def _iter_data(self, names: NamesType) -> DataSteps:
         """Return the schema data"""
         if Option.WRAP_INTO_RECORDS not in self.options:
-            return {"type": "array", "items": self.items_schema.data(names=names)}
-        return self._wrap_as_record(
-            names,
-            lambda n: {"type": "array", "items": self.items_schema.data(names=n)},
-        )
+            return (yield from self._iter_array_data())
+        return (yield from self._wrap_as_record(names, self._iter_array_data()))
+
+    def _iter_array_data(self) -> DataSteps:
+        """Return the array schema data"""
+        return {"type": "array", "items": (yield self.items_schema)}
 
     def make_default(self, py_default: collections.abc.Sequence) -> JSONType:
         """Return an Avro schema compliant default value for a given Python Sequence
@@ -909,14 +1433,17 @@ class DictSchema(Schema):
             raise TypeError(f"Cannot generate Avro mapping schema for Python dictionary {py_type} with non-string keys")
         self.values_schema = _schema_obj(args[1], namespace=namespace, options=options, processing=self.processing)
 
-    def data(self, names: NamesType) -> JSONType:
+    data = _render_data
+
+    def _iter_data(self, names: NamesType) -> DataSteps:
         """Return the schema data"""
         if Option.WRAP_INTO_RECORDS not in self.options:
-            return {"type": "map", "values": self.values_schema.data(names=names)}
-        return self._wrap_as_record(
-            names,
-            lambda n: {"type": "map", "values": self.values_schema.data(names=n)},
-        )
+            return (yield from self._iter_map_data())
+        return (yield from self._wrap_as_record(names, self._iter_map_data()))
+
+    def _iter_map_data(self) -> DataSteps:
+        """Return the map schema data"""
+        return {"type": "map", "values": (yield self.values_schema)}
 
     def make_default(self, py_default: Any) -> JSONType:
         """Return an Avro schema compliant default value for a given Python value"""
@@ -992,12 +1519,28 @@ class UnionSchema(Schema):
             ):
                 raise TypeError(f"Union of types {args} is not supported. Python cannot detect proper type at runtime")
 
-    def data(self, names: NamesType) -> JSONType:
+    data = _render_data
+
+    def _iter_data(self, names: NamesType) -> DataSteps:
         """Return the schema data"""
         # Render the item schemas
-        schemas = list(item_schema.data(names=names) for item_schema in self.item_schemas)
-        # We need to deduplicate the schemas **after** rendering. This is because **different** Python types might
-        # result in the **same** Avro schema. Preserving order as order may be significant in an Avro schema.
+        schemas = []
+        for item_schema in self.item_schemas:
+            schemas.append((yield item_schema))
+        unique_schemas, _ = self._deduplicate(schemas)
+        if len(unique_schemas) > 1:
+            return unique_schemas
+        else:
+            return unique_schemas[0]
+
+    @staticmethod
+    def _deduplicate(schemas: List[JSONType]) -> Tuple[List[JSONType], List[int]]:
+        """
+        Return the unique item schemas data and, for each item schema, the index of the corresponding unique schema
+
+        We need to deduplicate the schemas **after** rendering. This is because **different** Python types might
+        result in the **same** Avro schema. Preserving order as order may be significant in an Avro schema.
+        """
 
         def normalize_string_duplicates(_schema):
             """We might have cases in which we have a schema both for ``StrSubclassSchema`` (e.g., a ``StrEnum`` with
@@ -1012,28 +1555,51 @@ class UnionSchema(Schema):
         # If a namedString schema (str subclass with extra metadata) and a plain "string" are both present,
         # remove the plain "string" so the more informative namedString is preserved after deduplication.
         has_named_string = any(isinstance(s, dict) and "namedString" in s for s in schemas)
-        if has_named_string:
-            schemas = [s for s in schemas if s != "string"]
+        kept_schemas = [s for s in schemas if s != "string"] if has_named_string else schemas
 
-        unique_schemas = list(more_itertools.unique_everseen(schemas, key=normalize_string_duplicates))
-        if len(unique_schemas) > 1:
-            return unique_schemas
-        else:
-            return unique_schemas[0]
+        import more_itertools  # Imported on first use to keep importing this package fast
+
+        unique_schemas = list(more_itertools.unique_everseen(kept_schemas, key=normalize_string_duplicates))
+        unique_keys = [normalize_string_duplicates(s) for s in unique_schemas]
+        indexes = [unique_keys.index(normalize_string_duplicates(s)) for s in schemas]
+        return unique_schemas, indexes
+
+    def branch_indexes(self) -> List[int]:
+        """
+        Return, for each item schema, the index of the Avro union branch it is rendered as
+
+        Item schemas rendering as the same Avro schema share a branch.
+        """
+        schemas = []
+        for item_schema in self.item_schemas:
+            # Pretend named schemas have been rendered before, such that they render as their full name only
+            names = NamesRegistry([item_schema.fullname] if isinstance(item_schema, NamedSchema) else [])
+            schemas.append(item_schema.data(names=names))
+        return self._deduplicate(schemas)[1]
 
     def sort_item_schemas(self, default_value: Any) -> None:
         """Re-order the union's schemas such that the first item corresponds with a record field's default value"""
         default_index = -1
         for i, item_schema in enumerate(self.item_schemas):
-            try:
-                typeguard.check_type("default_value", default_value, item_schema.py_type)
-                default_index = i
-                break
-            except TypeError:
+            validator = compile_validator(item_schema.py_type)
+            if validator is None:
+                import typeguard  # Imported on first use to keep importing this package fast
+
+                try:
+                    typeguard.check_type("default_value", default_value, item_schema.py_type)
+                except TypeError:
+                    continue
+            elif not validator(default_value):
                 continue
+            default_index = i
+            break
         if default_index > 0:
-            default_item_schema = self.item_schemas.pop(default_index)
-            self.item_schemas.insert(0, default_item_schema)
+            # Assign a new list, the original list may be shared with copies of this schema object
+            self.item_schemas = [
+                self.item_schemas[default_index],
+                *self.item_schemas[:default_index],
+                *self.item_schemas[default_index + 1 :],
+            ]
 
     def make_default(self, py_default: Any) -> JSONType:
         """Return an Avro schema compliant default value for a given Python value"""
@@ -1087,12 +1653,17 @@ class NamedSchema(Schema):
         else:
             return self.name
 
-    def data(self, names: NamesType) -> JSONType:
+    data = _render_data
+
+    def _iter_data(self, names: NamesType) -> DataSteps:
         """Return the schema data"""
         if self.fullname in names:
             return self.fullname
         else:
             names.append(self.fullname)
+            if type(self).data_before_deduplication is RecordSchema.data_before_deduplication:
+                # Render the record's fields without recursion
+                return (yield from self._iter_data_before_deduplication(names))  # type: ignore
             return self.data_before_deduplication(names=names)
 
     @abc.abstractmethod
@@ -1203,10 +1774,20 @@ class RecordSchema(NamedSchema):
 
     def data_before_deduplication(self, names: NamesType) -> JSONObj:
         """Return the schema data"""
-        record_schema = {
+        return _render(self._iter_data_before_deduplication(names), names)  # type: ignore
+
+    def _iter_data_before_deduplication(self, names: NamesType) -> DataSteps:
+        """Return the schema data"""
+        fields = []
+        for field in self.record_fields:
+            if type(field).data is RecordField.data:
+                fields.append((yield from field._iter_data(names)))
+            else:
+                fields.append(field.data(names=names))  # Custom field class
+        record_schema: JSONObj = {
             "type": "record",
             "name": self.name,
-            "fields": [field.data(names=names) for field in self.record_fields],
+            "fields": fields,
         }
         if self.namespace is not None:
             record_schema["namespace"] = self.namespace
@@ -1221,6 +1802,22 @@ class RecordSchema(NamedSchema):
             record_schema["fields"].append({"name": REF_ID_KEY, "type": ["null", "long"], "default": None})
         return record_schema
 
+    def struct_format(self) -> Optional[str]:
+        """
+        Return the :mod:`struct` format of records whose fields all have a fixed size, else None
+
+        Records with a reference id or runtime type field, which are variable-size, or without fields have no format.
+        """
+        if not self.record_fields or self.options & (Option.ADD_REFERENCE_ID | Option.ADD_RUNTIME_TYPE_FIELD):
+            return None
+        formats = []
+        for field in self.record_fields:
+            field_format = field.schema.struct_format()
+            if field_format is None:
+                return None
+            formats.append(field_format)
+        return "".join(formats)
+
 
 class RecordField:
     """An Avro record field"""
@@ -1263,9 +1860,14 @@ class RecordField:
 
         if self.default != dataclasses.MISSING:
             if isinstance(self.schema, UnionSchema):
-                self.schema.sort_item_schemas(self.default)
+                _when_built(self.schema, self._sort_union_schema)
             if self.default != TD_MISSING_MARKER:
-                typeguard.check_type("default_value", self.default, self.py_type)
+                validator = compile_validator(self.py_type)
+                if validator is None or not validator(self.default):
+                    # Let typeguard raise a detailed error, or accept values our validators do not know about
+                    import typeguard  # Imported on first use to keep importing this package fast
+
+                    typeguard.check_type("default_value", self.default, self.py_type)
         else:
             if Option.DEFAULTS_MANDATORY in self.options:
                 raise TypeError(f"Default value for field {self} is missing")
@@ -1274,11 +1876,21 @@ class RecordField:
         """Human representation of the field"""
         return self.name
 
+    def _sort_union_schema(self) -> None:
+        """Re-order the field's union schema such that the first item corresponds with the default value"""
+        # Schema objects are shared between fields of the same type, so sort a copy
+        self.schema = copy.copy(self.schema)
+        self.schema.sort_item_schemas(self.default)  # type: ignore
+
     def data(self, names: NamesType) -> JSONObj:
         """Return the schema data"""
+        return _render(self._iter_data(names), names)  # type: ignore
+
+    def _iter_data(self, names: NamesType) -> DataSteps:
+        """Return the schema data, yielding the field's schema object to be rendered first"""
         field_data = {
             "name": self.name,
-            "type": self.schema.data(names=names),
+            "type": (yield self.schema),
         }
         if self.aliases:
             field_data["aliases"] = sorted(self.aliases)
@@ -1346,9 +1958,10 @@ class DataclassSchema(RecordSchema):
 
         return field_obj
 
-    def data_before_deduplication(self, names: NamesType) -> JSONObj:
+    def _iter_data_before_deduplication(self, names: NamesType) -> DataSteps:
         """Return the schema data"""
-        data = super().data_before_deduplication(names)
+        data = yield from super()._iter_data_before_deduplication(names)
+        assert isinstance(data, dict)
         if Option.ADD_RUNTIME_TYPE_FIELD in self.options:
             data["fields"].append({"name": RUNTIME_TYPE_KEY, "type": ["null", "string"]})
         return data
@@ -1413,10 +2026,10 @@ class PydanticSchema(RecordSchema):
         Pydantic "unpacks" annotated and forward ref types in their FieldInfo API. We need to access to full, raw
         annotated type hints instead.
         """
-        for class_ in self.py_type.mro():
-            if class_.__annotations__.get(field_name):
-                return class_.__annotations__[field_name]
-        raise ValueError(f"{field_name} is not a field of {self.py_type}")  # Should never happen
+        annotation = raw_annotations(self.py_type).get(field_name)
+        if annotation is None:
+            raise ValueError(f"{field_name} is not a field of {self.py_type}")  # Should never happen
+        return annotation
 
 
 @register_schema
@@ -1467,11 +2080,11 @@ class PlainClassSchema(RecordSchema):
 
         # Try to get resolved type hints, but fall back to raw annotations if there are unresolved forward refs
         try:
-            type_hints = get_type_hints(py_type, include_extras=True)
+            hints = type_hints(py_type)
         except NameError:
-            type_hints = py_type.__annotations__
+            hints = py_type.__annotations__
         self.py_fields: list[tuple[str, type]] = []
-        for k, v in type_hints.items():
+        for k, v in hints.items():
             self.py_fields.append((k, v))
         self.record_fields = [self._record_field(field) for field in self.py_fields]
 
@@ -1491,9 +2104,10 @@ class PlainClassSchema(RecordSchema):
         )
         return field_obj
 
-    def data_before_deduplication(self, names: NamesType) -> JSONObj:
+    def _iter_data_before_deduplication(self, names: NamesType) -> DataSteps:
         """Return the schema data"""
-        data = super().data_before_deduplication(names)
+        data = yield from super()._iter_data_before_deduplication(names)
+        assert isinstance(data, dict)
         if Option.ADD_RUNTIME_TYPE_FIELD in self.options:
             data["fields"].append({"name": RUNTIME_TYPE_KEY, "type": ["null", "string"]})
         return data
@@ -1525,7 +2139,7 @@ class TypedDictSchema(RecordSchema):
         super().__init__(py_type, namespace=namespace, options=options, processing=processing)
         py_type = _type_from_annotated(py_type)
         self.is_total = py_type.__dict__.get("__total__", True)
-        self.py_fields: dict[str, Type] = get_type_hints(py_type, include_extras=True)
+        self.py_fields: collections.abc.Mapping[str, Type] = type_hints(py_type)
         self.record_fields = [self._record_field(field) for field in self.py_fields.items()]
 
     def _record_field(self, py_field: tuple[str, Type]) -> RecordField:
@@ -1564,6 +2178,69 @@ class TypedDictSchema(RecordSchema):
         return field_obj
 
 
+def _with_names_registry(names: Optional[NamesType], render: Callable[[NamesRegistry], JSONType]) -> JSONType:
+    """
+    Return schema data rendered using a names registry
+
+    Names given as a list are copied into a registry and names defined while rendering are appended to the list
+    afterwards, such that callers passing a list see the same names as before.
+    """
+    if isinstance(names, NamesRegistry):
+        return render(names)
+    registry = NamesRegistry(names or ())
+    previous_count = len(registry)
+    schema_data = render(registry)
+    if names is not None:
+        names.extend(itertools.islice(registry, previous_count, None))
+    return schema_data
+
+
+_DEFERRING_SCHEMA_CLASSES: frozenset[type] = frozenset(
+    (
+        LiteralSchema,
+        FinalSchema,
+        SequenceSchema,
+        SetSchema,
+        DictSchema,
+        UnionSchema,
+        DataclassSchema,
+        PydanticSchema,
+        PlainClassSchema,
+        TypedDictSchema,
+    )
+)
+"""
+Built-in schema classes whose ``__init__`` does not inspect the child schema objects it requests
+
+Their child schema objects are initialized only once their ``__init__`` has returned, using an explicit stack.
+Subclasses are not included, as they may inspect child schema objects.
+"""
+
+
+def _render(steps: DataSteps, names: NamesType) -> JSONType:
+    """
+    Return the schema data from a schema data generator
+
+    Child schema objects yielded by the generator are rendered using an explicit stack of generators rather than
+    recursively, such that deeply nested schemas are not limited by Python's recursion limit.
+    """
+    stack = [steps]
+    value: Any = None
+    while stack:
+        try:
+            child = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+            continue
+        if type(child).data is _render_data:
+            stack.append(child._iter_data(names))  # type: ignore
+            value = None
+        else:
+            value = child.data(names=names)  # Leaf schema or a schema class implementing data() itself
+    return value
+
+
 def _doc_for_class(py_type: Type) -> str:
     """Return the first line of the docstring for a given class, if any"""
     doc = inspect.getdoc(py_type)
@@ -1661,7 +2338,7 @@ def has_annotations(py_type: Type) -> bool:
     """Checks if a type has annotations"""
     py_type = _type_from_annotated(py_type)
     try:
-        return bool(get_type_hints(py_type))
+        return bool(type_hints(py_type))
     except Exception:
         pass
     return hasattr(py_type, "__annotations__")
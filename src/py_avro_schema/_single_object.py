@@ -0,0 +1,124 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Avro single-object encoding
+
+See https://avro.apache.org/docs/1.11.1/specification/#single-object-encoding. A single object is the 2-byte marker
+``C3 01``, the 8-byte CRC-64-AVRO fingerprint of the writer's schema in little-endian order and the Avro binary encoded
+value.
+"""
+
+from typing import Any, Callable, Mapping, Optional, Union
+
+import py_avro_schema
+from py_avro_schema._cache import TypeCache, cached
+from py_avro_schema._decoder import Data
+from py_avro_schema._options import Option
+
+MARKER = b"\xc3\x01"
+"""The first two bytes of single-object encoded data"""
+
+_HEADER_SIZE = len(MARKER) + 8
+
+Resolver = Union[Mapping[bytes, Any], Callable[[bytes], Any]]
+"""Mapping or function returning the Python type to decode into for a schema fingerprint, or ``None`` if unknown"""
+
+_DECODERS = TypeCache(maxsize=256)
+"""Compiled decoders by Python type and schema fingerprint"""
+
+
+def encode_single(
+    value: Any,
+    py_type: Any = None,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> bytes:
+    """
+    Return a value in Avro single-object encoding, tagged with the fingerprint of its schema
+
+    :param value:     The value to encode.
+    :param py_type:   The Python type of the value. Defaults to the value's class.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :raises TypeNotSupportedError: If values of a type used by the schema cannot be encoded.
+    """
+    if py_type is None:
+        py_type = type(value)
+    return _single_object_encoder(py_type, namespace=namespace, options=options)(value)
+
+
+@cached()
+def _single_object_encoder(py_type: Any, *, namespace: Optional[str], options: Option) -> Callable[[Any], bytes]:
+    """Return a function encoding instances of a given Python type in Avro single-object encoding"""
+    header = MARKER + py_avro_schema.fingerprint(py_type, namespace=namespace, options=options)
+    write = py_avro_schema._encoder.writer(py_type, namespace=namespace, options=options)
+
+    def encode(value: Any) -> bytes:
+        """Return a value in Avro single-object encoding"""
+        out = bytearray(header)
+        write(out, value)
+        return bytes(out)
+
+    return encode
+
+
+def decode_single(
+    data: Data,
+    resolver: Resolver,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Any:
+    """
+    Return the value in Avro single-object encoded data
+
+    The Python type to decode into is looked up by the schema fingerprint the data is tagged with. Decoders are cached
+    by Python type and fingerprint, such that decoding a stream mixing many schemas compiles each decoder once only.
+    Use ``decode_single.cache_info()`` for cache statistics, where misses are compiled decoders, and
+    ``decode_single.cache_clear()`` to clear the cache.
+
+    :param data:      The data to decode.
+    :param resolver:  Mapping or function returning the Python type to decode into for a schema fingerprint, or
+                      ``None`` if the fingerprint is unknown.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :raises ValueError: If the data is not single-object encoded or its schema is not known.
+    """
+    buf = memoryview(data)
+    if len(buf) < _HEADER_SIZE or buf[: len(MARKER)] != MARKER:
+        raise ValueError("Data is not in the Avro single-object encoding")
+    fingerprint = bytes(buf[len(MARKER) : _HEADER_SIZE])
+    py_type = resolver.get(fingerprint) if isinstance(resolver, Mapping) else resolver(fingerprint)
+    if py_type is None:
+        raise ValueError(f"Unknown schema fingerprint {fingerprint.hex()}")
+    key = (fingerprint, namespace, options)
+    try:
+        decode = _DECODERS.get(py_type, key)
+    except TypeError:  # Unhashable type hint
+        return _compile(py_type, fingerprint, namespace, options)(buf[_HEADER_SIZE:])
+    if decode is None:
+        decode = _compile(py_type, fingerprint, namespace, options)
+        _DECODERS.set(py_type, key, decode)
+    return decode(buf[_HEADER_SIZE:])
+
+
+decode_single.cache_info = _DECODERS.info  # type: ignore
+decode_single.cache_clear = _DECODERS.clear  # type: ignore
+
+
+def _compile(py_type: Any, fingerprint: bytes, namespace: Optional[str], options: Option) -> Callable[[Data], Any]:
+    """Return the decoder for a Python type, checking that its schema has a given fingerprint"""
+    if py_avro_schema.fingerprint(py_type, namespace=namespace, options=options) != fingerprint:
+        raise ValueError(f"The schema with fingerprint {fingerprint.hex()} is not the schema for {py_type}")
+    return py_avro_schema.decoder(py_type, namespace=namespace, options=options)
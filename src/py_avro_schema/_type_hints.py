@@ -0,0 +1,53 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Type hints of classes, resolved once per class
+
+Resolving type hints evaluates forward references and walks the class hierarchy, which is slow for classes with many
+fields. Results are cached by class, referencing classes weakly. Classes are assumed not to change their annotations
+once their type hints have been resolved. Failures are not cached, such that forward references which cannot be
+resolved yet are tried again later.
+"""
+
+from typing import Any, Dict, Mapping, get_type_hints
+
+from py_avro_schema._cache import cached
+
+
+@cached()
+def type_hints(py_type: Any) -> Mapping[str, Any]:
+    """
+    Return the resolved type hints of a class, including ``Annotated`` metadata
+
+    This is equivalent to ``typing.get_type_hints(py_type, include_extras=True)``. The returned mapping is shared and
+    must not be modified.
+
+    :raises NameError: If a forward reference cannot be resolved.
+    """
+    return get_type_hints(py_type, include_extras=True)
+
+
+@cached()
+def raw_annotations(py_type: Any) -> Mapping[str, Any]:
+    """
+    Return the annotations of a class and its base classes as written, without resolving forward references
+
+    For each attribute, the annotation of the first class in the method resolution order annotating the attribute is
+    returned. The returned mapping is shared and must not be modified.
+    """
+    annotations: Dict[str, Any] = {}
+    for class_ in py_type.mro():  # Not ``__mro__`` which generic aliases do not forward to their origin
+        for name, annotation in class_.__dict__.get("__annotations__", {}).items():
+            if annotation and name not in annotations:
+                annotations[name] = annotation
+    return annotations
@@ -16,10 +16,9 @@ Additional type hint classes etc
 
 import dataclasses
 import decimal
+import functools
 from typing import _GenericAlias  # type: ignore
-from typing import Optional, Tuple
-
-import typeguard
+from typing import Callable, Optional, Tuple
 
 
 @dataclasses.dataclass(frozen=True)  # Needs to be hashable to work in unioned types
@@ -70,18 +69,30 @@ class DecimalType:
     Here, the subscript ``(4, 2)`` refers to the precision and scale of decimal numbers.
     """
 
-    @typeguard.typechecked()
     def __class_getitem__(cls, params: Tuple[int, int]) -> _GenericAlias:
         """Class indexing/subscription using ``DecimalType[precision, scale]"""
-        precision, scale = params
-        if precision <= 0:
-            raise ValueError(f"Precision {precision} must be at least 1")
-        if scale < 0:
-            raise ValueError(f"Scale {scale} must be at least 0")
-        if precision < scale:
-            raise ValueError(f"Precision {precision} must be greater than or equal to scale {scale}")
-        # This is a little hacky. We use _GenericAlias without using type parameters. We just use integer instances for
-        # scale and precision. That appears to work, but may not be a supported use case. For example, we cannot just do
-        # ``DecimalType = _GenericAlias(decimal.Decimal, params)`` because that triggers type enforcement on params.
-        # Instead we create new custom class with :meth:`__class_getitem__` returning the "generic".
-        return _GenericAlias(decimal.Decimal, params)
+        return _typechecked_decimal_type()(params)
+
+
+@functools.lru_cache(maxsize=None)
+def _typechecked_decimal_type() -> Callable[[Tuple[int, int]], _GenericAlias]:
+    """Return :func:`_decimal_type` with runtime type checking, importing typeguard on first use only"""
+    import typeguard
+
+    return typeguard.typechecked(_decimal_type)
+
+
+def _decimal_type(params: Tuple[int, int]) -> _GenericAlias:
+    """Return the type hint for ``DecimalType[precision, scale]``"""
+    precision, scale = params
+    if precision <= 0:
+        raise ValueError(f"Precision {precision} must be at least 1")
+    if scale < 0:
+        raise ValueError(f"Scale {scale} must be at least 0")
+    if precision < scale:
+        raise ValueError(f"Precision {precision} must be greater than or equal to scale {scale}")
+    # This is a little hacky. We use _GenericAlias without using type parameters. We just use integer instances for
+    # scale and precision. That appears to work, but may not be a supported use case. For example, we cannot just do
+    # ``DecimalType = _GenericAlias(decimal.Decimal, params)`` because that triggers type enforcement on params.
+    # Instead we create new custom class with :meth:`__class_getitem__` returning the "generic".
+    return _GenericAlias(decimal.Decimal, params)
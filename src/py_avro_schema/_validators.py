@@ -0,0 +1,212 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Compiled validators checking whether Python values match type hints
+
+A validator is a predicate function compiled once per type hint. Validators implement exactly the same rules as
+:func:`typeguard.check_type`, but without walking the type hint and raising exceptions for every check. Type hints which
+validators are not implemented for compile to ``None``; callers should use :func:`typeguard.check_type` instead.
+"""
+
+import collections.abc
+import enum
+import inspect
+import sys
+import typing
+from typing import Any, Callable, Optional, Tuple
+
+from py_avro_schema._cache import cached
+
+if sys.version_info >= (3, 10):
+    from typing import is_typeddict
+else:
+    from typing_extensions import is_typeddict
+
+Validator = Callable[[Any], bool]
+"""Predicate returning whether a value matches a type hint"""
+
+_LITERAL_TYPES = (int, str, bytes, bool, type(None), enum.Enum)
+"""Types of values allowed in ``Literal`` type hints"""
+
+
+def _any(value: Any) -> bool:
+    """Validator accepting any value"""
+    return True
+
+
+@cached(maxsize=4096, values_on_class=True)
+def compile_validator(py_type: Any) -> Optional[Validator]:
+    """
+    Return a validator for a given type hint, or ``None`` if the type hint is not supported
+
+    Supported are classes, ``Any``, ``Union``, ``Optional``, ``Literal``, ``Annotated``, ``NewType`` and lists,
+    sequences, sets, dicts and tuples of supported types.
+    """
+    if py_type is Any:
+        return _any
+    if py_type is None:
+        py_type = type(None)
+    origin = getattr(py_type, "__origin__", None)  # Unlike typing.get_origin(), this unwraps ``Annotated``
+    if origin is not None:
+        return _compile_generic(py_type, origin)
+    if inspect.isclass(py_type):
+        return _compile_class(py_type)
+    if hasattr(py_type, "__supertype__"):  # ``NewType``
+        return compile_validator(py_type.__supertype__)
+    return None
+
+
+def _compile_class(py_type: type) -> Optional[Validator]:
+    """Return a validator for a class"""
+    if issubclass(py_type, tuple):
+        return _is_instance(tuple) if py_type is tuple else None  # Named tuples are not supported
+    if issubclass(py_type, (float, complex)):
+        if py_type is float:
+            return _is_instance((float, int))
+        if py_type is complex:
+            return _is_instance((complex, float, int))
+        return None
+    if is_typeddict(py_type) or getattr(py_type, "_is_protocol", False) or issubclass(py_type, typing.IO):
+        return None
+    if py_type is bytes:
+        return _is_instance((bytearray, bytes, memoryview))
+    return _is_instance(py_type)
+
+
+def _compile_generic(py_type: Any, origin: Any) -> Optional[Validator]:
+    """Return a validator for a type hint with an origin, like ``List[int]`` or ``Annotated[int, ...]``"""
+    args = getattr(py_type, "__args__", None)
+    if origin is typing.Union:
+        return _compile_union(args)
+    if origin is typing.Literal:
+        return _compile_literal(py_type)
+    if origin is tuple:
+        return _compile_tuple(args)
+    if args == getattr(py_type, "__parameters__", None):
+        args = None  # Item types of generics with type variables are not checked
+    if origin in (list, collections.abc.Sequence):
+        return _compile_collection(list if origin is list else collections.abc.Sequence, args)
+    if origin in (set, collections.abc.Set):
+        return _compile_collection(collections.abc.Set, args)
+    if origin is dict:
+        return _compile_dict(args)
+    if origin in (type, collections.abc.Callable):
+        return None
+    return compile_validator(origin)
+
+
+def _is_instance(class_or_tuple: Any) -> Validator:
+    """Return a validator checking a value's class"""
+
+    def _validator(value: Any) -> bool:
+        """Whether the value is an instance of the class(es)"""
+        return isinstance(value, class_or_tuple)
+
+    return _validator
+
+
+def _is_empty_tuple(value: Any) -> bool:
+    """Validator accepting the empty tuple only"""
+    return isinstance(value, tuple) and value == ()
+
+
+def _compile_union(args: Optional[Tuple[Any, ...]]) -> Optional[Validator]:
+    """Return a validator for a union of types"""
+    validators = [compile_validator(arg) for arg in args or ()]
+    if not all(validators):
+        return None
+    if _any in validators:
+        return _any
+
+    def _validator(value: Any) -> bool:
+        """Whether the value matches any of the union's types"""
+        return any(validator(value) for validator in validators)  # type: ignore
+
+    return _validator
+
+
+def _compile_literal(py_type: Any) -> Optional[Validator]:
+    """Return a validator for a literal type"""
+    values = []
+    stack = [py_type]
+    while stack:
+        for arg in stack.pop().__args__:
+            if getattr(arg, "__origin__", None) is typing.Literal:
+                stack.append(arg)
+            elif isinstance(arg, _LITERAL_TYPES):
+                values.append(arg)
+            else:
+                return None
+    # Check membership using equality, like typeguard, such that ``True`` matches ``Literal[1]``
+    literal_values = tuple(values)
+
+    def _validator(value: Any) -> bool:
+        """Whether the value is one of the literal values"""
+        return value in literal_values
+
+    return _validator
+
+
+def _compile_collection(container: type, args: Optional[Tuple[Any, ...]]) -> Optional[Validator]:
+    """Return a validator for a list, sequence or set with items of a given type"""
+    item_validator = compile_validator(args[0]) if args else _any
+    if item_validator is None:
+        return None
+    if item_validator is _any:
+        return _is_instance(container)
+
+    def _validator(value: Any) -> bool:
+        """Whether the value is a collection of which all items match the item type"""
+        return isinstance(value, container) and all(item_validator(item) for item in value)  # type: ignore
+
+    return _validator
+
+
+def _compile_dict(args: Optional[Tuple[Any, ...]]) -> Optional[Validator]:
+    """Return a validator for a dict with keys and values of given types"""
+    key_validator, value_validator = (compile_validator(args[0]), compile_validator(args[1])) if args else (_any, _any)
+    if key_validator is None or value_validator is None:
+        return None
+    if key_validator is _any and value_validator is _any:
+        return _is_instance(dict)
+
+    def _validator(value: Any) -> bool:
+        """Whether the value is a dict of which all keys and values match the key and value types"""
+        return isinstance(value, dict) and all(
+            key_validator(key) and value_validator(item) for key, item in value.items()  # type: ignore
+        )
+
+    return _validator
+
+
+def _compile_tuple(args: Optional[Tuple[Any, ...]]) -> Optional[Validator]:
+    """Return a validator for a tuple with elements of given types"""
+    if not args:
+        return _is_instance(tuple)
+    if args[-1] is Ellipsis:
+        return _compile_collection(tuple, args[:1])
+    if args == ((),):  # ``Tuple[()]`` before Python 3.11
+        return _is_empty_tuple
+    validators = [compile_validator(arg) for arg in args]
+    if not all(validators):
+        return None
+
+    def _validator(value: Any) -> bool:
+        """Whether the value is a tuple of which each element matches the type at the same position"""
+        return (
+            isinstance(value, tuple)
+            and len(value) == len(validators)
+            and all(validator(element) for validator, element in zip(validators, value))  # type: ignore
+        )
+
+    return _validator
@@ -0,0 +1,295 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Lazy views of records in Avro binary encoding
+
+A view reads the fields of a record from the encoded data on access only. The position of a field is found by skipping
+the fields before it, without decoding them, and is kept for later accesses. Nested records and arrays are views too,
+such that looking at a few fields of a large record decodes these fields only.
+"""
+
+import functools
+import struct
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+import orjson
+
+from py_avro_schema import _binary
+from py_avro_schema._cache import cached
+from py_avro_schema._decoder import Data, Reader
+from py_avro_schema._encoder import record_attributes
+from py_avro_schema._fingerprint import resolution_form
+from py_avro_schema._options import Option
+from py_avro_schema._resolution import Skipper, _Resolver
+from py_avro_schema._schemas import (
+    RecordSchema,
+    Schema,
+    SequenceSchema,
+    TypeNotSupportedError,
+    UnionSchema,
+    root_schema_obj,
+)
+
+Getter = Callable[[memoryview, int], Any]
+"""Function returning the value, or a view of the value, at a position in a buffer"""
+
+
+@cached(values_on_class=True)
+def view(
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Type["RecordView"]:
+    """
+    Return a class of lazy views of instances of a record type in Avro binary encoding
+
+    A view is created from the encoded data of a record and reads a field from the data on first access, skipping the
+    fields before it without decoding them. Field positions are kept by the view, and nested records and arrays are
+    returned as views too. :meth:`RecordView.materialize` decodes the entire record into an instance of the Python type.
+    The class is cached.
+
+    Example::
+
+        ShipView = py_avro_schema.view(Ship)
+        ship_view = ShipView(data)
+        if ship_view.year_launched > 1900:
+            ship = ship_view.materialize()
+
+    :param py_type:   The Python class of records to view, a dataclass, Pydantic model, plain class or TypedDict.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :raises TypeNotSupportedError: If the type is not a record type or values of a type used by the schema cannot be
+                                   decoded.
+    """
+    schema_obj = root_schema_obj(py_type, namespace=namespace, options=options)
+    writer = orjson.loads(resolution_form(py_type, namespace=namespace, options=options))
+    compiler = _ViewCompiler(_Resolver(writer, schema_obj))
+    reader = compiler.resolver.unwrap(schema_obj)
+    if not isinstance(reader, RecordSchema):
+        raise TypeNotSupportedError(f"Cannot create views of {py_type}: only record types are supported")
+    return compiler.view_class(writer, reader)
+
+
+class RecordView:
+    """A lazy view of a record in Avro binary encoding"""
+
+    __slots__ = ("_buf", "_offsets")
+
+    _fields: Tuple[str, ...] = ()
+    _getters: List[Getter] = []
+    _skippers: List[Skipper] = []
+    _read: Reader
+
+    def __init__(self, data: Data):
+        """A lazy view of a record in Avro binary encoding"""
+        buf = memoryview(data)
+        self._buf = buf if buf.format == "B" else buf.cast("B")
+        #: Positions of the fields found so far
+        self._offsets = [0]
+
+    @classmethod
+    def _at(cls, buf: memoryview, pos: int) -> "RecordView":
+        """Return a view of the record at a position in a buffer"""
+        instance = cls.__new__(cls)
+        instance._buf = buf
+        instance._offsets = [pos]
+        return instance
+
+    def _get(self, index: int) -> Any:
+        """Return the value, or a view of the value, of the field with a given index"""
+        offsets = self._offsets
+        try:
+            while len(offsets) <= index:
+                offsets.append(self._skippers[len(offsets) - 1](self._buf, offsets[-1]))
+            return self._getters[index](self._buf, offsets[index])
+        except (IndexError, struct.error):
+            raise ValueError("Invalid Avro data: unexpected end of data") from None
+
+    def materialize(self) -> Any:
+        """Return the record decoded as an instance of its Python type"""
+        try:
+            return self._read(self._buf, self._offsets[0])[0]
+        except (IndexError, struct.error):
+            raise ValueError("Invalid Avro data: unexpected end of data") from None
+
+    def __repr__(self) -> str:
+        """Human representation of the view, without reading the record"""
+        return f"<{type(self).__name__} at position {self._offsets[0]}>"
+
+
+class _Field:
+    """Descriptor reading a field of a record view"""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index: int):
+        """Descriptor reading a field of a record view"""
+        self.index = index
+
+    def __get__(self, instance: Optional[RecordView], owner: type) -> Any:
+        """Return the value, or a view of the value, of the field"""
+        if instance is None:
+            return self
+        return instance._get(self.index)
+
+
+class ArrayView:
+    """A lazy view of an array in Avro binary encoding, reading items on access only"""
+
+    __slots__ = ("_buf", "_start", "_get_item", "_skip_item", "_read", "_offsets", "_pos", "_remaining", "_complete")
+
+    def __init__(self, buf: memoryview, pos: int, get_item: Getter, skip_item: Skipper, read: Reader):
+        """A lazy view of an array in Avro binary encoding, reading items on access only"""
+        self._buf = buf
+        self._start = pos
+        self._get_item = get_item
+        self._skip_item = skip_item
+        self._read = read
+        #: Positions of the items found so far, the position after them and the number of items left in the block
+        self._offsets: List[int] = []
+        self._pos = pos
+        self._remaining = 0
+        self._complete = False
+
+    def _scan(self, index: Optional[int] = None) -> None:
+        """Find the positions of items up to a given index, or of all items"""
+        buf, offsets, pos, remaining = self._buf, self._offsets, self._pos, self._remaining
+        try:
+            while not self._complete and (index is None or len(offsets) <= index):
+                if not remaining:
+                    remaining, pos = _binary.read_long(buf, pos)
+                    if remaining < 0:  # Block size in bytes follows the negated count
+                        remaining = -remaining
+                        _, pos = _binary.read_long(buf, pos)
+                    self._complete = remaining == 0
+                    continue
+                offsets.append(pos)
+                pos = self._skip_item(buf, pos)
+                remaining -= 1
+        except (IndexError, struct.error):
+            raise ValueError("Invalid Avro data: unexpected end of data") from None
+        self._pos, self._remaining = pos, remaining
+
+    def __len__(self) -> int:
+        """Number of items"""
+        self._scan()
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> Any:
+        """Return an item, or a view of an item"""
+        if index < 0:
+            index += len(self)
+        self._scan(index)
+        if not 0 <= index < len(self._offsets):
+            raise IndexError("array view index out of range")
+        return self._get_item(self._buf, self._offsets[index])
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the items, or views of the items"""
+        index = 0
+        while True:
+            self._scan(index)
+            if index >= len(self._offsets):
+                return
+            yield self._get_item(self._buf, self._offsets[index])
+            index += 1
+
+    def materialize(self) -> Any:
+        """Return the array decoded as a list, or other sequence, of instances of the items' Python type"""
+        try:
+            return self._read(self._buf, self._start)[0]
+        except (IndexError, struct.error):
+            raise ValueError("Invalid Avro data: unexpected end of data") from None
+
+    def __repr__(self) -> str:
+        """Human representation of the view, without reading the array"""
+        return f"<{type(self).__name__} at position {self._start}>"
+
+
+class _ViewCompiler:
+    """State for compiling view classes and getters for a tree of schema objects"""
+
+    def __init__(self, resolver: _Resolver):
+        """State for compiling view classes and getters for a tree of schema objects"""
+        #: Compiles readers and skippers, resolving the schema against itself
+        self.resolver = resolver
+        #: View classes by full name of the record, for recursive schemas
+        self.classes: Dict[str, Type[RecordView]] = {}
+
+    def view_class(self, writer: Dict[str, Any], reader: RecordSchema) -> Type[RecordView]:
+        """Return the view class for a record"""
+        if writer["name"] in self.classes:
+            return self.classes[writer["name"]]
+        attrs = record_attributes(reader)
+        cls: Any = type(f"{reader.name}View", (RecordView,), {"__slots__": (), "_fields": tuple(attrs)})
+        cls.__qualname__ = cls.__name__
+        cls.__module__ = __name__
+        self.classes[writer["name"]] = cls
+        cls._read = staticmethod(self.resolver.resolve(writer, reader))
+        cls._getters = [
+            self.getter(writer_field["type"], field.schema)
+            for writer_field, field in zip(writer["fields"], reader.record_fields)
+        ]
+        cls._skippers = [self.resolver.skipper(writer_field["type"]) for writer_field in writer["fields"]]
+        for index, attr in enumerate(attrs):
+            setattr(cls, attr, _Field(index))
+        return cls
+
+    def getter(self, writer: Any, reader: Schema) -> Getter:
+        """Return the getter of a value: a view for records and arrays, the decoded value otherwise"""
+        resolver = self.resolver
+        writer = resolver.writer_named.get(writer, writer) if isinstance(writer, str) else writer
+        reader = resolver.unwrap(reader)
+        if isinstance(reader, RecordSchema):
+            return self.view_class(writer, reader)._at
+        if isinstance(reader, SequenceSchema):
+            return functools.partial(
+                _array_view,
+                self.getter(writer["items"], reader.items_schema),
+                resolver.skipper(writer["items"]),
+                resolver.resolve(writer, reader),
+            )
+        if isinstance(writer, list) and isinstance(reader, UnionSchema):
+            groups: Dict[int, List[Schema]] = {}
+            for item_schema, index in zip(reader.item_schemas, reader.branch_indexes()):
+                groups.setdefault(index, []).append(item_schema)
+            branches = [
+                self.getter(item, group[0]) if len(group) == 1 else _value_getter(resolver.resolve(item, reader))
+                for item, group in zip(writer, groups.values())
+            ]
+            return functools.partial(_union_getter, branches)
+        return _value_getter(resolver.resolve(writer, reader))
+
+
+def _array_view(get_item: Getter, skip_item: Skipper, read: Reader, buf: memoryview, pos: int) -> ArrayView:
+    """Return a view of the array at a position in a buffer"""
+    return ArrayView(buf, pos, get_item, skip_item, read)
+
+
+def _union_getter(branches: List[Getter], buf: memoryview, pos: int) -> Any:
+    """Return the value, or a view of the value, of a union branch"""
+    index, pos = _binary.read_long(buf, pos)
+    if not 0 <= index < len(branches):
+        raise ValueError(f"Invalid Avro data: {index} is not a branch index")
+    return branches[index](buf, pos)
+
+
+def _value_getter(read: Reader) -> Getter:
+    """Return the getter of a value decoded by a reader"""
+
+    def get_value(buf: memoryview, pos: int) -> Any:
+        """Return the value at a position in a buffer"""
+        return read(buf, pos)[0]
+
+    return get_value
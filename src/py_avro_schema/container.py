@@ -0,0 +1,661 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Write and read Avro Object Container Files holding instances of Python types
+
+See https://avro.apache.org/docs/1.11.1/specification/#object-container-files. A container file starts with a header
+holding the schema, followed by blocks of records compressed with the file's codec. Records are encoded and decoded
+with the compiled encoder and decoder for the Python type, see :func:`py_avro_schema.encoder` and
+:func:`py_avro_schema.decoder`.
+
+Example::
+
+    with open("ships.avro", "wb") as fileobj, container.Writer(fileobj, Ship, codec="deflate") as writer:
+        writer.write_many(ships)
+
+    with open("ships.avro", "rb") as fileobj:
+        for ship in container.Reader(fileobj, Ship):
+            ...
+"""
+
+import bisect
+import collections
+import concurrent.futures
+import itertools
+import mmap
+import os
+import struct
+import zlib
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import orjson
+
+import py_avro_schema
+from py_avro_schema import _binary, _columnar, _decoder, _encoder
+from py_avro_schema._fingerprint import canonical_schema_data, resolution_form
+from py_avro_schema._options import Option
+
+MAGIC = b"Obj\x01"
+"""The 4 bytes a container file starts with"""
+
+SYNC_SIZE = 16
+"""The size of the sync marker written after the header and after each block"""
+
+INDEX_SUFFIX = ".idx"
+"""Suffix appended to a container file's path for the path of its block index, see :meth:`MappedReader.save_index`"""
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+"""Default size in bytes of the uncompressed records of a block above which the block is written"""
+
+_FORMAT_OPTIONS = Option.JSON_INDENT_2 | Option.JSON_APPEND_NEWLINE
+
+_TASK_RECORDS = 10_000
+"""Minimum number of records decoded by a worker process per task, grouping consecutive blocks"""
+
+_PENDING_TASKS_PER_WORKER = 2
+"""Maximum number of tasks submitted per worker process and not yet consumed, bounding memory use"""
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _deflate(data: Buffer) -> Buffer:
+    """Compress data using raw deflate, without zlib header and checksum, as per the Avro specification"""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _inflate(data: Buffer) -> Buffer:
+    """Decompress data compressed using raw deflate"""
+    return zlib.decompress(data, -zlib.MAX_WBITS)
+
+
+def _identity(data: Buffer) -> Buffer:
+    """Return data as is"""
+    return data
+
+
+CODECS: Dict[str, Tuple[Callable[[Buffer], Buffer], Callable[[Buffer], Buffer]]] = {
+    "null": (_identity, _identity),
+    "deflate": (_deflate, _inflate),
+}
+"""Compression and decompression functions by codec name"""
+
+
+def _codec(name: str) -> Tuple[Callable[[Buffer], Buffer], Callable[[Buffer], Buffer]]:
+    """Return the compression and decompression functions for a codec"""
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported Avro codec {name!r}. Supported codecs are: {', '.join(CODECS)}") from None
+
+
+class Writer:
+    """
+    Writer of an Avro container file holding instances of a Python type
+
+    Records are buffered in memory and written as a block once the block holds ``block_size`` bytes before compression
+    or ``block_records`` records, whichever comes first. The last block is written when the writer is closed, for
+    example when leaving a ``with`` block. Closing the writer flushes the file object but does not close it.
+
+    :param fileobj:       Binary file object to write to, positioned at the start of the file.
+    :param py_type:       The Python class of the records. The file's schema is the schema generated for this class.
+    :param codec:         ``"null"`` for no compression, or ``"deflate"``.
+    :param block_size:    The size in bytes of a block's records, before compression, above which it is written.
+    :param block_records: The number of records above which a block is written. By default, blocks are written by size
+                          only.
+    :param namespace:     The Avro namespace to add to schemas.
+    :param options:       Schema generation options as defined by :class:`Option` enum values.
+    """
+
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        py_type: Any,
+        *,
+        codec: str = "null",
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        block_records: Optional[int] = None,
+        namespace: Optional[str] = None,
+        options: Option = Option(0),
+    ):
+        """Writer of an Avro container file holding instances of a Python type"""
+        self._compress = _codec(codec)[0]
+        self._fileobj = fileobj
+        self._write_record = _encoder.writer(py_type, namespace=namespace, options=options)
+        self._py_type = py_type
+        self._namespace = namespace
+        self._options = options
+        self._block_size = block_size
+        self._block_records = block_records or -1
+        self._buffer = bytearray()
+        self._count = 0
+        #: The schema as a JSON-formatted bytestring, as written in the file header
+        self.schema = py_avro_schema.generate(py_type, namespace=namespace, options=options & ~_FORMAT_OPTIONS)
+        #: The codec name
+        self.codec = codec
+        #: The random marker written after each block
+        self.sync_marker = os.urandom(SYNC_SIZE)
+        self._write_header()
+
+    def __enter__(self) -> "Writer":
+        """Return the writer itself"""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Write the last block"""
+        self.close()
+
+    def _write_header(self) -> None:
+        """Write the file header: the magic bytes, the metadata holding the schema and codec, and the sync marker"""
+        header = bytearray(MAGIC)
+        metadata = {"avro.schema": self.schema, "avro.codec": self.codec.encode()}
+        _binary.write_long(header, len(metadata))
+        for key, value in metadata.items():
+            _binary.write_string(header, key)
+            _binary.write_bytes(header, value)
+        header.append(0)
+        header += self.sync_marker
+        self._fileobj.write(header)
+
+    def write(self, value: Any) -> None:
+        """Write a record, writing the current block first if full"""
+        self._write_record(self._buffer, value)
+        self._count += 1
+        if len(self._buffer) >= self._block_size or self._count == self._block_records:
+            self.flush()
+
+    def write_many(self, values: Iterable[Any]) -> None:
+        """Write many records"""
+        for value in values:
+            self.write(value)
+
+    def write_batch(self, values: Iterable[Any]) -> None:
+        """
+        Write many records encoded one field at a time, see :func:`py_avro_schema.encode_batch`
+
+        Blocks are written once full, exactly like when writing the records one by one, without encoding them again.
+        """
+        batch = _columnar.encode_batch(values, self._py_type, namespace=self._namespace, options=self._options)
+        data, offsets = memoryview(batch.data), batch.offsets
+        start, count = 0, len(offsets) - 1
+        while start < count:
+            # The first record after which the block is full, by size or by number of records
+            stop = bisect.bisect_left(offsets, offsets[start] + self._block_size - len(self._buffer), start + 1)
+            if self._block_records > 0:
+                stop = min(stop, start + self._block_records - self._count)
+            self._buffer += data[offsets[start] : offsets[min(stop, count)]]
+            self._count += min(stop, count) - start
+            if stop <= count:
+                self._write_block()
+            start = stop
+
+    def flush(self) -> None:
+        """Write the records buffered so far as a block, if any, and flush the file object"""
+        self._write_block()
+        self._fileobj.flush()
+
+    def _write_block(self) -> None:
+        """Write the records buffered so far as a block, if any"""
+        if self._count:
+            data = self._compress(self._buffer)
+            block = bytearray()
+            _binary.write_long(block, self._count)
+            _binary.write_long(block, len(data))
+            self._fileobj.write(block)
+            self._fileobj.write(data)
+            self._fileobj.write(self.sync_marker)
+            self._buffer.clear()
+            self._count = 0
+
+    def close(self) -> None:
+        """Write the last block, if any. The file object is not closed."""
+        self.flush()
+
+
+class Reader:
+    """
+    Reader of an Avro container file holding instances of a Python type
+
+    Iterating over the reader yields the records, reading the file one block at a time such that memory use does not
+    depend on the size of the file. The file must have been written with the schema generated for the Python type with
+    the same namespace and options, as compared using the schemas' Parsing Canonical Form.
+
+    :param fileobj:   Binary file object to read from, positioned at the start of the file.
+    :param py_type:   The Python class of the records.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    :raises ValueError: If the file is not an Avro container file, uses an unsupported codec or uses a different schema.
+    """
+
+    def __init__(
+        self,
+        fileobj: IO[bytes],
+        py_type: Any,
+        *,
+        namespace: Optional[str] = None,
+        options: Option = Option(0),
+    ):
+        """Reader of an Avro container file holding instances of a Python type"""
+        self._fileobj = fileobj
+        #: The file metadata, including the schema as ``avro.schema`` and the codec as ``avro.codec``
+        self.metadata: Dict[str, bytes]
+        #: The random marker written after each block
+        self.sync_marker: bytes
+        self.metadata, self.sync_marker = _read_header(self._read_long, self._read_exactly)
+        #: The schema as a JSON-formatted bytestring, as written in the file header
+        self.schema = self.metadata["avro.schema"]
+        #: The codec name
+        self.codec = self.metadata.get("avro.codec", b"null").decode()
+        self._decompress = _codec(self.codec)[1]
+        check_schema(self.schema, py_type, namespace=namespace, options=options)
+        self._read_record = _decoder.reader(py_type, namespace=namespace, options=options)
+
+    def _read_long(self, first: bytes = b"") -> int:
+        """Read a zig-zag encoded variable-length integer from the file, given its first byte if read already"""
+        byte = (first or self._read_exactly(1))[0]
+        n = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = self._read_exactly(1)[0]
+            n |= (byte & 0x7F) << shift
+            shift += 7
+        return (n >> 1) ^ -(n & 1)
+
+    def _read_exactly(self, size: int) -> bytes:
+        """Read a given number of bytes from the file"""
+        data = self._fileobj.read(size) if size >= 0 else b""
+        if len(data) != size:
+            raise ValueError("Invalid Avro container file: unexpected end of file")
+        return data
+
+    def blocks(self) -> Iterator[Tuple[int, Buffer]]:
+        """Yield the number of records and the decompressed data of each block"""
+        while True:
+            first = self._fileobj.read(1)
+            if not first:
+                return
+            count = self._read_long(first)
+            data = self._read_exactly(self._read_long())
+            if self._read_exactly(SYNC_SIZE) != self.sync_marker:
+                raise ValueError("Invalid Avro container file: sync marker does not match")
+            yield count, self._decompress(data)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield the records"""
+        for count, data in self.blocks():
+            yield from decode_block(self._read_record, count, data)
+
+
+class Block(NamedTuple):
+    """The location of a block in a container file"""
+
+    #: The position in the file of the block's data, after the number of records and size
+    offset: int
+    #: The number of records in the block
+    record_count: int
+    #: The size in bytes of the block's data, compressed
+    size: int
+
+
+class MappedReader:
+    """
+    Reader of an Avro container file holding instances of a Python type, memory-mapping the file for random access
+
+    The file is scanned once to build an index of its blocks, skipping over their data without reading it. The index
+    can be saved next to the file using :meth:`save_index` and loaded again by a later reader, which skips the scan.
+    Blocks are then decoded on demand, by block number using :meth:`read_block` or by record number using
+    :meth:`iter_range`. Data is read from views of the mapped file, such that files with the ``null`` codec are decoded
+    without copying.
+
+    The file must have been written with the schema generated for the Python type with the same namespace and options.
+    The reader can be used as a context manager, closing the file when leaving the ``with`` block.
+
+    :param path:       The path of the file.
+    :param py_type:    The Python class of the records.
+    :param index:      The index of the file's blocks, if known already.
+    :param index_path: The path of an index file written by :meth:`save_index`, loaded if it exists and matches the
+                       file.
+    :param namespace:  The Avro namespace to add to schemas.
+    :param options:    Schema generation options as defined by :class:`Option` enum values.
+    :raises ValueError: If the file is not an Avro container file, uses an unsupported codec or uses a different schema.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        py_type: Any,
+        *,
+        index: Optional[Sequence[Block]] = None,
+        index_path: Union[str, os.PathLike, None] = None,
+        namespace: Optional[str] = None,
+        options: Option = Option(0),
+    ):
+        """Reader of an Avro container file holding instances of a Python type, memory-mapping the file"""
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as fileobj:
+            try:
+                self._mmap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty file
+                raise ValueError("Not an Avro container file") from None
+        self._buf = memoryview(self._mmap)
+        cursor = _Cursor(self._buf)
+        #: The file metadata, including the schema as ``avro.schema`` and the codec as ``avro.codec``
+        self.metadata: Dict[str, bytes]
+        #: The random marker written after each block
+        self.sync_marker: bytes
+        self.metadata, self.sync_marker = _read_header(cursor.read_long, cursor.read_exactly)
+        self._data_start = cursor.pos
+        #: The schema as a JSON-formatted bytestring, as written in the file header
+        self.schema = self.metadata["avro.schema"]
+        #: The codec name
+        self.codec = self.metadata.get("avro.codec", b"null").decode()
+        self._decompress = _codec(self.codec)[1]
+        check_schema(self.schema, py_type, namespace=namespace, options=options)
+        self._read_record = _decoder.reader(py_type, namespace=namespace, options=options)
+        if index is None and index_path is not None:
+            index = self._load_index(index_path)
+        #: The blocks of the file
+        self.index: List[Block] = list(index) if index is not None else self._scan()
+        #: The number of the first record of each block, followed by the total number of records
+        self._starts = list(itertools.accumulate((block.record_count for block in self.index), initial=0))
+
+    def __enter__(self) -> "MappedReader":
+        """Return the reader itself"""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the file"""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the file
+
+        If records decoded without copying are still referenced, the file is closed when they are garbage collected.
+        """
+        self._buf.release()
+        try:
+            self._mmap.close()
+        except BufferError:  # Views of the mapped file still exist
+            pass
+
+    def _scan(self) -> List[Block]:
+        """Return the index of the file's blocks, reading the number of records and size of each block only"""
+        cursor = _Cursor(self._buf, self._data_start)
+        end = len(self._buf)
+        blocks = []
+        while cursor.pos < end:
+            count = cursor.read_long()
+            size = cursor.read_long()
+            blocks.append(Block(cursor.pos, count, size))
+            cursor.pos += size
+            if cursor.read_exactly(SYNC_SIZE) != self.sync_marker:
+                raise ValueError("Invalid Avro container file: sync marker does not match")
+        return blocks
+
+    def save_index(self, index_path: Union[str, os.PathLike, None] = None) -> str:
+        """
+        Save the index of the file's blocks and return the index file's path
+
+        :param index_path: The path of the index file. Defaults to the path of the container file with the suffix
+                           ``.idx`` appended.
+        """
+        index_path = os.fspath(index_path) if index_path is not None else f"{self.path}{INDEX_SUFFIX}"
+        data = {
+            "file_size": len(self._buf),
+            "sync_marker": self.sync_marker.hex(),
+            "blocks": [list(block) for block in self.index],
+        }
+        with open(index_path, "wb") as fileobj:
+            fileobj.write(orjson.dumps(data))
+        return index_path
+
+    def _load_index(self, index_path: Union[str, os.PathLike]) -> Optional[List[Block]]:
+        """Return the index of the file's blocks saved in a file, or None if missing or not matching the file"""
+        try:
+            with open(index_path, "rb") as fileobj:
+                data = orjson.loads(fileobj.read())
+        except FileNotFoundError:
+            return None
+        if data["file_size"] != len(self._buf) or data["sync_marker"] != self.sync_marker.hex():
+            return None
+        return [Block(*block) for block in data["blocks"]]
+
+    def __len__(self) -> int:
+        """Return the number of records in the file"""
+        return self._starts[-1]
+
+    def block_data(self, i: int) -> Buffer:
+        """Return the decompressed data of a block"""
+        block = self.index[i]
+        return self._decompress(self._buf[block.offset : block.offset + block.size])
+
+    def read_block(self, i: int) -> List[Any]:
+        """Return the records of a block"""
+        return list(decode_block(self._read_record, self.index[i].record_count, self.block_data(i)))
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Any]:
+        """
+        Yield the records from number ``start`` up to, but not including, number ``stop``
+
+        Only the blocks holding these records are decoded.
+
+        :param start: The number of the first record, from 0.
+        :param stop:  The number of the record to stop at. Defaults to the number of records in the file.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start < 0 or stop < 0:
+            raise ValueError("Record numbers must not be negative")
+        i = bisect.bisect_right(self._starts, start) - 1
+        while i < len(self.index) and self._starts[i] < stop:
+            first = self._starts[i]
+            records = decode_block(self._read_record, self.index[i].record_count, self.block_data(i))
+            yield from itertools.islice(records, max(start - first, 0), stop - first)
+            i += 1
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield the records"""
+        for i, block in enumerate(self.index):
+            yield from decode_block(self._read_record, block.record_count, self.block_data(i))
+
+
+def parallel_read(
+    path: Union[str, os.PathLike],
+    py_type: Any,
+    *,
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    index: Optional[Sequence[Block]] = None,
+    index_path: Union[str, os.PathLike, None] = None,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> Iterator[Any]:
+    """
+    Yield the records of an Avro container file holding instances of a Python type, decoded by many processes
+
+    The file's blocks are indexed first, like :class:`MappedReader` does. Ranges of consecutive blocks are then decoded
+    by a pool of worker processes, each memory-mapping the file itself, and the records are sent back to the calling
+    process. Only a few ranges per worker are decoded ahead of the records consumed, such that memory use is bounded
+    whatever the size of the file.
+
+    Worker processes receive the Python type by pickling it, so the type must be importable by its module and name.
+
+    :param path:       The path of the file.
+    :param py_type:    The Python class of the records.
+    :param workers:    The number of worker processes. Defaults to the number of CPUs.
+    :param ordered:    Whether to yield the records in file order. Otherwise, records are yielded by range of blocks as
+                       soon as decoded.
+    :param index:      The index of the file's blocks, if known already.
+    :param index_path: The path of an index file written by :meth:`MappedReader.save_index`, loaded if it exists and
+                       matches the file.
+    :param namespace:  The Avro namespace to add to schemas.
+    :param options:    Schema generation options as defined by :class:`Option` enum values.
+    :raises ValueError: If the file is not an Avro container file, uses an unsupported codec or uses a different schema.
+    """
+    with MappedReader(
+        path, py_type, index=index, index_path=index_path, namespace=namespace, options=options
+    ) as reader:
+        index = reader.index
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * _PENDING_TASKS_PER_WORKER
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(os.fspath(path), py_type, index, namespace, options),
+    )
+    try:
+        if ordered:
+            pending: Deque[concurrent.futures.Future] = collections.deque()
+            for start, stop in _block_ranges(index):
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(_read_blocks, start, stop))
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            not_done: Set[concurrent.futures.Future] = set()
+            for start, stop in _block_ranges(index):
+                if len(not_done) >= max_pending:
+                    done, not_done = concurrent.futures.wait(not_done, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+                not_done.add(executor.submit(_read_blocks, start, stop))
+            for future in concurrent.futures.as_completed(not_done):
+                yield from future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _block_ranges(index: Sequence[Block]) -> Iterator[Tuple[int, int]]:
+    """Yield ranges of consecutive block numbers holding at least a minimum number of records, but the last range"""
+    start = records = 0
+    for i, block in enumerate(index):
+        records += block.record_count
+        if records >= _TASK_RECORDS:
+            yield start, i + 1
+            start, records = i + 1, 0
+    if start < len(index):
+        yield start, len(index)
+
+
+_worker_reader: Optional[MappedReader] = None
+"""The reader of the file decoded by a worker process of :func:`parallel_read`"""
+
+
+def _init_worker(path: str, py_type: Any, index: Sequence[Block], namespace: Optional[str], options: Option) -> None:
+    """Worker process function to memory-map the file to read"""
+    global _worker_reader
+    _worker_reader = MappedReader(path, py_type, index=index, namespace=namespace, options=options)
+
+
+def _read_blocks(start: int, stop: int) -> List[Any]:
+    """Worker process function to decode a range of blocks"""
+    assert _worker_reader is not None
+    records = []
+    for i in range(start, stop):
+        records.extend(_worker_reader.read_block(i))
+    return records
+
+
+class _Cursor:
+    """A position in a buffer, to read a container file's header and block headers from a memory-mapped file"""
+
+    __slots__ = ("buf", "pos")
+
+    def __init__(self, buf: memoryview, pos: int = 0):
+        """A position in a buffer"""
+        self.buf = buf
+        self.pos = pos
+
+    def read_long(self) -> int:
+        """Read a zig-zag encoded variable-length integer"""
+        try:
+            value, self.pos = _binary.read_long(self.buf, self.pos)
+        except IndexError:
+            raise ValueError("Invalid Avro container file: unexpected end of file") from None
+        return value
+
+    def read_exactly(self, size: int) -> bytes:
+        """Read a given number of bytes"""
+        end = self.pos + size
+        if size < 0 or end > len(self.buf):
+            raise ValueError("Invalid Avro container file: unexpected end of file")
+        data = bytes(self.buf[self.pos : end])
+        self.pos = end
+        return data
+
+
+def _read_header(read_long: Callable[[], int], read_exactly: Callable[[int], bytes]) -> Tuple[Dict[str, bytes], bytes]:
+    """Read a file header, given functions reading from the file, and return the metadata and the sync marker"""
+    if read_exactly(len(MAGIC)) != MAGIC:
+        raise ValueError("Not an Avro container file")
+    metadata = {}
+    count = read_long()
+    while count:
+        if count < 0:
+            count = -count
+            read_long()  # Block size in bytes
+        for _ in range(count):
+            key = read_exactly(read_long()).decode()
+            metadata[key] = read_exactly(read_long())
+        count = read_long()
+    if "avro.schema" not in metadata:
+        raise ValueError("Invalid Avro container file: no schema in the header")
+    return metadata, read_exactly(SYNC_SIZE)
+
+
+def decode_block(read: _decoder.Reader, count: int, data: Any) -> Iterator[Any]:
+    """Yield the records of a block given its number of records and decompressed data"""
+    buf = memoryview(data)
+    pos = 0
+    try:
+        for _ in range(count):
+            value, pos = read(buf, pos)
+            yield value
+    except (IndexError, struct.error):
+        raise ValueError("Invalid Avro container file: unexpected end of block") from None
+    if pos != len(buf):
+        raise ValueError(f"Invalid Avro container file: {len(buf) - pos} bytes left after decoding a block")
+
+
+def check_schema(
+    schema: bytes,
+    py_type: Any,
+    *,
+    namespace: Optional[str] = None,
+    options: Option = Option(0),
+) -> None:
+    """
+    Check that a writer's schema is the schema generated for a Python type, comparing their Parsing Canonical Form
+    including logical types
+
+    :raises ValueError: If the schemas differ.
+    """
+    writer_form = orjson.dumps(canonical_schema_data(orjson.loads(schema), logical_types=True))
+    if writer_form != resolution_form(py_type, namespace=namespace, options=options):
+        raise ValueError(f"The Avro data was written with a schema different from the schema for {py_type}")
@@ -0,0 +1,348 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+
+"""
+Serialize instances of Python types in the Confluent Schema Registry wire format
+
+Each message is a magic byte ``0``, the 4-byte big-endian id of the writer's schema in a schema registry and the Avro
+binary encoded data. Schema ids are looked up in a registry once per schema and kept in memory, keyed by the schema's
+fingerprint, such that only the first message of a type requires a lookup. Registries are pluggable by subclassing
+:class:`SchemaRegistry`; :class:`SQLiteSchemaRegistry` is a local registry backed by a SQLite database file, for
+services and tests running without a registry server.
+
+Example::
+
+    serializer = registry.Serializer(registry.SQLiteSchemaRegistry("schemas.db"))
+    serializer.prefetch([Ship, Port])  # Optional: look up the ids of many types at once
+    message = serializer.serialize(Ship(name="Titanic", year_launched=1911))
+    ship = serializer.deserialize(message, Ship)
+"""
+
+import abc
+import sqlite3
+import struct
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+
+import py_avro_schema
+from py_avro_schema import _decoder, _encoder
+from py_avro_schema._cache import TypeCache
+from py_avro_schema._fingerprint import (
+    _IGNORED_OPTIONS,
+    CRC_64_AVRO,
+    _fingerprint,
+    canonical_schema_data,
+    crc_64_avro,
+)
+from py_avro_schema._options import Option
+
+MAGIC_BYTE = 0
+"""The first byte of a message in the wire format"""
+
+_HEADER = struct.Struct(">bI")
+
+_MAX_TYPES = 256
+"""Maximum number of Python types to keep serializing and resolving decoders for, per serializer"""
+
+
+class SchemaRegistry(abc.ABC):
+    """A registry assigning ids to Avro schemas, registered under subjects"""
+
+    @abc.abstractmethod
+    def register(self, subject: str, schema: bytes) -> int:
+        """
+        Register a schema under a subject, if not registered already, and return the schema's id
+
+        :param subject: The subject, for example the topic name suffixed with ``-value``.
+        :param schema:  The Avro schema as a JSON-formatted bytestring.
+        """
+
+    def register_many(self, subjects_and_schemas: Sequence[Tuple[str, bytes]]) -> List[int]:
+        """
+        Register many schemas, each under a subject, and return their ids
+
+        By default, schemas are registered one by one. Registries supporting bulk operations should override this.
+        """
+        return [self.register(subject, schema) for subject, schema in subjects_and_schemas]
+
+    @abc.abstractmethod
+    def get_schema(self, schema_id: int) -> bytes:
+        """
+        Return a schema by its id, as a JSON-formatted bytestring
+
+        :raises KeyError: If no schema has the id.
+        """
+
+
+class SQLiteSchemaRegistry(SchemaRegistry):
+    """
+    A schema registry stored in a local SQLite database
+
+    Like a Confluent Schema Registry, a schema has the same id whatever the subject, schemas being equal if their
+    Parsing Canonical Forms are equal, and ids start at 1. Registering many schemas uses a single transaction.
+
+    :param path: The path of the database file, created if it does not exist, or ``":memory:"``.
+    """
+
+    def __init__(self, path: str):
+        """A schema registry stored in a local SQLite database"""
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS schemas (id INTEGER PRIMARY KEY, fingerprint BLOB UNIQUE NOT NULL, "
+                "schema BLOB NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS subjects (subject TEXT NOT NULL, version INTEGER NOT NULL, "
+                "schema_id INTEGER NOT NULL REFERENCES schemas (id), PRIMARY KEY (subject, version), "
+                "UNIQUE (subject, schema_id))"
+            )
+
+    def close(self) -> None:
+        """Close the database"""
+        self._connection.close()
+
+    def register(self, subject: str, schema: bytes) -> int:
+        """Register a schema under a subject, if not registered already, and return the schema's id"""
+        return self.register_many([(subject, schema)])[0]
+
+    def register_many(self, subjects_and_schemas: Sequence[Tuple[str, bytes]]) -> List[int]:
+        """Register many schemas, each under a subject, in a single transaction, and return their ids"""
+        ids = []
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for subject, schema in subjects_and_schemas:
+                    fingerprint = _schema_fingerprint(schema)
+                    cursor.execute(
+                        "INSERT INTO schemas (fingerprint, schema) VALUES (?, ?) ON CONFLICT (fingerprint) DO NOTHING",
+                        (fingerprint, schema),
+                    )
+                    (schema_id,) = cursor.execute(
+                        "SELECT id FROM schemas WHERE fingerprint = ?", (fingerprint,)
+                    ).fetchone()
+                    cursor.execute(
+                        "INSERT INTO subjects (subject, version, schema_id) "
+                        "SELECT ?1, COALESCE(MAX(version), 0) + 1, ?2 FROM subjects WHERE subject = ?1 "
+                        "ON CONFLICT (subject, schema_id) DO NOTHING",
+                        (subject, schema_id),
+                    )
+                    ids.append(schema_id)
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+        return ids
+
+    def get_schema(self, schema_id: int) -> bytes:
+        """Return a schema by its id, as a JSON-formatted bytestring"""
+        with self._lock:
+            row = self._connection.execute("SELECT schema FROM schemas WHERE id = ?", (schema_id,)).fetchone()
+        if row is None:
+            raise KeyError(schema_id)
+        return row[0]
+
+    def subjects(self) -> Dict[str, List[int]]:
+        """Return the ids of the schema versions registered under each subject, oldest first"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT subject, schema_id FROM subjects ORDER BY subject, version"
+            ).fetchall()
+        subjects: Dict[str, List[int]] = {}
+        for subject, schema_id in rows:
+            subjects.setdefault(subject, []).append(schema_id)
+        return subjects
+
+
+def _schema_fingerprint(schema: bytes) -> bytes:
+    """
+    Return the CRC-64-AVRO fingerprint of a JSON-formatted schema, including logical types
+
+    Unlike the Parsing Canonical Form, schemas with different logical types, like timestamps in milli- or microseconds,
+    have different fingerprints. Their data is not read as the same values.
+    """
+    return crc_64_avro(orjson.dumps(canonical_schema_data(orjson.loads(schema), logical_types=True)))
+
+
+def record_name_subject(py_type: Any, schema: bytes) -> str:
+    """
+    Return the subject to register a schema under: the full name of the record, or the type of other schemas
+
+    This is the Confluent ``RecordNameStrategy``.
+    """
+    canonical = canonical_schema_data(orjson.loads(schema))
+    if isinstance(canonical, dict):
+        return str(canonical.get("name", canonical["type"]))
+    return canonical if isinstance(canonical, str) else "union"
+
+
+class Serializer:
+    """
+    Serializer of instances of Python types in the Confluent Schema Registry wire format
+
+    Schema ids are cached by schema fingerprint, such that the registry is accessed once per schema only, and
+    serializing functions are compiled once per Python type. To avoid a registry lookup per type on first use, for
+    example on a service's first requests, look up the ids of all types at once using :meth:`prefetch`.
+
+    :param registry:  The schema registry.
+    :param subject:   Function returning the subject to register a schema under, given the Python type and the schema.
+                      Defaults to the record's full name, see :func:`record_name_subject`.
+    :param namespace: The Avro namespace to add to schemas.
+    :param options:   Schema generation options as defined by :class:`Option` enum values.
+    """
+
+    def __init__(
+        self,
+        registry: SchemaRegistry,
+        *,
+        subject: Callable[[Any, bytes], str] = record_name_subject,
+        namespace: Optional[str] = None,
+        options: Option = Option(0),
+    ):
+        """Serializer of instances of Python types in the Confluent Schema Registry wire format"""
+        self.registry = registry
+        self._subject = subject
+        self._namespace = namespace
+        self._options = options
+        self._lock = threading.Lock()
+        #: Schema ids by schema fingerprint, including logical types
+        self._ids: Dict[bytes, int] = {}
+        #: Schemas data to deserialize was written with, by schema id
+        self._writer_schemas: Dict[int, bytes] = {}
+        #: Schema fingerprints, including logical types, by schema id
+        self._writer_fingerprints: Dict[int, bytes] = {}
+        #: Serializing functions by Python type
+        self._encoders = TypeCache(maxsize=_MAX_TYPES)
+        #: Decoders of data written with other schemas than the schema for a type, by type and schema id
+        self._resolving_decoders = TypeCache(maxsize=_MAX_TYPES)
+
+    def serialize(self, value: Any, py_type: Any = None) -> bytes:
+        """
+        Return a value in the wire format
+
+        :param value:   The value to serialize.
+        :param py_type: The Python type of the value. Defaults to the value's class.
+        """
+        if py_type is None:
+            py_type = type(value)
+        try:
+            encode = self._encoders.get(py_type)
+        except TypeError:  # Unhashable type hint
+            return self._compile(py_type)(value)
+        if encode is None:
+            encode = self._compile(py_type)
+            self._encoders.set(py_type, (), encode)
+        return encode(value)
+
+    def _compile(self, py_type: Any) -> Callable[[Any], bytes]:
+        """Return a function serializing values of a Python type, looking up its schema id if not known yet"""
+        header = _HEADER.pack(MAGIC_BYTE, self.schema_id(py_type))
+        write = _encoder.writer(py_type, namespace=self._namespace, options=self._options)
+
+        def encode(value: Any) -> bytes:
+            """Return a value in the wire format"""
+            out = bytearray(header)
+            write(out, value)
+            return bytes(out)
+
+        return encode
+
+    def schema_id(self, py_type: Any) -> int:
+        """Return the registry's id of the schema for a Python type, registering the schema if needed"""
+        fingerprint = self._fingerprint(py_type)
+        try:
+            return self._ids[fingerprint]
+        except KeyError:
+            self.prefetch([py_type])
+            return self._ids[fingerprint]
+
+    def prefetch(self, py_types: Iterable[Any]) -> None:
+        """Look up the schema ids of many Python types at once, registering their schemas if needed"""
+        with self._lock:
+            missing: Dict[bytes, Tuple[str, bytes]] = {}
+            for py_type in py_types:
+                fingerprint = self._fingerprint(py_type)
+                if fingerprint not in self._ids and fingerprint not in missing:
+                    schema = py_avro_schema.generate(py_type, namespace=self._namespace, options=self._options)
+                    missing[fingerprint] = (self._subject(py_type, schema), schema)
+            if missing:
+                ids = self.registry.register_many(list(missing.values()))
+                self._ids.update(zip(missing, ids))
+                self._writer_fingerprints.update(zip(ids, missing))
+
+    def _fingerprint(self, py_type: Any) -> bytes:
+        """Return the fingerprint of the schema for a Python type, including logical types"""
+        options = self._options & ~_IGNORED_OPTIONS
+        return _fingerprint(
+            py_type, algorithm=CRC_64_AVRO, namespace=self._namespace, options=options, logical_types=True
+        )
+
+    def deserialize(self, data: _decoder.Data, py_type: Any) -> Any:
+        """
+        Return a value of a Python type from data in the wire format
+
+        Data written with another schema than the schema for the type, for example an older version of it, is decoded
+        resolving the writer's schema against the type's schema, see :func:`py_avro_schema.resolving_decoder`. The
+        writer's schema is fetched from the registry once per schema id. Unlike serializing, deserializing never
+        registers schemas.
+
+        :raises ValueError: If the data is not in the wire format, or if its schema cannot be resolved against the
+                            schema for the type.
+        """
+        buf = memoryview(data)
+        if len(buf) < _HEADER.size or buf[0] != MAGIC_BYTE:
+            raise ValueError("Data is not in the Confluent Schema Registry wire format")
+        _, schema_id = _HEADER.unpack_from(buf)
+        if self._writer_fingerprint(schema_id) == self._fingerprint(py_type):
+            decode = py_avro_schema.decoder(py_type, namespace=self._namespace, options=self._options)
+        else:
+            decode = self._resolving_decoder(schema_id, py_type)
+        return decode(buf[_HEADER.size :])
+
+    def _writer_fingerprint(self, schema_id: int) -> bytes:
+        """Return the fingerprint of a schema in the registry, fetching the schema once per id"""
+        try:
+            return self._writer_fingerprints[schema_id]
+        except KeyError:
+            pass
+        fingerprint = _schema_fingerprint(self._writer_schema(schema_id))
+        self._writer_fingerprints[schema_id] = fingerprint
+        return fingerprint
+
+    def _writer_schema(self, schema_id: int) -> bytes:
+        """Return a schema in the registry, fetching it once per id"""
+        try:
+            return self._writer_schemas[schema_id]
+        except KeyError:
+            schema = self._writer_schemas[schema_id] = self.registry.get_schema(schema_id)
+            return schema
+
+    def _resolving_decoder(self, schema_id: int, py_type: Any) -> Callable[[_decoder.Data], Any]:
+        """Return the decoder for data written with a schema registered with another id than the type's schema"""
+        try:
+            decode = self._resolving_decoders.get(py_type, schema_id)
+        except TypeError:  # Unhashable type hint
+            return self._compile_resolving_decoder(schema_id, py_type)
+        if decode is None:
+            decode = self._compile_resolving_decoder(schema_id, py_type)
+            self._resolving_decoders.set(py_type, schema_id, decode)
+        return decode
+
+    def _compile_resolving_decoder(self, schema_id: int, py_type: Any) -> Callable[[_decoder.Data], Any]:
+        """Return a decoder resolving a schema in the registry against the schema for a type"""
+        return py_avro_schema.resolving_decoder(
+            self._writer_schema(schema_id), py_type, namespace=self._namespace, options=self._options
+        )
@@ -0,0 +1,13 @@
+import dataclasses
+from typing import List, Optional
+
+from tests.models import other_nodes
+
+
+@dataclasses.dataclass
+class Node:
+    """For testing records with the same name in different namespaces"""
+
+    value: int
+    children: List["Node"]
+    other: Optional[other_nodes.Node] = None
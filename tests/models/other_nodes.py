@@ -0,0 +1,10 @@
+import dataclasses
+from typing import List
+
+
+@dataclasses.dataclass
+class Node:
+    """For testing records with the same name in different namespaces"""
+
+    label: str
+    children: List["Node"]
@@ -9,12 +9,16 @@
 # "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
 # specific language governing permissions and limitations under the License.
 
+import copy
 import dataclasses
+import datetime
 import json
-from typing import TypedDict
+import sys
+from typing import List, Literal, Optional, TypedDict, Union
 
 import avro.schema
 import orjson
+import pytest
 
 import py_avro_schema as pas
 from py_avro_schema._alias import register_type_alias, register_type_aliases
@@ -80,3 +84,223 @@ def test_add_type_field():
         ],
     }
     assert_schema(PyType, expected, options=pas.Option.ADD_RUNTIME_TYPE_FIELD)
+
+
+def test_register_schema_priority(monkeypatch):
+    monkeypatch.setattr(pas._schemas, "_SCHEMA_CLASSES", list(pas._schemas._SCHEMA_CLASSES))
+
+    class PyType:
+        field: str
+
+    @pas.register_schema(priority=-1)
+    class PyTypeSchema(pas._schemas.Schema):
+        @classmethod
+        def handles_type(cls, py_type):
+            return py_type is PyType
+
+        def data(self, names):
+            return "string"
+
+    assert pas._schemas._SCHEMA_CLASSES[0] is PyTypeSchema
+    assert_schema(PyType, "string")
+
+
+def test_schema_class_with_new(monkeypatch):
+    monkeypatch.setattr(pas._schemas, "_SCHEMA_CLASSES", list(pas._schemas._SCHEMA_CLASSES))
+
+    class PyType:
+        field: str
+
+    @pas.register_schema(priority=-1)
+    class PyTypeSchema(pas._schemas.Schema):
+        def __new__(cls, py_type, namespace=None, options=pas.Option(0), processing=None):
+            schema_obj = super().__new__(cls, py_type, namespace=namespace, options=options, processing=processing)
+            schema_obj.created_by = py_type
+            return schema_obj
+
+        @classmethod
+        def handles_type(cls, py_type):
+            return py_type is PyType
+
+        def data(self, names):
+            return "string"
+
+    schema_obj = pas._schemas.root_schema_obj(List[PyType])
+    assert schema_obj.items_schema.created_by is PyType
+    schema_obj = pas._schemas.root_schema_obj(List[PyType], options=pas.Option.NO_DOC)
+    assert schema_obj.items_schema.created_by is PyType
+    assert copy.copy(schema_obj.items_schema).created_by is PyType
+
+
+def test_schema_class_without_data(monkeypatch):
+    monkeypatch.setattr(pas._schemas, "_SCHEMA_CLASSES", list(pas._schemas._SCHEMA_CLASSES))
+
+    class PyType:
+        field: str
+
+    @pas.register_schema(priority=-1)
+    class PyTypeSchema(pas._schemas.Schema):
+        @classmethod
+        def handles_type(cls, py_type):
+            return py_type is PyType
+
+    with pytest.raises(TypeError, match="abstract method"):
+        pas._schemas.schema(PyType)
+
+
+def test_schema_class_inspecting_children(monkeypatch):
+    monkeypatch.setattr(pas._schemas, "_SCHEMA_CLASSES", list(pas._schemas._SCHEMA_CLASSES))
+
+    class PyType:
+        field: str
+
+    @pas.register_schema(priority=-1)
+    class PyTypeSchema(pas._schemas.Schema):
+        def __init__(self, py_type, namespace=None, options=pas.Option(0), processing=None):
+            super().__init__(py_type, namespace=namespace, options=options, processing=processing)
+            child = pas._schemas._schema_obj(List[Optional[int]], namespace=namespace, options=options)
+            self.items_data = child.items_schema.data(names=pas._schemas.NamesRegistry())
+
+        @classmethod
+        def handles_type(cls, py_type):
+            return py_type is PyType
+
+        def data(self, names):
+            return {"type": "array", "items": self.items_data}
+
+    @dataclasses.dataclass
+    class Parent:
+        field_a: List[PyType]
+
+    assert_schema(PyType, {"type": "array", "items": ["long", "null"]})
+    assert pas._schemas.schema(Parent)["fields"][0]["type"]["items"] == {"type": "array", "items": ["long", "null"]}
+
+
+def test_schema_class_render_options_in_init(monkeypatch):
+    monkeypatch.setattr(pas._schemas, "_SCHEMA_CLASSES", list(pas._schemas._SCHEMA_CLASSES))
+
+    class PyType:
+        field: str
+
+    @pas.register_schema(priority=-1)
+    class PyTypeSchema(pas._schemas.Schema):
+        def __init__(self, py_type, namespace=None, options=pas.Option(0), processing=None):
+            super().__init__(py_type, namespace=namespace, options=options, processing=processing)
+            self.avro_type = "int" if pas.Option.INT_32 in options else "long"
+
+        @classmethod
+        def handles_type(cls, py_type):
+            return py_type is PyType
+
+        def data(self, names):
+            return self.avro_type
+
+    @dataclasses.dataclass
+    class Parent:
+        field_a: PyType
+        field_b: int
+
+    assert_schema(PyType, "long")
+    assert_schema(PyType, "int", options=pas.Option.INT_32)
+    fields = pas._schemas.schema(Parent, options=pas.Option.INT_32)["fields"]
+    assert [field["type"] for field in fields] == ["int", "int"]
+    fields = pas._schemas.schema(Parent)["fields"]
+    assert [field["type"] for field in fields] == ["long", "long"]
+
+
+def test_schema_class_resolved_once(monkeypatch):
+    @dataclasses.dataclass
+    class PyType:
+        field_a: datetime.datetime
+
+    calls = []
+    handles_type = pas._schemas.DateTimeSchema.handles_type.__func__
+
+    def counting_handles_type(cls, py_type):
+        calls.append(py_type)
+        return handles_type(cls, py_type)
+
+    monkeypatch.setattr(pas._schemas.DateTimeSchema, "handles_type", classmethod(counting_handles_type))
+    pas._schemas._clear_dispatch_tables()
+    for _ in range(3):
+        pas._schemas.schema(PyType)
+    assert calls.count(datetime.datetime) == 1
+
+
+def test_type_key_order_sensitive():
+    key = pas._schemas._type_key
+    assert Union[int, str] == Union[str, int]
+    assert key(Union[int, str]) != key(Union[str, int])
+    assert key(Literal[1]) != key(Literal[True])
+
+
+def test_names_registry():
+    names = pas._schemas.NamesRegistry(["a", "b", "a"])
+    names.append("c")
+    names.append("b")
+    assert "c" in names
+    assert "d" not in names
+    assert list(names) == ["a", "b", "c"]
+    assert len(names) == 3
+    assert repr(names) == "NamesRegistry(['a', 'b', 'c'])"
+
+
+def test_schema_names_list_backward_compatible():
+    @dataclasses.dataclass
+    class Child:
+        field_a: str
+
+    @dataclasses.dataclass
+    class Parent:
+        field_a: Child
+        field_b: Child
+
+    names = ["Other"]
+    schema_data = pas._schemas.schema(Parent, options=pas.Option.NO_AUTO_NAMESPACE, names=names)
+    assert names == ["Other", "Parent", "Child"]
+    assert schema_data["fields"][1]["type"] == "Child"
+    # Names defined previously are referenced by name only
+    assert pas._schemas.schema(Child, options=pas.Option.NO_AUTO_NAMESPACE, names=names) == "Child"
+    registry = pas._schemas.NamesRegistry(["Child"])
+    schema_data = pas._schemas.schema(Parent, options=pas.Option.NO_AUTO_NAMESPACE, names=registry)
+    assert schema_data["fields"][0]["type"] == "Child"
+    assert list(registry) == ["Child", "Parent"]
+
+
+def _nested_dataclasses(depth: int) -> type:
+    """Return a chain of dataclasses ``Node0`` -> ``Node1`` -> ... ``Node{depth-1}``"""
+    py_type: type = int
+    for i in reversed(range(depth)):
+        fields = [("child", Optional[List[py_type]], dataclasses.field(default=None))]  # type: ignore
+        py_type = dataclasses.make_dataclass(f"Node{i}", fields, namespace={"__doc__": f"Node {i}"})
+    return py_type
+
+
+def test_deeply_nested_types():
+    depth = sys.getrecursionlimit()
+    py_type = _nested_dataclasses(depth)
+    schema_data = pas._schemas.schema(py_type, options=pas.Option.NO_AUTO_NAMESPACE)
+    for i in range(depth):
+        assert schema_data["name"] == f"Node{i}"
+        (field,) = schema_data["fields"]
+        assert field["default"] is None
+        assert field["type"][0] == "null"
+        schema_data = field["type"][1]["items"]
+    assert schema_data == "long"
+    assert pas.generate(py_type).startswith(b'{"type":"record","name":"Node0","fields":[{"name":"child","type":["null"')
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        pas.Option(0),
+        pas.Option.JSON_INDENT_2,
+        pas.Option.JSON_SORT_KEYS | pas.Option.JSON_APPEND_NEWLINE,
+        pas.Option.JSON_INDENT_2 | pas.Option.JSON_SORT_KEYS | pas.Option.JSON_APPEND_NEWLINE,
+    ],
+)
+def test_dumps_nested_same_as_orjson(options):
+    schema_data = pas._schemas.schema(_nested_dataclasses(10))
+    schema_data["fields"].extend([{"name": "empty", "type": [], "default": {}}, {"name": "f", "default": 1.5e16}])
+    json_options = sum(opt.value for opt in pas._options.JSON_OPTIONS if opt in options)
+    assert pas._dumps_nested(schema_data, json_options) == orjson.dumps(schema_data, option=json_options)
@@ -0,0 +1,98 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import concurrent.futures.process
+import dataclasses
+from typing import List
+
+import pytest
+
+import py_avro_schema as pas
+import py_avro_schema._testing
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    pas.generate.cache_clear()
+
+
+def test_generate_many_in_order():
+    @dataclasses.dataclass
+    class PyType:
+        field_a: int
+
+    results = pas.generate_many([PyType, str, List[int]])
+    assert [result.py_type for result in results] == [PyType, str, List[int]]
+    assert [result.schema for result in results] == [pas.generate(PyType), b'"string"', pas.generate(List[int])]
+    assert all(result.ok for result in results)
+
+
+def test_generate_many_errors_per_type():
+    class PyType:
+        pass
+
+    results = pas.generate_many([PyType, "py_avro_schema._testing:Missing", int])
+    assert isinstance(results[0].error, pas.TypeNotSupportedError)
+    assert results[1].py_type == "py_avro_schema._testing:Missing"
+    assert isinstance(results[1].error, AttributeError)
+    assert results[2].schema == b'"long"'
+
+
+def test_generate_many_import_paths():
+    results = pas.generate_many(["py_avro_schema._testing:PyType", "py_avro_schema._testing.PyType"])
+    assert [result.py_type for result in results] == [py_avro_schema._testing.PyType] * 2
+    assert results[0].schema == pas.generate(py_avro_schema._testing.PyType)
+
+
+def test_generate_many_workers():
+    @dataclasses.dataclass
+    class PyType:
+        field_a: int
+
+    options = pas.Option.INT_32
+    results = pas.generate_many(
+        [py_avro_schema._testing.PyType, PyType, "py_avro_schema._testing:Missing"], options=options, workers=2
+    )
+    assert results[0].schema == (
+        b'{"type":"record","name":"PyType","fields":[{"name":"field_a","type":"string"}],'
+        b'"namespace":"py_avro_schema","doc":"For testing"}'
+    )
+    assert results[1].schema == pas.generate(PyType, options=options)
+    assert isinstance(results[2].error, AttributeError)
+    # Results from worker processes are merged into the cache
+    hits = pas.generate.cache_info().hits
+    pas.generate(py_avro_schema._testing.PyType, options=options)
+    assert pas.generate.cache_info().hits == hits + 1
+
+
+def test_generate_many_counts_cache_misses_once():
+    @dataclasses.dataclass
+    class PyType:
+        field_a: int
+
+    pas.generate_many([PyType, int])
+    assert pas.generate.cache_info().misses == 2
+    pas.generate_many([PyType, int])
+    assert pas.generate.cache_info().hits == 2
+
+
+def test_generate_many_worker_crash(tmp_path, monkeypatch):
+    (tmp_path / "crashing_models.py").write_text("import os\n\nos._exit(1)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    class PyType:
+        field_a: int
+
+    PyType.__module__ = "crashing_models"
+    PyType.__qualname__ = "PyType"
+    results = pas.generate_many([PyType, int], workers=2)
+    assert isinstance(results[0].error, concurrent.futures.process.BrokenProcessPool)
+    assert results[1].schema == b'"long"'
@@ -0,0 +1,295 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import collections
+import dataclasses
+import datetime
+import gc
+import importlib
+import inspect
+import json
+import logging
+import textwrap
+import weakref
+from typing import Annotated, Any, Dict, List, Optional
+
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema import _disk_cache
+from py_avro_schema._alias import register_type_alias
+from py_avro_schema._cache import TypeCache
+
+
+@dataclasses.dataclass
+class Referenced:
+    field_a: str
+
+
+@dataclasses.dataclass
+class Referencing:
+    field_a: Optional[List[Referenced]]
+
+
+class Metadata:
+    def __init__(self, value):
+        self.value = value
+
+
+class SlottedMetadata:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    pas.generate.cache_clear()
+    yield
+    pas.generate.cache_resize(4096)
+
+
+def test_generate_hits_and_misses():
+    @dataclasses.dataclass
+    class PyType:
+        field_a: str
+
+    first = pas.generate(PyType)
+    second = pas.generate(PyType)
+    assert first is second
+    info = pas.generate.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_generate_options_are_keys():
+    @dataclasses.dataclass
+    class PyType:
+        field_a: int
+
+    assert pas.generate(PyType) != pas.generate(PyType, options=pas.Option.INT_32)
+    assert pas.generate.cache_info().currsize == 2
+
+
+def test_generate_lru_eviction():
+    pas.generate.cache_resize(2)
+    pas.generate(int)
+    pas.generate(str)
+    pas.generate(int)  # Now most recently used
+    pas.generate(bytes)  # Evicts str
+    info = pas.generate.cache_info()
+    assert (info.evictions, info.currsize) == (1, 2)
+    pas.generate(int)
+    assert pas.generate.cache_info().hits == 2
+
+
+def test_generate_weak_keys():
+    def make_type():
+        @dataclasses.dataclass
+        class PyType:
+            field_a: str
+
+        return PyType
+
+    pas.generate(make_type())
+    pas.generate(List[str])
+    gc.collect()
+    assert pas.generate.cache_info().currsize == 1
+
+
+def test_generate_invalidated_by_alias_registration():
+    @dataclasses.dataclass
+    class PyType:
+        field_a: str
+
+    assert "aliases" not in json.loads(pas.generate(PyType))
+    register_type_alias(alias="test_cache.OldPyType")(PyType)
+    assert pas.generate.cache_info().currsize == 0
+    assert json.loads(pas.generate(PyType))["aliases"] == ["test_cache.OldPyType"]
+
+
+def test_unhashable_not_cached():
+    cache = TypeCache()
+    with pytest.raises(TypeError):
+        cache.get(int, ([],))
+    assert cache.info().misses == 0
+
+
+def test_values_on_class():
+    class PyType:
+        pass
+
+    cache = TypeCache(maxsize=1, values_on_class=True)
+    cache.set(PyType, (), [PyType])  # Value referencing the class
+    cache.set(int, (), [int])  # Built-in types do not accept attributes
+    assert cache.get(PyType) is None  # Evicted
+    cache.set(PyType, (), [PyType])
+    assert cache.get(PyType) == [PyType]
+    assert cache.peek(PyType) == [PyType]
+    ref = weakref.ref(PyType)
+    del PyType
+    gc.collect()
+    assert ref() is None
+    assert len(cache) == 0
+
+
+def test_unbounded_cache():
+    cache = TypeCache(maxsize=None)
+    for i in range(10):
+        cache.set(int, i, i)
+    assert cache.info() == pas.CacheInfo(hits=0, misses=0, evictions=0, maxsize=None, currsize=10)
+
+
+def test_disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("PY_AVRO_SCHEMA_CACHE_DIR", str(tmp_path))
+    schema_json = pas.generate(Referencing)
+    (path,) = tmp_path.glob("*/*.avsc")
+    assert path.read_bytes() == schema_json
+    path.write_bytes(b"{}")  # Check that the next call really reads from disk
+    pas.generate.cache_clear()
+    assert pas.generate(Referencing) == b"{}"
+    assert pas.generate(Referencing, options=pas.Option.NO_DOC) != schema_json
+    assert len(list(tmp_path.glob("*/*.avsc"))) == 2
+
+
+def test_disk_cache_not_used_for_dynamic_types(tmp_path, monkeypatch):
+    @dataclasses.dataclass
+    class PyType:
+        field_a: str
+
+    monkeypatch.setenv("PY_AVRO_SCHEMA_CACHE_DIR", str(tmp_path))
+    pas.generate(PyType)
+    pas.generate(List[Referenced])
+    pas.generate(Optional[List[PyType]])
+    assert len(list(tmp_path.glob("*/*.avsc"))) == 1
+
+
+def test_disk_cache_key_changes_with_referenced_source(tmp_path, monkeypatch):
+    source = """
+        import dataclasses
+
+        @dataclasses.dataclass
+        class Ship:
+            name: str
+    """
+    module_path = tmp_path / "test_cache_ships.py"
+    module_path.write_text(textwrap.dedent(source))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    ships = importlib.import_module("test_cache_ships")
+
+    @dataclasses.dataclass
+    class Port:
+        ship: ships.Ship  # type: ignore
+
+    key = _disk_cache.cache_key(ships.Ship, None, pas.Option(0))
+    assert key is not None
+    assert key == _disk_cache.cache_key(ships.Ship, None, pas.Option(0))
+    assert key != _disk_cache.cache_key(ships.Ship, "com.example", pas.Option(0))
+    assert key != _disk_cache.cache_key(ships.Ship, None, pas.Option.INT_32)
+    assert _disk_cache.cache_key(Port, None, pas.Option(0)) is None  # Local class
+
+    referencing_key = _disk_cache.cache_key(Optional[ships.Ship], None, pas.Option(0))
+    module_path.write_text(textwrap.dedent(source) + "    length: float\n")
+    ships = importlib.reload(ships)
+    assert _disk_cache.cache_key(ships.Ship, None, pas.Option(0)) != key
+    assert _disk_cache.cache_key(Optional[ships.Ship], None, pas.Option(0)) != referencing_key
+
+
+def test_disk_cache_key_annotation_metadata(caplog):
+    key = _disk_cache.cache_key(Annotated[int, Metadata(1)], None, pas.Option(0))
+    assert key is not None
+    assert key == _disk_cache.cache_key(Annotated[int, Metadata(1)], None, pas.Option(0))
+    assert key != _disk_cache.cache_key(Annotated[int, Metadata(2)], None, pas.Option(0))
+    assert key != _disk_cache.cache_key(Annotated[int, Metadata("1")], None, pas.Option(0))
+    with caplog.at_level(logging.DEBUG, logger="py_avro_schema._disk_cache"):
+        assert _disk_cache.cache_key(Annotated[int, SlottedMetadata(1)], None, pas.Option(0)) is None
+    assert "is not represented the same in every process" in caplog.text
+
+
+def test_disk_cache_key_unrelated_local_schema_class(monkeypatch, caplog):
+    monkeypatch.setattr(pas._schemas, "_SCHEMA_CLASSES", list(pas._schemas._SCHEMA_CLASSES))
+    key = _disk_cache.cache_key(Referencing, None, pas.Option(0))
+
+    class PyType:
+        pass
+
+    @pas.register_schema(priority=-1)
+    class PyTypeSchema(pas._schemas.Schema):
+        @classmethod
+        def handles_type(cls, py_type):
+            return py_type is PyType
+
+        def data(self, names):
+            return "string"
+
+    assert _disk_cache.cache_key(Referencing, None, pas.Option(0)) == key
+    with caplog.at_level(logging.DEBUG, logger="py_avro_schema._disk_cache"):
+        assert _disk_cache.cache_key(List[PyType], None, pas.Option(0)) is None
+    assert "cannot be imported by its qualified name" in caplog.text
+
+
+RENDER_OPTIONS = [
+    pas.Option.INT_32,
+    pas.Option.FLOAT_32 | pas.Option.MILLISECONDS,
+    pas.Option.NO_DOC | pas.Option.LOGICAL_JSON_STRING,
+    pas.Option.WRAP_INTO_RECORDS,
+    pas.Option.ADD_REFERENCE_ID | pas.Option.ADD_RUNTIME_TYPE_FIELD | pas.Option.JSON_INDENT_2,
+]
+
+
+@dataclasses.dataclass
+class Child:
+    """A child"""
+
+    field_a: Optional[float] = None
+    field_b: Dict[str, Any] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class Parent:
+    """A parent"""
+
+    field_a: List[Child]
+    field_b: Dict[str, int]
+    field_c: datetime.datetime
+    field_d: Optional["Parent"]
+    field_e: List[Child] = dataclasses.field(default_factory=list)
+
+
+@pytest.mark.parametrize("options", RENDER_OPTIONS)
+def test_render_options_reuse_schema_tree(options):
+    # Build the tree with the render options given
+    expected = pas._schemas._schema_obj(Parent, options=options).data(names=[])
+
+    pas._schemas._SCHEMA_TREES.clear()
+    pas.generate(Parent)
+    assert json.loads(pas.generate(Parent, options=options)) == expected
+    info = pas._schemas._SCHEMA_TREES.info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_namespace_resolved_once_per_class(monkeypatch):
+    classes: List[type] = []
+    for i in range(50):
+        fields = [(f"field_{j}", Optional[classes[j]], dataclasses.field(default=None)) for j in range(len(classes))]
+        classes.append(dataclasses.make_dataclass(f"Node{i}", [("field_a", str), *fields]))
+    getmodule = inspect.getmodule
+    calls: collections.Counter = collections.Counter()
+
+    def counting_getmodule(obj, *args, **kwargs):
+        calls[obj] += 1
+        return getmodule(obj, *args, **kwargs)
+
+    monkeypatch.setattr(inspect, "getmodule", counting_getmodule)
+    pas.generate(classes[-1])
+    pas.generate(classes[-1], options=pas.Option.NO_DOC)
+    pas.generate(classes[-1], options=pas.Option.AUTO_NAMESPACE_MODULE)
+    assert {calls[py_type] for py_type in classes} == {2}  # Once per class and auto-namespace option
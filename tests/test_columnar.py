@@ -0,0 +1,284 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import array
+import dataclasses
+import datetime
+import enum
+import io
+import itertools
+from typing import List, Optional, TypedDict
+
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema import container
+
+UTC = datetime.timezone.utc
+
+
+class Kind(enum.Enum):
+    TANKER = "TANKER"
+    FERRY = "FERRY"
+
+
+@dataclasses.dataclass
+class Owner:
+    name: str
+    since: datetime.date
+
+
+@dataclasses.dataclass
+class Ship:
+    id: int
+    name: str
+    length: float
+    active: bool
+    launched: datetime.datetime
+    owner: Owner
+    tonnage: Optional[int]
+    call_sign: Optional[str]
+    kind: Kind
+    crew: List[str]
+
+
+SHIPS = [
+    Ship(
+        1,
+        "Titanic",
+        269.1,
+        False,
+        datetime.datetime(1911, 5, 31, tzinfo=UTC),
+        Owner("White Star", datetime.date(1909, 3, 31)),
+        46328,
+        None,
+        Kind.FERRY,
+        ["a"],
+    ),
+    Ship(
+        2,
+        "Ölfrei",
+        120.5,
+        True,
+        datetime.datetime(2001, 1, 2, 3, 4, 5, 6, tzinfo=UTC),
+        Owner("", datetime.date(1970, 1, 2)),
+        None,
+        "XY",
+        Kind.TANKER,
+        [],
+    ),
+]
+
+
+def _strings(column):
+    """Return the strings of a column in the offsets and bytes layout"""
+    data, offsets = bytes(column.values), column.offsets
+    return [data[offsets[i] : offsets[i + 1]].decode() for i in range(len(offsets) - 1)]
+
+
+def test_decode_payloads():
+    encode = pas.encoder(Ship)
+    columns = pas.decode_columns([encode(ship) for ship in SHIPS], Ship, use_numpy=False)
+    assert list(columns) == [
+        "id",
+        "name",
+        "length",
+        "active",
+        "launched",
+        "owner.name",
+        "owner.since",
+        "tonnage",
+        "call_sign",
+        "kind",
+        "crew",
+    ]
+    assert columns["id"] == pas.Column(array.array("q", [1, 2]))
+    assert columns["length"].values == array.array("d", [269.1, 120.5])
+    assert columns["active"].values == array.array("B", [0, 1])
+    assert columns["launched"].values == array.array("q", [-1848960000000000, 978404645000006])
+    assert columns["owner.since"].values == array.array("q", [-22191, 1])
+    assert _strings(columns["name"]) == ["Titanic", "Ölfrei"]
+    assert _strings(columns["owner.name"]) == ["White Star", ""]
+    assert columns["tonnage"] == pas.Column(array.array("q", [46328, 0]), None, array.array("B", [1, 0]))
+    assert _strings(columns["call_sign"]) == ["", "XY"]
+    assert columns["call_sign"].validity == array.array("B", [0, 1])
+    assert columns["kind"].values == [Kind.FERRY, Kind.TANKER]
+    assert columns["crew"].values == [["a"], []]
+
+
+def test_decode_container_file(tmp_path):
+    path = tmp_path / "ships.avro"
+    with open(path, "wb") as fileobj, container.Writer(fileobj, Ship, block_records=3) as writer:
+        writer.write_many(SHIPS * 4)
+    columns = pas.decode_columns(path, Ship, use_numpy=False)
+    assert columns["id"].values == array.array("q", [1, 2] * 4)
+    assert _strings(columns["name"]) == ["Titanic", "Ölfrei"] * 4
+
+
+def test_options():
+    @dataclasses.dataclass
+    class Reading:
+        value: float
+        time: datetime.datetime
+
+    options = pas.Option.FLOAT_32 | pas.Option.MILLISECONDS | pas.Option.ADD_REFERENCE_ID
+    encode = pas.encoder(Reading, options=options)
+    data = [encode(Reading(0.5, datetime.datetime(1970, 1, 1, 0, 0, 1, tzinfo=UTC)))]
+    columns = pas.decode_columns(data, Reading, options=options, use_numpy=False)
+    assert columns == {
+        "value": pas.Column(array.array("f", [0.5])),
+        "time": pas.Column(array.array("q", [1000])),
+    }
+
+
+def test_typed_dict():
+    class Movie(TypedDict):
+        title: str
+        year: int
+
+    encode = pas.encoder(Movie)
+    columns = pas.decode_columns([encode({"title": "a", "year": 2000})], Movie, use_numpy=False)
+    assert columns["year"].values == array.array("q", [2000])
+
+
+def test_not_a_record():
+    with pytest.raises(pas.TypeNotSupportedError, match="only record types are supported"):
+        pas.decode_columns([], List[int])
+
+
+@pytest.mark.parametrize(
+    "data, match",
+    [
+        (b"\x02", "unexpected end of data"),
+        (b"\x02\x02a" + bytes(8) + b"\x06", "3 is not a branch index"),
+    ],
+)
+def test_invalid_data(data, match):
+    @dataclasses.dataclass
+    class Record:
+        id: int
+        name: str
+        length: float
+        score: Optional[float]
+
+    with pytest.raises(ValueError, match=match):
+        pas.decode_columns([data], Record, use_numpy=False)
+
+
+def test_trailing_bytes():
+    with pytest.raises(ValueError, match="1 bytes left after decoding records"):
+        pas.decode_columns([pas.encoder(Owner)(SHIPS[0].owner) + b"\x00"], Owner, use_numpy=False)
+
+
+def test_numpy():
+    numpy = pytest.importorskip("numpy")
+    encode = pas.encoder(Ship)
+    columns = pas.decode_columns([encode(ship) for ship in SHIPS], Ship)
+    assert columns["id"].values.dtype == numpy.int64
+    assert columns["active"].values.tolist() == [False, True]
+    assert columns["launched"].values.tolist() == [
+        datetime.datetime(1911, 5, 31),
+        datetime.datetime(2001, 1, 2, 3, 4, 5, 6),
+    ]
+    assert columns["owner.since"].values.tolist() == [datetime.date(1909, 3, 31), datetime.date(1970, 1, 2)]
+    assert columns["tonnage"].validity.tolist() == [True, False]
+    assert columns["name"].offsets.tolist() == [0, 7, 14]
+    assert columns["kind"].values == [Kind.FERRY, Kind.TANKER]
+
+
+def test_encode_batch():
+    encode = pas.encoder(Ship)
+    batch = pas.encode_batch(SHIPS * 3, Ship)
+    assert batch.data == b"".join(encode(ship) for ship in SHIPS * 3)
+    assert batch.offsets.tolist() == [0, *itertools.accumulate(len(encode(ship)) for ship in SHIPS * 3)]
+
+
+@pytest.mark.parametrize("value", [0, -1, 63, 64, -65, 8191, 8192, 2**27, 2**40, 2**50, -(2**63), 2**63 - 1])
+def test_encode_batch_integers(value):
+    @dataclasses.dataclass
+    class Record:
+        value: int
+        optional: Optional[int]
+
+    records = [Record(value, value), Record(value, None)]
+    assert pas.encode_batch(records, Record).data == b"".join(map(pas.encoder(Record), records))
+
+
+def test_encode_batch_options():
+    @dataclasses.dataclass
+    class Reading:
+        value: float
+        time: datetime.datetime
+        count: int
+        name: Optional[str] = None
+
+    options = pas.Option.FLOAT_32 | pas.Option.MILLISECONDS | pas.Option.INT_32 | pas.Option.ADD_REFERENCE_ID
+    readings = [Reading(0.5, datetime.datetime(2000, 1, 1, 0, 0, 1), 1, "a"), Reading(1.5, SHIPS[0].launched, -1)]
+    encode = pas.encoder(Reading, options=options)
+    assert pas.encode_batch(readings, Reading, options=options).data == b"".join(map(encode, readings))
+
+
+def test_encode_batch_runtime_type():
+    @dataclasses.dataclass
+    class Reading:
+        value: float
+
+    class SpecialReading(Reading):
+        pass
+
+    options = pas.Option.ADD_RUNTIME_TYPE_FIELD | pas.Option.ADD_REFERENCE_ID
+    readings = [Reading(0.5), SpecialReading(1.5)]
+    batch = pas.encode_batch(readings, Reading, options=options)
+    assert batch.data == b"".join(map(pas.encoder(Reading, options=options), readings))
+    assert batch.data[batch.offsets[1] : batch.offsets[2]].endswith(b"\x00\x02\x1cSpecialReading")
+
+
+def test_encode_batch_typed_dict():
+    class Movie(TypedDict):
+        title: str
+        year: int
+
+    movies = [Movie(title="a", year=2000), Movie(title="", year=1)]
+    assert pas.encode_batch(iter(movies), Movie).data == b"".join(map(pas.encoder(Movie), movies))
+
+
+def test_encode_batch_empty():
+    assert pas.encode_batch([], Ship) == pas.EncodedBatch(b"", array.array("q", [0]))
+
+
+def test_encode_batch_out_of_range():
+    @dataclasses.dataclass
+    class Record:
+        value: int
+
+    with pytest.raises(ValueError, match="is out of range for an Avro int"):
+        pas.encode_batch([Record(1), Record(2**31)], Record, options=pas.Option.INT_32)
+
+
+def test_encode_batch_not_a_record():
+    with pytest.raises(pas.TypeNotSupportedError, match="only record types are supported"):
+        pas.encode_batch([], List[int])
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"block_records": 3}, {"block_size": 100}, {"block_size": 1}, {}],
+)
+def test_container_write_batch(kwargs):
+    one_by_one, batched = io.BytesIO(), io.BytesIO()
+    with container.Writer(one_by_one, Ship, **kwargs) as writer:
+        writer.write(SHIPS[0])
+        writer.write_many(SHIPS * 5)
+    with container.Writer(batched, Ship, **kwargs) as writer:
+        writer.write(SHIPS[0])
+        writer.write_batch(SHIPS * 5)
+    one_by_one.seek(0), batched.seek(0)
+    assert list(container.Reader(batched, Ship).blocks()) == list(container.Reader(one_by_one, Ship).blocks())
@@ -0,0 +1,298 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import datetime
+import enum
+import io
+from typing import List, Optional
+
+import avro.datafile
+import avro.io
+import avro.schema
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema import container
+
+
+class Color(enum.Enum):
+    RED = "RED"
+    GREEN = "GREEN"
+
+
+@dataclasses.dataclass
+class Ship:
+    name: str
+    launched: datetime.date
+    colors: List[Color]
+    length: Optional[float] = None
+
+
+SHIPS = [
+    Ship(
+        f"Ship {i}", datetime.date(1900 + i % 100, 1, 1), [Color.RED, Color.GREEN][: i % 3], i * 1.5 if i % 2 else None
+    )
+    for i in range(1000)
+]
+
+
+def _write(ships, **kwargs) -> io.BytesIO:
+    """Return a file object holding a container file of ships"""
+    fileobj = io.BytesIO()
+    with container.Writer(fileobj, Ship, **kwargs) as writer:
+        writer.write_many(ships)
+    fileobj.seek(0)
+    return fileobj
+
+
+@pytest.mark.parametrize("codec", ["null", "deflate"])
+def test_write_read(codec):
+    fileobj = _write(SHIPS, codec=codec)
+    reader = container.Reader(fileobj, Ship)
+    assert reader.codec == codec
+    assert reader.schema == pas.generate(Ship)
+    assert list(reader) == SHIPS
+
+
+@pytest.mark.parametrize("codec", ["null", "deflate"])
+def test_read_with_avro(codec):
+    fileobj = _write(SHIPS, codec=codec, block_records=100)
+    records = list(avro.datafile.DataFileReader(fileobj, avro.io.DatumReader()))
+    assert len(records) == len(SHIPS)
+    assert records[1] == {"name": "Ship 1", "launched": datetime.date(1901, 1, 1), "colors": ["RED"], "length": 1.5}
+
+
+@pytest.mark.parametrize("codec", ["null", "deflate"])
+def test_read_written_by_avro(codec):
+    fileobj = io.BytesIO()
+    writer = avro.datafile.DataFileWriter(fileobj, avro.io.DatumWriter(), avro.schema.parse(pas.generate(Ship)), codec)
+    for ship in SHIPS:
+        writer.append({**dataclasses.asdict(ship), "colors": [color.value for color in ship.colors]})
+    writer.flush()
+    fileobj.seek(0)
+    assert list(container.Reader(fileobj, Ship)) == SHIPS
+
+
+@pytest.mark.parametrize(
+    "kwargs, counts",
+    [
+        ({"block_records": 300}, [300, 300, 300, 100]),
+        ({"block_size": 10_000}, [526, 474]),
+        ({"block_size": 1, "block_records": 1}, [1] * 1000),
+    ],
+)
+def test_block_thresholds(kwargs, counts):
+    reader = container.Reader(_write(SHIPS, **kwargs), Ship)
+    assert [count for count, _ in reader.blocks()] == counts
+
+
+def test_flush():
+    fileobj = io.BytesIO()
+    writer = container.Writer(fileobj, Ship)
+    writer.write(SHIPS[0])
+    writer.flush()
+    writer.write(SHIPS[1])
+    writer.close()
+    fileobj.seek(0)
+    assert [count for count, _ in container.Reader(fileobj, Ship).blocks()] == [1, 1]
+
+
+def test_empty_file():
+    assert list(container.Reader(_write([]), Ship)) == []
+
+
+def test_read_streams_blocks():
+    reader = iter(container.Reader(_write(SHIPS, block_records=10), Ship))
+    assert next(reader) == SHIPS[0]
+
+
+def test_unsupported_codec():
+    with pytest.raises(ValueError, match="Unsupported Avro codec 'snappy'. Supported codecs are: null, deflate"):
+        container.Writer(io.BytesIO(), Ship, codec="snappy")
+
+
+def test_read_other_schema():
+    with pytest.raises(ValueError, match="written with a schema different from the schema for"):
+        container.Reader(_write(SHIPS), Ship, options=pas.Option.FLOAT_32)
+
+
+def test_read_compatible_schema():
+    # Options not affecting the Parsing Canonical Form
+    assert list(container.Reader(_write(SHIPS[:1]), Ship, options=pas.Option.NO_DOC)) == SHIPS[:1]
+
+
+@pytest.mark.parametrize(
+    "data, match",
+    [
+        (b"Obj\x00", "Not an Avro container file"),
+        (b"Obj\x01\x00" + bytes(16), "no schema in the header"),
+        (b"Obj\x01\x02", "unexpected end of file"),
+    ],
+)
+def test_read_invalid_header(data, match):
+    with pytest.raises(ValueError, match=match):
+        container.Reader(io.BytesIO(data), Ship)
+
+
+def test_read_invalid_sync_marker():
+    data = bytearray(_write(SHIPS[:1]).getvalue())
+    data[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="sync marker does not match"):
+        list(container.Reader(io.BytesIO(data), Ship))
+
+
+def test_container_module_lazy_attribute():
+    assert pas.container is container
+
+
+@pytest.fixture
+def ships_path(tmp_path):
+    """Path of a container file of ships in blocks of 300 records"""
+    path = tmp_path / "ships.avro"
+    path.write_bytes(_write(SHIPS, block_records=300).getvalue())
+    return path
+
+
+def test_mapped_reader_index(ships_path):
+    with container.MappedReader(ships_path, Ship) as reader:
+        assert [block.record_count for block in reader.index] == [300, 300, 300, 100]
+        assert len(reader) == 1000
+        first = reader.index[0]
+        assert ships_path.read_bytes()[first.offset + first.size :][:16] == reader.sync_marker
+
+
+@pytest.mark.parametrize("codec", ["null", "deflate"])
+def test_mapped_reader_read(tmp_path, codec):
+    path = tmp_path / "ships.avro"
+    path.write_bytes(_write(SHIPS, codec=codec, block_records=300).getvalue())
+    with container.MappedReader(path, Ship) as reader:
+        assert list(reader) == SHIPS
+        assert reader.read_block(1) == SHIPS[300:600]
+        assert reader.read_block(-1) == SHIPS[900:]
+
+
+@pytest.mark.parametrize(
+    "start, stop",
+    [(0, None), (0, 1000), (0, 0), (299, 301), (300, 600), (450, 950), (999, 2000), (1000, None), (5, 3)],
+)
+def test_mapped_reader_iter_range(ships_path, start, stop):
+    with container.MappedReader(ships_path, Ship) as reader:
+        assert list(reader.iter_range(start, stop)) == SHIPS[start:stop]
+
+
+def test_mapped_reader_iter_range_negative(ships_path):
+    with container.MappedReader(ships_path, Ship) as reader, pytest.raises(ValueError, match="must not be negative"):
+        list(reader.iter_range(-1))
+
+
+def test_mapped_reader_saved_index(ships_path):
+    with container.MappedReader(ships_path, Ship) as reader:
+        index_path = reader.save_index()
+        index = reader.index
+    assert index_path == f"{ships_path}.idx"
+    with container.MappedReader(ships_path, Ship, index_path=index_path) as reader:
+        assert reader.index == index
+        assert reader.read_block(2) == SHIPS[600:900]
+
+
+def test_mapped_reader_saved_index_outdated(ships_path, tmp_path):
+    index_path = tmp_path / "outdated.idx"
+    with container.MappedReader(ships_path, Ship) as reader:
+        reader.index = reader.index[:1]
+        reader.save_index(index_path)
+    ships_path.write_bytes(_write(SHIPS, block_records=300).getvalue())  # Different sync marker
+    with container.MappedReader(ships_path, Ship, index_path=index_path) as reader:
+        assert len(reader.index) == 4
+
+
+def test_mapped_reader_missing_index(ships_path, tmp_path):
+    with container.MappedReader(ships_path, Ship, index_path=tmp_path / "missing.idx") as reader:
+        assert len(reader.index) == 4
+
+
+def test_mapped_reader_given_index(ships_path):
+    with container.MappedReader(ships_path, Ship) as reader:
+        index = reader.index[2:]
+    with container.MappedReader(ships_path, Ship, index=index) as reader:
+        assert list(reader) == SHIPS[600:]
+
+
+def test_mapped_reader_close_with_views(tmp_path):
+    path = tmp_path / "bytes.avro"
+    with open(path, "wb") as fileobj, container.Writer(fileobj, bytes) as writer:
+        writer.write(b"abc")
+    reader = container.MappedReader(path, bytes)
+    records = reader.iter_range()
+    assert next(records) == b"abc"
+    reader.close()  # Not raising although the generator holds a view of the file
+
+
+@pytest.mark.parametrize(
+    "data, match",
+    [
+        (b"", "Not an Avro container file"),
+        (b"Obj\x01\x02", "unexpected end of file"),
+    ],
+)
+def test_mapped_reader_invalid(tmp_path, data, match):
+    path = tmp_path / "invalid.avro"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match=match):
+        container.MappedReader(path, Ship)
+
+
+def test_mapped_reader_truncated(ships_path):
+    ships_path.write_bytes(ships_path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="unexpected end of file"):
+        container.MappedReader(ships_path, Ship)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_read(ships_path, monkeypatch, ordered):
+    monkeypatch.setattr(container, "_TASK_RECORDS", 300)
+    records = list(container.parallel_read(ships_path, Ship, workers=2, ordered=ordered))
+    if ordered:
+        assert records == SHIPS
+    else:
+        assert sorted(records, key=SHIPS.index) == SHIPS
+
+
+def test_parallel_read_saved_index(ships_path):
+    with container.MappedReader(ships_path, Ship) as reader:
+        index_path = reader.save_index()
+    assert list(container.parallel_read(ships_path, Ship, workers=2, index_path=index_path)) == SHIPS
+
+
+def test_parallel_read_stop_early(ships_path, monkeypatch):
+    monkeypatch.setattr(container, "_TASK_RECORDS", 1)
+    records = container.parallel_read(ships_path, Ship, workers=1)
+    assert next(records) == SHIPS[0]
+    records.close()  # Cancels pending tasks
+
+
+def test_parallel_read_other_schema(ships_path):
+    with pytest.raises(ValueError, match="written with a schema different from the schema for"):
+        next(container.parallel_read(ships_path, Ship, options=pas.Option.FLOAT_32))
+
+
+@pytest.mark.parametrize(
+    "counts, ranges",
+    [
+        ([], []),
+        ([5], [(0, 1)]),
+        ([10, 10, 10], [(0, 1), (1, 2), (2, 3)]),
+        ([4, 4, 4, 4, 4, 1], [(0, 3), (3, 6)]),
+    ],
+)
+def test_block_ranges(monkeypatch, counts, ranges):
+    monkeypatch.setattr(container, "_TASK_RECORDS", 10)
+    assert list(container._block_ranges([container.Block(0, count, 0) for count in counts])) == ranges
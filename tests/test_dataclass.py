@@ -458,6 +458,84 @@ def test_self_ref_field():
     assert_schema(PyType, expected)
 
 
+def test_reused_field_schema():
+    @dataclasses.dataclass
+    class PyTypeChild:
+        field_a: str
+
+    @dataclasses.dataclass
+    class PyType:
+        field_a: PyTypeChild
+        field_b: PyTypeChild
+
+    record_fields = pas._schemas._schema_obj(PyType).record_fields
+    assert record_fields[0].schema is record_fields[1].schema
+
+
+def test_reused_union_field_schema_sorted_independently():
+    @dataclasses.dataclass
+    class PyType:
+        field_a: Optional[str] = None
+        field_b: Optional[str] = ""
+
+    expected = {
+        "type": "record",
+        "name": "PyType",
+        "fields": [
+            {"name": "field_a", "type": ["null", "string"], "default": None},
+            {"name": "field_b", "type": ["string", "null"], "default": ""},
+        ],
+    }
+    assert_schema(PyType, expected)
+
+
+def test_mutually_recursive_fields_in_different_contexts():
+    class PyTypeA:
+        pass
+
+    class PyTypeB:
+        field_a: Optional[PyTypeA]
+
+    PyTypeA.__annotations__ = {"field_b": PyTypeB}
+
+    @dataclasses.dataclass
+    class PyType:
+        field_a: PyTypeA
+        field_b: PyTypeB
+
+    expected = {
+        "type": "record",
+        "name": "PyType",
+        "fields": [
+            {
+                "name": "field_a",
+                "type": {
+                    "type": "record",
+                    "name": "PyTypeA",
+                    "fields": [
+                        {
+                            "name": "field_b",
+                            "type": {
+                                "type": "record",
+                                "name": "PyTypeB",
+                                "fields": [{"name": "field_a", "type": ["PyTypeA", "null"]}],
+                            },
+                        }
+                    ],
+                },
+            },
+            {"name": "field_b", "type": "PyTypeB"},
+        ],
+    }
+    assert_schema(PyType, expected)
+    # PyTypeB is not reused for the second field: PyTypeA is not being processed there and is therefore not a forward
+    # reference
+    record_fields = pas._schemas._schema_obj(PyType).record_fields
+    field_b_schema = record_fields[1].schema
+    assert field_b_schema is not record_fields[0].schema.record_fields[0].schema
+    assert isinstance(field_b_schema.record_fields[0].schema.item_schemas[0], pas._schemas.PlainClassSchema)
+
+
 def test_namespaced_record():
     @dataclasses.dataclass
     class PyType:
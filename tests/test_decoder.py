@@ -0,0 +1,311 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import gc
+import io
+import uuid
+import weakref
+from typing import (
+    Annotated,
+    Any,
+    Dict,
+    List,
+    Literal,
+    NotRequired,
+    Optional,
+    Set,
+    Tuple,
+    TypedDict,
+    Union,
+)
+
+import avro.io
+import avro.schema
+import pydantic
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema._alias import Opaque
+from tests.models import nodes, other_nodes
+
+
+class Color(enum.Enum):
+    RED = "RED"
+    GREEN = "GREEN"
+
+
+class Symbol(enum.StrEnum):
+    PLUS = "+"
+    MINUS = "-"
+
+
+class Name(str):
+    pass
+
+
+@dataclasses.dataclass
+class Item:
+    name: str
+    quantity: int
+    price: float
+
+
+@dataclasses.dataclass
+class Order:
+    id: int
+    created: datetime.datetime
+    items: List[Item]
+    color: Color
+    amount: Annotated[decimal.Decimal, pas.DecimalMeta(precision=10, scale=2)]
+    parent: Optional["Order"]
+    note: Optional[str] = None
+
+
+@dataclasses.dataclass
+class Event:
+    item: Item
+    at: datetime.datetime
+    payload: List[Dict[str, Any]]
+    counts: Dict[str, Optional[int]]
+
+
+@dataclasses.dataclass(frozen=True)
+class Computed:
+    value: int
+    double: int = dataclasses.field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "double", self.value * 2)
+
+
+class Ship(pydantic.BaseModel):
+    name: str
+    tags: Set[str]
+    crew: Dict[str, Item]
+
+
+class PlainClass:
+    name: str
+    count: int
+
+    def __init__(self, name: str, count: int):
+        self.name = name
+        self.count = count
+
+    def __eq__(self, other):
+        return vars(self) == vars(other)
+
+
+class Movie(TypedDict, total=False):
+    title: str
+    year: Optional[int]
+    poster: bytes
+
+
+class Review(TypedDict):
+    text: str
+    score: NotRequired[int]
+
+
+class Document:
+    title: str
+    details: Annotated[Dict[str, int], Opaque]
+
+    def __init__(self, title: str, details: Dict[str, int]):
+        self.title = title
+        self.details = details
+
+    def __eq__(self, other):
+        return vars(self) == vars(other)
+
+
+def _avro_write(py_type, value, **kwargs) -> bytes:
+    """Return data encoded by the reference Avro implementation using the schema generated for a Python type"""
+    schema = avro.schema.parse(pas.generate(py_type, **kwargs))
+    buffer = io.BytesIO()
+    avro.io.DatumWriter(schema).write(value, avro.io.BinaryEncoder(buffer))
+    return buffer.getvalue()
+
+
+UTC = datetime.timezone.utc
+
+
+@pytest.mark.parametrize(
+    "py_type, value",
+    [
+        (int, 0),
+        (int, -(2**63)),
+        (int, 2**63 - 1),
+        (bool, True),
+        (float, 1.5),
+        (str, "héllo"),
+        (bytes, b"\x00\xff"),
+        (type(None), None),
+        (Name, Name("a")),
+        (Color, Color.GREEN),
+        (Symbol, Symbol.MINUS),
+        (Literal["a", "b"], "b"),
+        (uuid.UUID, uuid.UUID(int=1)),
+        (datetime.date, datetime.date(1960, 1, 2)),
+        (datetime.time, datetime.time(1, 2, 3, 4)),
+        (datetime.datetime, datetime.datetime(1960, 1, 2, 3, 4, 5, 6, tzinfo=UTC)),
+        (datetime.timedelta, datetime.timedelta(days=2, seconds=3, microseconds=4000)),
+        (Annotated[decimal.Decimal, pas.DecimalMeta(precision=5, scale=3)], decimal.Decimal("-12.300")),
+        (Annotated[decimal.Decimal, pas.DecimalMeta(precision=30)], decimal.Decimal("9" * 30)),
+        (List[int], []),
+        (List[int], [1, -1, 300]),
+        (Tuple[int, ...], (1, 2)),
+        (Set[str], {"a", "b"}),
+        (Dict[str, Any], {"a": [1, None]}),
+        (Dict[str, float], {"a": 1.5}),
+        (Dict[Symbol, int], {Symbol.PLUS: 1}),
+        (Optional[int], None),
+        (Optional[int], 1),
+        (Union[int, str, None], "a"),
+        (Union[str, Symbol], Symbol.PLUS),
+        (Union[str, Symbol], "a"),
+        (Item, Item("a", 1, 2.5)),
+        (Computed, Computed(1)),
+        (PlainClass, PlainClass("a", 1)),
+        (Ship, Ship(name="a", tags={"t"}, crew={"b": Item("c", 1, 2.5)})),
+        (Movie, {"title": "a", "year": None, "poster": b""}),
+        (Review, {"text": "a"}),
+        (Document, Document("a", {"b": 1})),
+    ],
+)
+def test_decode(py_type, value):
+    decoded = pas.decoder(py_type)(pas.encoder(py_type)(value))
+    assert decoded == value
+    assert type(decoded) is type(value)
+
+
+def test_decode_recursive_record():
+    created = datetime.datetime(2000, 1, 2, tzinfo=UTC)
+    parent = Order(1, created, [], Color.RED, decimal.Decimal("1.50"), None)
+    order = Order(2, created, [Item("a", 1, 2.5)], Color.GREEN, decimal.Decimal("-2.00"), parent, note="b")
+    data = dataclasses.asdict(order)
+    data["color"], data["parent"]["color"] = "GREEN", "RED"
+    assert pas.decoder(Order)(_avro_write(Order, data)) == order
+
+
+def test_decode_same_name_different_namespaces():
+    options = pas.Option.AUTO_NAMESPACE_MODULE
+    node = nodes.Node(1, [nodes.Node(2, [], other_nodes.Node("a", [other_nodes.Node("b", [])]))])
+    data = _avro_write(nodes.Node, dataclasses.asdict(node), options=options)
+    assert pas.decoder(nodes.Node, options=options)(data) == node
+
+
+def test_decode_pydantic_not_validated_again():
+    decoded = pas.decoder(Ship)(pas.encoder(Ship)(Ship(name="a", tags=set(), crew={})))
+    assert isinstance(decoded, Ship)
+    assert decoded.model_fields_set == {"name", "tags", "crew"}
+
+
+@pytest.mark.parametrize(
+    "options, value",
+    [
+        (pas.Option.MARK_NON_TOTAL_TYPED_DICTS, {"year": 2000}),
+        (pas.Option.MARK_NON_TOTAL_TYPED_DICTS, {"title": "a", "year": None}),
+        (pas.Option.MARK_NON_TOTAL_TYPED_DICTS, {"poster": b"a"}),
+    ],
+)
+def test_decode_typed_dict_missing_marker(options, value):
+    data = pas.encoder(Movie, options=options)(value)
+    assert pas.decoder(Movie, options=options)(data) == value
+
+
+def test_decode_opaque():
+    data = _avro_write(Document, {"title": "a", "details": '{"b":1}'})
+    assert vars(pas.decoder(Document)(data)) == {"title": "a", "details": {"b": 1}}
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        pas.Option.INT_32 | pas.Option.FLOAT_32,
+        pas.Option.ADD_REFERENCE_ID,
+        pas.Option.ADD_RUNTIME_TYPE_FIELD,
+        pas.Option.MILLISECONDS,
+        pas.Option.LOGICAL_JSON_STRING,
+    ],
+)
+def test_decode_options(options):
+    value = Event(Item("a", 1, 2.5), datetime.datetime(2000, 1, 2, 3, 4, 5, 6000, tzinfo=UTC), [{"d": 1}], {"e": None})
+    assert pas.decoder(Event, options=options)(pas.encoder(Event, options=options)(value)) == value
+
+
+def test_decode_reference_ids():
+    options = pas.Option.ADD_REFERENCE_ID
+    data = _avro_write(Item, {"name": "a", "quantity": 1, "price": 2.5, "__id": 123}, options=options)
+    assert pas.decoder(Item, options=options)(data) == Item("a", 1, 2.5)
+
+
+def test_decode_wrap_into_records():
+    options = pas.Option.WRAP_INTO_RECORDS
+    data = _avro_write(
+        Dict[str, List[int]], {"__id": 1, "__data": {"a": {"__id": None, "__data": [1]}}}, options=options
+    )
+    assert pas.decoder(Dict[str, List[int]], options=options)(data) == {"a": [1]}
+
+
+def test_decode_blocks_with_size():
+    # Blocks of 2 and 1 items, the first one with a negative count followed by its size in bytes
+    data = bytes([3, 4, 2, 4, 2, 6, 0])
+    assert pas.decoder(List[int])(data) == [1, 2, 3]
+
+
+def test_decode_memoryview():
+    data = bytearray(b"\x00" + pas.encoder(str)("héllo") + b"\x00")
+    assert pas.decoder(str)(memoryview(data)[1:-1]) == "héllo"
+
+
+def test_reader():
+    data = memoryview(pas.encoder(Item)(Item("a", 1, 2.5)) * 2)
+    read = pas._decoder.reader(Item)
+    first, pos = read(data, 0)
+    second, pos = read(data, pos)
+    assert first == second == Item("a", 1, 2.5)
+    assert pos == len(data)
+
+
+def test_decoder_cached():
+    assert pas.decoder(Item) is pas.decoder(Item)
+    assert pas.decoder(Item, options=pas.Option.NO_DOC) is not pas.decoder(Item)
+
+
+def test_decoder_weak_keys():
+    PyType = dataclasses.make_dataclass("PyType", [("field_a", str)])
+    assert pas.decoder(PyType)(b"\x02a") == PyType("a")
+    assert pas.decoder(PyType) is pas.decoder(PyType)
+    ref = weakref.ref(PyType)
+    del PyType
+    gc.collect()
+    assert ref() is None
+
+
+@pytest.mark.parametrize(
+    "py_type, data, match",
+    [
+        (Item, b"\x02a", "unexpected end of data"),
+        (str, b"\x06ab", "3 bytes to read at position 1 of 3"),
+        (int, b"\x02\x00", "1 bytes left after decoding a value"),
+        (Color, b"\x04", "2 is not a symbol index of"),
+        (Optional[int], b"\x04", "2 is not a branch index of"),
+        (Symbol, b"\x02*", "'\\*' is not a valid Symbol"),
+    ],
+)
+def test_decode_invalid(py_type, data, match):
+    with pytest.raises(ValueError, match=match):
+        pas.decoder(py_type)(data)
@@ -0,0 +1,255 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import io
+import uuid
+from typing import Annotated, Any, Dict, List, Literal, Optional, Set, TypedDict, Union
+
+import avro.io
+import avro.schema
+import pydantic
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema._encoder import resolve_name
+from tests.models import nodes, other_nodes
+
+
+class Color(enum.Enum):
+    RED = "RED"
+    GREEN = "GREEN"
+
+
+class Symbol(enum.StrEnum):
+    PLUS = "+"
+    MINUS = "-"
+
+
+@dataclasses.dataclass
+class Item:
+    name: str
+    quantity: int
+    price: float
+
+
+@dataclasses.dataclass
+class Order:
+    id: int
+    created: datetime.datetime
+    items: List[Item]
+    color: Color
+    amount: Annotated[decimal.Decimal, pas.DecimalMeta(precision=10, scale=2)]
+    parent: Optional["Order"]
+    note: Optional[str] = None
+
+
+class Ship(pydantic.BaseModel):
+    name: str
+    tags: Set[str]
+    crew: Dict[str, Item]
+
+
+class PlainClass:
+    name: str
+    count: int
+
+    def __init__(self, name: str, count: int):
+        self.name = name
+        self.count = count
+
+
+class Movie(TypedDict, total=False):
+    title: str
+    year: Optional[int]
+
+
+def _avro_read(py_type, data: bytes, **kwargs):
+    """Return data decoded by the reference Avro implementation using the schema generated for a Python type"""
+    schema = avro.schema.parse(pas.generate(py_type, **kwargs))
+    decoder = avro.io.BinaryDecoder(io.BytesIO(data))
+    value = avro.io.DatumReader(schema).read(decoder)
+    assert decoder.reader.read() == b""  # All data read
+    return value
+
+
+UTC = datetime.timezone.utc
+
+
+@pytest.mark.parametrize(
+    "py_type, value, expected",
+    [
+        (int, 0, 0),
+        (int, -(2**63), -(2**63)),
+        (int, 2**63 - 1, 2**63 - 1),
+        (bool, True, True),
+        (float, 1.5, 1.5),
+        (float, 2, 2.0),
+        (str, "héllo", "héllo"),
+        (bytes, b"\x00\xff", b"\x00\xff"),
+        (type(None), None, None),
+        (Color, Color.GREEN, "GREEN"),
+        (Symbol, Symbol.MINUS, "-"),
+        (Literal["a", "b"], "b", "b"),
+        (uuid.UUID, uuid.UUID(int=1), str(uuid.UUID(int=1))),
+        (datetime.date, datetime.date(2000, 1, 2), datetime.date(2000, 1, 2)),
+        (datetime.time, datetime.time(1, 2, 3, 4), datetime.time(1, 2, 3, 4)),
+        (
+            datetime.datetime,
+            datetime.datetime(2000, 1, 2, 3, 4, 5, 6, tzinfo=UTC),
+            datetime.datetime(2000, 1, 2, 3, 4, 5, 6, tzinfo=UTC),
+        ),
+        (
+            datetime.datetime,
+            datetime.datetime(1960, 1, 2, 3, 4, 5, 6),  # Naive, assumed to be UTC
+            datetime.datetime(1960, 1, 2, 3, 4, 5, 6, tzinfo=UTC),
+        ),
+        (
+            Annotated[decimal.Decimal, pas.DecimalMeta(precision=5, scale=3)],
+            decimal.Decimal("-12.3"),
+            decimal.Decimal("-12.300"),
+        ),
+        (Annotated[decimal.Decimal, pas.DecimalMeta(precision=5)], decimal.Decimal("128"), decimal.Decimal("128")),
+        (List[int], [], []),
+        (List[int], [1, -1, 300], [1, -1, 300]),
+        (Dict[str, Any], {"a": [1, None]}, b'{"a":[1,null]}'),
+        (Dict[str, float], {"a": 1.5}, {"a": 1.5}),
+        (Optional[int], None, None),
+        (Optional[int], 1, 1),
+        (Union[int, str, None], "a", "a"),
+        (Union[int, float], 1.5, 1.5),
+        (Union[int, float], True, True),  # Booleans are integers
+        (Item, Item("a", 1, 2.5), {"name": "a", "quantity": 1, "price": 2.5}),
+        (PlainClass, PlainClass("a", 1), {"name": "a", "count": 1}),
+        (
+            Ship,
+            Ship(name="a", tags={"t"}, crew={"b": Item("c", 1, 2.5)}),
+            {"name": "a", "tags": ["t"], "crew": {"b": {"name": "c", "quantity": 1, "price": 2.5}}},
+        ),
+    ],
+)
+def test_encode(py_type, value, expected):
+    assert _avro_read(py_type, pas.encoder(py_type)(value)) == expected
+
+
+def test_encode_recursive_record():
+    created = datetime.datetime(2000, 1, 2, tzinfo=UTC)
+    parent = Order(1, created, [], Color.RED, decimal.Decimal("1.5"), None)
+    order = Order(2, created, [Item("a", 1, 2.5)], Color.GREEN, decimal.Decimal("-2"), parent, note="b")
+    assert _avro_read(Order, pas.encoder(Order)(order)) == {
+        "id": 2,
+        "created": created,
+        "items": [{"name": "a", "quantity": 1, "price": 2.5}],
+        "color": "GREEN",
+        "amount": decimal.Decimal("-2.00"),
+        "parent": {
+            "id": 1,
+            "created": created,
+            "items": [],
+            "color": "RED",
+            "amount": decimal.Decimal("1.50"),
+            "parent": None,
+            "note": None,
+        },
+        "note": "b",
+    }
+
+
+@pytest.mark.parametrize(
+    "options, expected",
+    [
+        (pas.Option.INT_32 | pas.Option.FLOAT_32, {"name": "a", "quantity": 1, "price": 2.5}),
+        (pas.Option.ADD_REFERENCE_ID, {"name": "a", "quantity": 1, "price": 2.5, "__id": None}),
+        (pas.Option.ADD_RUNTIME_TYPE_FIELD, {"name": "a", "quantity": 1, "price": 2.5, "_runtime_type": "Item"}),
+    ],
+)
+def test_encode_options(options, expected):
+    assert _avro_read(Item, pas.encoder(Item, options=options)(Item("a", 1, 2.5)), options=options) == expected
+
+
+def test_encode_same_name_different_namespaces():
+    options = pas.Option.AUTO_NAMESPACE_MODULE
+    node = nodes.Node(1, [nodes.Node(2, [], other_nodes.Node("a", [other_nodes.Node("b", [])]))])
+    assert _avro_read(nodes.Node, pas.encoder(nodes.Node, options=options)(node), options=options) == {
+        "value": 1,
+        "children": [
+            {"value": 2, "children": [], "other": {"label": "a", "children": [{"label": "b", "children": []}]}}
+        ],
+        "other": None,
+    }
+
+
+def test_resolve_name():
+    named = {"a.Node": 1, "b.Node": 2, "b.Leaf": 3}
+    assert resolve_name(named, "a.Node", "b") == 1
+    assert resolve_name(named, "Node", "b") == 2
+    assert resolve_name(named, "Leaf", "a") == 3
+    assert resolve_name(named, "c.Leaf", "b") is None
+    with pytest.raises(pas.TypeNotSupportedError, match="Name 'Node' is ambiguous: it refers to a.Node, b.Node"):
+        resolve_name(named, "Node", "c")
+
+
+def test_encode_milliseconds():
+    options = pas.Option.MILLISECONDS
+    value = datetime.datetime(2000, 1, 2, 3, 4, 5, 6789, tzinfo=UTC)
+    data = pas.encoder(datetime.datetime, options=options)(value)
+    assert _avro_read(datetime.datetime, data, options=options) == value.replace(microsecond=6000)
+    data = pas.encoder(datetime.time, options=options)(value.time())
+    assert _avro_read(datetime.time, data, options=options) == datetime.time(3, 4, 5, 6000)
+
+
+def test_encode_wrap_into_records():
+    options = pas.Option.WRAP_INTO_RECORDS
+    data = pas.encoder(Dict[str, List[int]], options=options)({"a": [1]})
+    assert _avro_read(Dict[str, List[int]], data, options=options) == {
+        "__id": None,
+        "__data": {"a": {"__id": None, "__data": [1]}},
+    }
+
+
+def test_encode_typed_dict_missing_marker():
+    options = pas.Option.MARK_NON_TOTAL_TYPED_DICTS
+    encode = pas.encoder(Movie, options=options)
+    assert _avro_read(Movie, encode({"title": "a", "year": None}), options=options) == {"title": "a", "year": None}
+    assert _avro_read(Movie, encode({"year": 2000}), options=options) == {"title": "__td_missing__", "year": 2000}
+
+
+def test_encode_timedelta():
+    data = pas.encoder(datetime.timedelta)(datetime.timedelta(days=2, seconds=3, microseconds=4000))
+    assert data == b"\x00\x00\x00\x00\x02\x00\x00\x00\xbc\x0b\x00\x00"
+
+
+def test_encoder_cached():
+    assert pas.encoder(Item) is pas.encoder(Item)
+    assert pas.encoder(Item, options=pas.Option.NO_DOC) is not pas.encoder(Item)
+
+
+@pytest.mark.parametrize(
+    "py_type, value, error, match",
+    [
+        (int, 2**63, ValueError, "out of range for an Avro long"),
+        (
+            Annotated[decimal.Decimal, pas.DecimalMeta(precision=3, scale=1)],
+            decimal.Decimal("1.23"),
+            ValueError,
+            "scale",
+        ),
+        (Annotated[decimal.Decimal, pas.DecimalMeta(precision=3, scale=1)], decimal.Decimal("123"), ValueError, "prec"),
+        (Optional[int], "a", TypeError, "'a' does not match any type of typing.Optional"),
+        (Color, "BLUE", ValueError, "'BLUE' is not a member of"),
+    ],
+)
+def test_encode_invalid(py_type, value, error, match):
+    with pytest.raises(error, match=match):
+        pas.encoder(py_type)(value)
@@ -0,0 +1,154 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import uuid
+from typing import Annotated, Dict, List, Optional, Union
+
+import avro.schema
+import pydantic
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema import _fingerprint
+from py_avro_schema._fingerprint import canonical_schema_data
+
+
+class Color(enum.Enum):
+    RED = "RED"
+    GREEN = "GREEN"
+
+
+@dataclasses.dataclass
+class Address:
+    """An address"""
+
+    street: str
+    number: Optional[int] = None
+
+
+@dataclasses.dataclass
+class Person:
+    """A person"""
+
+    name: str
+    home: Address
+    work: Optional[Address]
+    favourite_colors: List[Color]
+    balance: Annotated[decimal.Decimal, pas.DecimalMeta(precision=10, scale=2)]
+    born: datetime.date
+    updated: datetime.datetime
+    id: uuid.UUID
+    photo: bytes
+    scores: Dict[str, float]
+    friends: List["Person"] = dataclasses.field(default_factory=list)
+    nickname: Union[str, int, None] = None
+
+
+class Ship(pydantic.BaseModel):
+    """A ship"""
+
+    name: str
+    crew: List[Person]
+    color: Color = Color.RED
+
+
+def _without_logical_types(schema_data):
+    """
+    Return schema data without logical types on primitive types
+
+    The Python Avro implementation keeps primitive types with a logical type in their full form ``{"type": "long"}``
+    instead of the simple form ``"long"`` required by the specification and used by the Java implementation.
+    """
+    if isinstance(schema_data, list):
+        return [_without_logical_types(item) for item in schema_data]
+    if isinstance(schema_data, dict):
+        if "logicalType" in schema_data and schema_data["type"] != "fixed":
+            return schema_data["type"]
+        return {key: _without_logical_types(value) for key, value in schema_data.items()}
+    return schema_data
+
+
+def _reference_schema(py_type, **kwargs):
+    """Return the schema parsed by the reference Avro implementation"""
+    schema_data = json.loads(pas.generate(py_type, **kwargs))
+    return avro.schema.parse(json.dumps(_without_logical_types(schema_data)))
+
+
+PY_TYPES = [int, str, Color, Address, Person, Ship, List[Person], Optional[Address]]
+
+
+@pytest.mark.parametrize("py_type", PY_TYPES)
+@pytest.mark.parametrize("namespace", [None, "com.example"])
+def test_canonical_form_same_as_avro(py_type, namespace):
+    assert (
+        pas.canonical_form(py_type, namespace=namespace)
+        == _reference_schema(py_type, namespace=namespace).canonical_form
+    )
+
+
+@pytest.mark.parametrize("py_type", PY_TYPES)
+@pytest.mark.parametrize(
+    "algorithm, avro_algorithm", [("CRC-64-AVRO", "CRC-64-AVRO"), ("MD5", "md5"), ("SHA-256", "sha256")]
+)
+def test_fingerprint_same_as_avro(py_type, algorithm, avro_algorithm):
+    assert pas.fingerprint(py_type, algorithm=algorithm) == _reference_schema(py_type).fingerprint(avro_algorithm)
+
+
+def test_canonical_form_logical_types():
+    assert pas.canonical_form(datetime.datetime) == '"long"'
+    assert pas.canonical_form(uuid.UUID) == '"string"'
+
+
+def test_canonical_schema_data():
+    schema_data = {
+        "type": "record",
+        "name": "Outer",
+        "namespace": "a",
+        "doc": "Ignored",
+        "aliases": ["Ignored"],
+        "fields": [
+            {"name": "inner", "type": {"type": "enum", "name": "Inner", "symbols": ["X"], "default": "X"}},
+            {"name": "inner_ref", "type": "Inner", "default": "X"},
+            {"name": "other", "type": {"type": "fixed", "name": "b.Other", "size": 4, "namespace": "c"}},
+            {"name": "values", "type": {"type": {"type": "map", "values": {"type": "int"}}}},
+            {"name": "outer", "type": ["null", "Outer"]},
+        ],
+    }
+    assert canonical_schema_data(schema_data) == {
+        "name": "a.Outer",
+        "type": "record",
+        "fields": [
+            {"name": "inner", "type": {"name": "a.Inner", "type": "enum", "symbols": ["X"]}},
+            {"name": "inner_ref", "type": "a.Inner"},
+            {"name": "other", "type": {"name": "b.Other", "type": "fixed", "size": 4}},
+            {"name": "values", "type": {"type": "map", "values": "int"}},
+            {"name": "outer", "type": ["null", "a.Outer"]},
+        ],
+    }
+
+
+def test_fingerprint_cached():
+    _fingerprint._fingerprint.cache_clear()
+    first = pas.fingerprint(Person)
+    assert pas.fingerprint(Person, options=pas.Option.NO_DOC | pas.Option.JSON_INDENT_2) is first
+    info = _fingerprint._fingerprint.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert pas.canonical_form(Person, options=pas.Option.NO_DOC) == pas.canonical_form(Person)
+
+
+def test_fingerprint_unsupported_algorithm():
+    with pytest.raises(ValueError, match="Unsupported fingerprint algorithm 'CRC-32'"):
+        pas.fingerprint(Person, algorithm="CRC-32")
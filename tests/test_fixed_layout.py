@@ -0,0 +1,135 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import datetime
+from typing import Final, List, Optional, TypedDict
+
+import pydantic
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema._schemas import root_schema_obj
+
+
+@dataclasses.dataclass
+class Position:
+    x: float
+    y: float
+
+
+@dataclasses.dataclass
+class Reading:
+    ok: bool
+    value: float
+    position: Position
+    elapsed: datetime.timedelta
+
+
+@dataclasses.dataclass
+class Sample:
+    ok: bool
+    value: float
+
+
+class Point(TypedDict):
+    x: float
+    y: float
+
+
+class Flag(pydantic.BaseModel):
+    on: bool
+    level: Final[float]
+
+
+READINGS = [
+    Reading(True, 0.5, Position(1.0, -2.5), datetime.timedelta(days=2, milliseconds=3)),
+    Reading(False, -1e300, Position(0.0, 3.25), datetime.timedelta(0)),
+]
+
+
+@pytest.mark.parametrize(
+    "py_type, options, struct_format",
+    [
+        (Sample, pas.Option(0), "?d"),
+        (Sample, pas.Option.FLOAT_32, "?f"),
+        (Reading, pas.Option(0), "?dddIII"),
+        (Point, pas.Option(0), "dd"),
+        (Flag, pas.Option(0), "?d"),
+        (Sample, pas.Option.ADD_REFERENCE_ID, None),
+        (Optional[float], pas.Option(0), None),
+        (Position, pas.Option.ADD_RUNTIME_TYPE_FIELD, None),
+    ],
+)
+def test_struct_format(py_type, options, struct_format):
+    assert root_schema_obj(py_type, options=options).struct_format() == struct_format
+
+
+@pytest.mark.parametrize("py_type", [int, List[float], Optional[Sample]])
+def test_not_fixed_layout(py_type):
+    @dataclasses.dataclass
+    class Record:
+        ok: bool
+        other: py_type
+
+    assert pas.struct_codec(Record) is None
+    assert pas.struct_codec(py_type) is None
+
+
+@pytest.mark.parametrize(
+    "py_type, options, values",
+    [
+        (Reading, pas.Option(0), READINGS),
+        (Sample, pas.Option.FLOAT_32, [Sample(True, 0.5), Sample(False, -2.0)]),
+        (Point, pas.Option(0), [Point(x=1.0, y=2.0)]),
+        (Flag, pas.Option(0), [Flag(on=True, level=0.5)]),
+        (Position, pas.Option(0), []),
+    ],
+)
+def test_encode_decode(py_type, options, values):
+    codec = pas.struct_codec(py_type, options=options)
+    encode = pas.encoder(py_type, options=options)
+    expected = b"".join(map(encode, values))
+    assert b"".join(map(codec.encode, values)) == expected
+    assert codec.encode_many(values) == expected
+    assert pas.encode_batch(values, py_type, options=options).data == expected
+    assert [codec.decode(encode(value)) for value in values] == values
+    assert list(codec.iter_decode(expected)) == values
+    assert [pas.decoder(py_type, options=options)(codec.encode(value)) for value in values] == values
+
+
+def test_pack_into_unpack_from():
+    codec = pas.struct_codec(Reading)
+    assert codec.struct.format == "<?dddIII"
+    buffer = bytearray(2 + codec.size)
+    codec.pack_into(buffer, 2, READINGS[0])
+    assert buffer[2:] == pas.encoder(Reading)(READINGS[0])
+    assert codec.unpack_from(buffer, 2) == READINGS[0]
+
+
+def test_cached():
+    assert pas.struct_codec(Reading) is pas.struct_codec(Reading)
+
+
+def test_invalid_data():
+    codec = pas.struct_codec(Sample)
+    with pytest.raises(ValueError, match="8 bytes instead of 9"):
+        codec.decode(bytes(8))
+    with pytest.raises(ValueError, match="10 bytes is not a multiple of 9"):
+        list(codec.iter_decode(bytes(10)))
+    with pytest.raises(ValueError, match="unexpected end of data"):
+        codec.unpack_from(bytes(9), 1)
+
+
+def test_negative_duration():
+    reading = dataclasses.replace(READINGS[0], elapsed=datetime.timedelta(days=-1))
+    with pytest.raises(ValueError, match="cannot be encoded as an Avro duration"):
+        pas.struct_codec(Reading).encode(reading)
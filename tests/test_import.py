@@ -0,0 +1,79 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import subprocess
+import sys
+
+import orjson
+
+import py_avro_schema as pas
+
+# Modules which must only be imported when generating schemas, not when importing the package
+LAZY_MODULES = [
+    "concurrent.futures",
+    "importlib.metadata",
+    "more_itertools",
+    "orjson",
+    "py_avro_schema._batch",
+    "py_avro_schema._binary",
+    "py_avro_schema._columnar",
+    "py_avro_schema._decoder",
+    "py_avro_schema._disk_cache",
+    "py_avro_schema._encoder",
+    "py_avro_schema._fingerprint",
+    "py_avro_schema._fixed_layout",
+    "py_avro_schema._resolution",
+    "py_avro_schema._schemas",
+    "py_avro_schema._single_object",
+    "py_avro_schema._view",
+    "py_avro_schema.container",
+    "py_avro_schema.registry",
+    "pydantic",
+    "typeguard",
+]
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Run code in a new interpreter and return the cumulative import time in microseconds of each imported module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_is_lazy():
+    times = _import_times("import py_avro_schema")
+    assert "py_avro_schema" in times
+    assert [module for module in LAZY_MODULES if module in times] == []
+
+
+def test_generate_imports_on_first_use():
+    times = _import_times("import py_avro_schema; py_avro_schema.generate(int); py_avro_schema.DecimalType[4, 2]")
+    assert {"orjson", "py_avro_schema._schemas", "typeguard"} <= times.keys()
+
+
+def test_lazy_attributes():
+    assert pas.__version__
+    assert pas.register_schema is pas._schemas.register_schema
+    assert {"__version__", "generate_many", "TypeNotSupportedError"} <= set(dir(pas))
+
+
+def test_json_options_match_orjson():
+    assert pas.Option.JSON_INDENT_2.value == orjson.OPT_INDENT_2
+    assert pas.Option.JSON_SORT_KEYS.value == orjson.OPT_SORT_KEYS
+    assert pas.Option.JSON_APPEND_NEWLINE.value == orjson.OPT_APPEND_NEWLINE
@@ -0,0 +1,227 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import datetime
+from typing import Dict, List, Optional
+
+import orjson
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema import registry
+
+
+@dataclasses.dataclass
+class Ship:
+    name: str
+    year_launched: int
+
+
+@dataclasses.dataclass
+class Port:
+    name: str
+    ships: List[Ship]
+
+
+class CountingRegistry(registry.SchemaRegistry):
+    """In-memory registry counting calls"""
+
+    def __init__(self):
+        self.schemas: Dict[bytes, int] = {}
+        self.calls: List[str] = []
+
+    def register(self, subject, schema):
+        self.calls.append(subject)
+        return self.schemas.setdefault(schema, len(self.schemas) + 1)
+
+    def get_schema(self, schema_id):
+        return {id_: schema for schema, id_ in self.schemas.items()}[schema_id]
+
+
+class ReadOnlyRegistry(registry.SchemaRegistry):
+    """Registry which cannot register schemas, counting schema lookups"""
+
+    def __init__(self, schema_registry):
+        self.schema_registry = schema_registry
+        self.lookups: List[int] = []
+
+    def register(self, subject, schema):
+        raise PermissionError(f"Cannot register schemas under {subject}")
+
+    def get_schema(self, schema_id):
+        self.lookups.append(schema_id)
+        return self.schema_registry.get_schema(schema_id)
+
+
+@pytest.fixture
+def sqlite_registry():
+    schema_registry = registry.SQLiteSchemaRegistry(":memory:")
+    yield schema_registry
+    schema_registry.close()
+
+
+def test_serialize(sqlite_registry):
+    serializer = registry.Serializer(sqlite_registry)
+    ship = Ship("Titanic", 1911)
+    message = serializer.serialize(ship)
+    assert message == b"\x00\x00\x00\x00\x01" + pas.encoder(Ship)(ship)
+    assert serializer.deserialize(message, Ship) == ship
+    assert sqlite_registry.get_schema(1) == pas.generate(Ship)
+    assert sqlite_registry.subjects() == {"test_registry.Ship": [1]}
+
+
+def test_serialize_py_type(sqlite_registry):
+    serializer = registry.Serializer(sqlite_registry)
+    message = serializer.serialize(None, Optional[int])
+    assert message == b"\x00\x00\x00\x00\x01\x02"
+    assert serializer.deserialize(message, Optional[int]) is None
+    assert sqlite_registry.subjects() == {"union": [1]}
+
+
+def test_ids_cached():
+    schema_registry = CountingRegistry()
+    serializer = registry.Serializer(schema_registry)
+    serializer.serialize(Ship("a", 1))
+    serializer.serialize(Ship("b", 2))
+    serializer.serialize(Port("c", []))
+    serializer.serialize(Port("d", []))
+    assert schema_registry.calls == ["test_registry.Ship", "test_registry.Port"]
+
+
+def test_prefetch():
+    schema_registry = CountingRegistry()
+    calls = []
+    schema_registry.register_many = lambda items: calls.append(items) or [1, 2]  # type: ignore
+    serializer = registry.Serializer(schema_registry)
+    serializer.prefetch([Ship, Port, Ship])
+    assert [[subject for subject, _ in items] for items in calls] == [["test_registry.Ship", "test_registry.Port"]]
+    assert serializer.serialize(Port("a", []))[:5] == b"\x00\x00\x00\x00\x02"
+    serializer.prefetch([Ship])
+    assert len(calls) == 1
+
+
+def test_sqlite_registry_same_schema(sqlite_registry):
+    schema = pas.generate(Ship)
+    ids = sqlite_registry.register_many([("a", schema), ("b", pas.generate(Port)), ("b", schema)])
+    # Schemas differing in documentation only have the same Parsing Canonical Form
+    assert sqlite_registry.register("a", pas.generate(Ship, options=pas.Option.NO_DOC)) == 1
+    assert ids == [1, 2, 1]
+    assert sqlite_registry.subjects() == {"a": [1], "b": [2, 1]}
+
+
+def test_sqlite_registry_file(tmp_path):
+    path = str(tmp_path / "schemas.db")
+    schema_registry = registry.SQLiteSchemaRegistry(path)
+    assert registry.Serializer(schema_registry).schema_id(Port) == 1
+    schema_registry.close()
+    schema_registry = registry.SQLiteSchemaRegistry(path)
+    assert registry.Serializer(schema_registry).schema_id(Ship) == 2
+    assert schema_registry.get_schema(1) == pas.generate(Port)
+    schema_registry.close()
+
+
+def test_sqlite_registry_rollback(sqlite_registry):
+    with pytest.raises(ValueError):
+        sqlite_registry.register_many([("a", pas.generate(Ship)), ("b", b"not json")])
+    assert sqlite_registry.subjects() == {}
+
+
+def test_sqlite_registry_unknown_id(sqlite_registry):
+    with pytest.raises(KeyError):
+        sqlite_registry.get_schema(1)
+
+
+def test_custom_subject(sqlite_registry):
+    serializer = registry.Serializer(sqlite_registry, subject=lambda py_type, schema: "ships-value")
+    serializer.serialize(Ship("a", 1))
+    assert sqlite_registry.subjects() == {"ships-value": [1]}
+
+
+def test_deserialize_other_id_same_schema():
+    # This registry gives schemas differing in documentation only different ids
+    schema_registry = CountingRegistry()
+    message = registry.Serializer(schema_registry, options=pas.Option.NO_DOC).serialize(Ship("a", 1))
+    serializer = registry.Serializer(schema_registry)
+    assert serializer.deserialize(message, Ship) == Ship("a", 1)
+    assert serializer.schema_id(Ship) == 2
+
+
+def test_deserialize_other_registry(sqlite_registry):
+    message = registry.Serializer(sqlite_registry).serialize(Ship("a", 1))
+    other_registry = registry.SQLiteSchemaRegistry(":memory:")
+    other_registry.register("ports", pas.generate(Port))
+    with pytest.raises(ValueError, match="Cannot read data written with schema"):
+        registry.Serializer(other_registry).deserialize(message, Ship)
+    other_registry.close()
+
+
+def test_deserialize_other_schema(sqlite_registry):
+    serializer = registry.Serializer(sqlite_registry)
+    message = serializer.serialize(Port("a", []))
+    with pytest.raises(ValueError, match="Cannot read data written with schema"):
+        serializer.deserialize(message, Ship)
+
+
+@dataclasses.dataclass
+class ShipV2:
+    name: str
+    tonnage: float = 0.0
+
+
+def test_deserialize_older_schema(sqlite_registry):
+    schema = orjson.loads(pas.generate(Ship))
+    schema["name"] = "ShipV2"
+    schema_id = sqlite_registry.register("test_registry.ShipV2", orjson.dumps(schema))
+    message = b"\x00" + schema_id.to_bytes(4, "big") + pas.encoder(Ship)(Ship("a", 1))
+    assert registry.Serializer(sqlite_registry).deserialize(message, ShipV2) == ShipV2("a")
+
+
+@dataclasses.dataclass
+class Launch:
+    at: datetime.datetime
+
+
+def test_deserialize_other_logical_type(sqlite_registry):
+    launch = Launch(datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc))
+    message = registry.Serializer(sqlite_registry, options=pas.Option.MILLISECONDS).serialize(launch)
+    assert registry.Serializer(sqlite_registry).deserialize(message, Launch) == launch
+    assert sqlite_registry.subjects() == {"test_registry.Launch": [1]}
+
+
+def test_deserialize_read_only(sqlite_registry):
+    messages = [registry.Serializer(sqlite_registry).serialize(ship) for ship in (Ship("a", 1), Ship("b", 2))]
+    read_only = ReadOnlyRegistry(sqlite_registry)
+    serializer = registry.Serializer(read_only)
+    assert [serializer.deserialize(message, Ship) for message in messages] == [Ship("a", 1), Ship("b", 2)]
+    with pytest.raises(ValueError, match="Cannot read data written with schema"):
+        serializer.deserialize(messages[0], Port)
+    assert read_only.lookups == [1]
+    assert sqlite_registry.subjects() == {"test_registry.Ship": [1]}
+
+
+def test_bounded_caches(sqlite_registry, monkeypatch):
+    monkeypatch.setattr(registry, "_MAX_TYPES", 1)
+    serializer = registry.Serializer(sqlite_registry)
+    messages = [serializer.serialize(Ship("a", 1)), serializer.serialize(Port("b", []))]
+    assert serializer.deserialize(messages[1], Port) == Port("b", [])
+    assert len(serializer._encoders) == 1
+    assert serializer._resolving_decoders.info().maxsize == 1
+
+
+@pytest.mark.parametrize("data", [b"", b"\x00\x00\x00\x01", b"\x01\x00\x00\x00\x01\x00"])
+def test_deserialize_invalid(sqlite_registry, data):
+    with pytest.raises(ValueError, match="not in the Confluent Schema Registry wire format"):
+        registry.Serializer(sqlite_registry).deserialize(data, Ship)
+
+
+def test_registry_module_lazy_attribute():
+    assert pas.registry is registry
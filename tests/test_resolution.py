@@ -0,0 +1,306 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import gc
+import io
+import weakref
+from typing import Annotated, Dict, List, Optional, TypedDict, Union
+
+import avro.io
+import avro.schema
+import orjson
+import pydantic
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema._alias import Alias, register_type_alias
+from tests.models import nodes, other_nodes
+
+
+class Color(enum.Enum):
+    RED = "RED"
+    GREEN = "GREEN"
+
+
+@dataclasses.dataclass
+class Ship:
+    name: str
+    color: Color
+    crew: List[str] = dataclasses.field(default_factory=list)
+    length: Optional[float] = None
+
+
+@dataclasses.dataclass
+class Node:
+    value: int
+    children: List["Node"]
+
+
+class Model(pydantic.BaseModel):
+    name: Annotated[str, Alias("title")]
+    count: int = 0
+
+
+class Movie(TypedDict):
+    title: str
+    year: int
+
+
+@register_type_alias("test_resolution.OldPort")
+@dataclasses.dataclass
+class Port:
+    name: str
+
+
+def _record(name, *fields):
+    """Return the schema data of a record in this module's namespace"""
+    return {
+        "type": "record",
+        "name": name,
+        "namespace": "test_resolution",
+        "fields": [{"name": field_name, "type": field_type} for field_name, field_type in fields],
+    }
+
+
+COLOR = {"type": "enum", "name": "Color", "symbols": ["BLUE", "GREEN", "RED"]}
+
+
+def _avro_write(schema, value) -> bytes:
+    """Return data encoded by the reference Avro implementation"""
+    buffer = io.BytesIO()
+    avro.io.DatumWriter(avro.schema.parse(orjson.dumps(schema).decode())).write(value, avro.io.BinaryEncoder(buffer))
+    return buffer.getvalue()
+
+
+def test_added_removed_reordered_fields():
+    writer = _record(
+        "Ship",
+        ("tonnage", "double"),
+        ("color", COLOR),
+        ("owner", _record("Owner", ("name", "string"), ("ships", {"type": "array", "items": "string"}))),
+        ("name", "string"),
+        ("flags", {"type": "map", "values": ["null", "long"]}),
+    )
+    data = _avro_write(
+        writer,
+        {"tonnage": 1.5, "color": "GREEN", "owner": {"name": "a", "ships": ["b"]}, "name": "c", "flags": {"d": 1}},
+    )
+    assert pas.resolving_decoder(writer, Ship)(data) == Ship("c", Color.GREEN)
+
+
+def test_enum_default():
+    writer = _record("Ship", ("name", "string"), ("color", COLOR))
+    data = _avro_write(writer, {"name": "a", "color": "BLUE"})
+    assert pas.resolving_decoder(writer, Ship)(data) == Ship("a", Color.RED)
+
+
+@pytest.mark.parametrize(
+    "writer_type, value, py_type, expected",
+    [
+        ("int", 1, int, 1),
+        ("int", 1, float, 1.0),
+        ("long", 2**40, float, 2.0**40),
+        ("float", 1.5, float, 1.5),
+        ("string", "a", bytes, b"a"),
+        ("bytes", b"a", str, "a"),
+        ("long", 1, Optional[str], ValueError),
+        ("long", 1, Optional[float], 1.0),
+        (["null", "long"], None, int, ValueError),
+        (["null", "long"], 1, int, 1),
+        (["string", "long"], 1, Optional[float], 1.0),
+        ({"type": "array", "items": "int"}, [1], List[float], [1.0]),
+        ({"type": "map", "values": "int"}, {"a": 1}, Dict[str, float], {"a": 1.0}),
+    ],
+)
+def test_promotions_and_unions(writer_type, value, py_type, expected):
+    data = _avro_write(writer_type, value)
+    if expected is ValueError:
+        with pytest.raises(ValueError, match="Cannot read data written with schema"):
+            pas.resolving_decoder(orjson.dumps(writer_type), py_type)(data)
+    else:
+        decoded = pas.resolving_decoder(orjson.dumps(writer_type), py_type)(data)
+        assert decoded == expected
+        assert type(decoded) is type(expected)
+
+
+UTC = datetime.timezone.utc
+TIMESTAMP = datetime.datetime(2024, 1, 1, 12, 30, 15, 123000, tzinfo=UTC)
+DECIMAL_TYPE = Annotated[decimal.Decimal, pas.DecimalMeta(precision=6, scale=2)]
+
+
+@pytest.mark.parametrize(
+    "writer_type, value, py_type, options, expected",
+    [
+        ({"type": "long", "logicalType": "timestamp-millis"}, TIMESTAMP, datetime.datetime, pas.Option(0), TIMESTAMP),
+        (
+            {"type": "long", "logicalType": "timestamp-micros"},
+            TIMESTAMP,
+            datetime.datetime,
+            pas.Option.MILLISECONDS,
+            TIMESTAMP,
+        ),
+        (
+            {"type": "int", "logicalType": "time-millis"},
+            datetime.time(1, 2, 3, 4000),
+            datetime.time,
+            pas.Option(0),
+            datetime.time(1, 2, 3, 4000),
+        ),
+        (
+            {"type": "bytes", "logicalType": "decimal", "precision": 4, "scale": 2},
+            decimal.Decimal("1.50"),
+            DECIMAL_TYPE,
+            pas.Option(0),
+            decimal.Decimal("1.50"),
+        ),
+        (
+            {"type": "bytes", "logicalType": "decimal", "precision": 6, "scale": 3},
+            decimal.Decimal("1.500"),
+            DECIMAL_TYPE,
+            pas.Option(0),
+            ValueError,
+        ),
+        (
+            {"type": "int", "logicalType": "date"},
+            datetime.date(2024, 1, 1),
+            datetime.datetime,
+            pas.Option(0),
+            ValueError,
+        ),
+        ("long", 1, datetime.datetime, pas.Option(0), ValueError),
+        ({"type": "long", "logicalType": "timestamp-millis"}, TIMESTAMP, int, pas.Option(0), 1704112215123),
+    ],
+)
+def test_logical_types(writer_type, value, py_type, options, expected):
+    data = _avro_write(writer_type, value)
+    if expected is ValueError:
+        with pytest.raises(ValueError, match="Cannot read data written with schema"):
+            pas.resolving_decoder(orjson.dumps(writer_type), py_type, options=options)
+    else:
+        assert pas.resolving_decoder(orjson.dumps(writer_type), py_type, options=options)(data) == expected
+
+
+def test_logical_types_cache_key():
+    pas.resolving_decoder.cache_clear()
+    micros = pas.resolving_decoder({"type": "long", "logicalType": "timestamp-micros"}, datetime.datetime)
+    assert micros is pas.decoder(datetime.datetime)
+    millis = pas.resolving_decoder({"type": "long", "logicalType": "timestamp-millis"}, datetime.datetime)
+    assert millis is not micros
+    assert millis(_avro_write({"type": "long", "logicalType": "timestamp-millis"}, TIMESTAMP)) == TIMESTAMP
+    assert pas.resolving_decoder.cache_info().currsize == 2
+
+
+def test_field_alias_and_default_pydantic():
+    writer = _record("Model", ("title", "string"))
+    decoded = pas.resolving_decoder(writer, Model)(_avro_write(writer, {"title": "a"}))
+    assert decoded == Model(name="a")
+
+
+def test_record_alias():
+    writer = _record("OldPort", ("name", "string"))
+    assert pas.resolving_decoder(writer, Port)(_avro_write(writer, {"name": "a"})) == Port("a")
+
+
+def test_typed_dict():
+    writer = _record("Movie", ("year", "int"), ("rating", "float"), ("title", "string"))
+    data = _avro_write(writer, {"year": 2000, "rating": 1.5, "title": "a"})
+    assert pas.resolving_decoder(writer, Movie)(data) == {"title": "a", "year": 2000}
+
+
+def test_recursive():
+    writer = _record(
+        "Node", ("label", "string"), ("children", {"type": "array", "items": "test_resolution.Node"}), ("value", "int")
+    )
+    value = {"label": "a", "children": [{"label": "b", "children": [], "value": 2}], "value": 1}
+    assert pas.resolving_decoder(writer, Node)(_avro_write(writer, value)) == Node(1, [Node(2, [])])
+
+
+def test_same_name_different_namespaces():
+    options = pas.Option.AUTO_NAMESPACE_MODULE
+    writer = orjson.loads(pas.generate(nodes.Node, options=options))
+    writer["fields"].append({"name": "extra", "type": "long"})
+    other = {"label": "a", "children": [{"label": "b", "children": []}]}
+    data = _avro_write(writer, {"value": 1, "children": [], "other": other, "extra": 2})
+    expected = nodes.Node(1, [], other_nodes.Node("a", [other_nodes.Node("b", [])]))
+    assert pas.resolving_decoder(writer, nodes.Node, options=options)(data) == expected
+
+
+def test_union_same_name_different_namespaces():
+    options = pas.Option.AUTO_NAMESPACE_MODULE
+    py_type = Union[nodes.Node, other_nodes.Node]
+    writer = orjson.loads(pas.generate(other_nodes.Node, options=options))
+    data = _avro_write(writer, {"label": "a", "children": []})
+    assert pas.resolving_decoder(writer, py_type, options=options)(data) == other_nodes.Node("a", [])
+    writer["namespace"] = "other"
+    with pytest.raises(ValueError, match="Writer's schema 'other.Node' matches several union branches"):
+        pas.resolving_decoder(writer, py_type, options=options)
+
+
+def test_skip_recursive():
+    writer = _record(
+        "Ship", ("name", "string"), ("color", COLOR), ("tree", _record("Tree", ("next", ["null", "Tree"])))
+    )
+    data = _avro_write(writer, {"name": "a", "color": "RED", "tree": {"next": {"next": None}}})
+    assert pas.resolving_decoder(writer, Ship)(data) == Ship("a", Color.RED)
+
+
+def test_skip_blocks_with_size():
+    writer = _record("Ship", ("name", "string"), ("color", COLOR), ("counts", {"type": "array", "items": "long"}))
+    # Blocks of 2 and 1 items, the first one with a negative count followed by its size in bytes
+    data = b"\x02a\x04" + bytes([3, 4, 2, 4, 2, 6, 0])
+    assert pas.resolving_decoder(writer, Ship)(data) == Ship("a", Color.RED)
+
+
+def test_missing_field_without_default():
+    writer = _record("Ship", ("name", "string"))
+    with pytest.raises(ValueError, match="Field 'color' of .* is not written and has no default value"):
+        pas.resolving_decoder(writer, Ship)
+
+
+def test_record_names_differ():
+    writer = _record("Boat", ("name", "string"), ("color", COLOR))
+    with pytest.raises(ValueError, match="Cannot read data written with schema"):
+        pas.resolving_decoder(writer, Ship)
+
+
+def test_same_schema():
+    assert pas.resolving_decoder(pas.generate(Ship), Ship) is pas.decoder(Ship)
+
+
+def test_cached():
+    writer = _record("Ship", ("name", "string"), ("color", COLOR))
+    pas.resolving_decoder.cache_clear()
+    decode = pas.resolving_decoder(writer, Ship)
+    # Schemas with the same Parsing Canonical Form
+    assert pas.resolving_decoder({**writer, "doc": "Ships"}, Ship) is decode
+    assert pas.resolving_decoder.cache_info().hits == 1
+
+
+def test_weak_keys():
+    PyType = dataclasses.make_dataclass("PyType", [("field_a", str)])
+    writer = _record("PyType", ("field_a", "string"), ("field_b", "long"))
+    assert pas.resolving_decoder(writer, PyType)(b"\x02a\x02") == PyType("a")
+    ref = weakref.ref(PyType)
+    del PyType
+    gc.collect()
+    assert ref() is None
+
+
+def test_invalid_data():
+    writer = _record("Ship", ("color", COLOR), ("crew", {"type": "array", "items": "string"}), ("name", "string"))
+    with pytest.raises(ValueError, match="unexpected end of data"):
+        pas.resolving_decoder(writer, Ship)(b"\x02\x02")
+    with pytest.raises(ValueError, match="5 is not a symbol index"):
+        pas.resolving_decoder(writer, Ship)(b"\x0a")
@@ -0,0 +1,90 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import io
+from typing import List, Optional
+
+import avro.io
+import avro.schema
+import pytest
+
+import py_avro_schema as pas
+
+
+@dataclasses.dataclass
+class ShipV1:
+    name: str
+
+
+@dataclasses.dataclass
+class ShipV2:
+    name: str
+    year_launched: Optional[int] = None
+
+
+def test_encode_single():
+    data = pas.encode_single(ShipV1("Titanic"))
+    assert data == b"\xc3\x01" + pas.fingerprint(ShipV1) + b"\x0eTitanic"
+
+
+def test_encode_single_matches_avro():
+    schema = avro.schema.parse(pas.generate(ShipV1))
+    # The reference implementation's fingerprint of the same schema
+    assert pas.encode_single(ShipV1("a"))[2:10] == schema.fingerprint()
+    buffer = io.BytesIO()
+    avro.io.DatumWriter(schema).write({"name": "a"}, avro.io.BinaryEncoder(buffer))
+    assert pas.encode_single(ShipV1("a"))[10:] == buffer.getvalue()
+
+
+def test_encode_single_py_type():
+    assert pas.encode_single([1], List[int]) == b"\xc3\x01" + pas.fingerprint(List[int]) + b"\x02\x02\x00"
+
+
+def test_decode_single_mixed_schemas():
+    pas.decode_single.cache_clear()
+    resolver = {pas.fingerprint(ShipV1): ShipV1, pas.fingerprint(ShipV2): ShipV2}
+    values = [ShipV1("a"), ShipV2("b", 1912), ShipV1("c"), ShipV2("d")]
+    assert [pas.decode_single(pas.encode_single(value), resolver) for value in values] == values
+    info = pas.decode_single.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 2, 2)
+
+
+def test_decode_single_resolver_function():
+    data = pas.encode_single(ShipV2("a"), options=pas.Option.NO_DOC)
+    assert pas.decode_single(data, lambda fingerprint: ShipV2) == ShipV2("a")
+
+
+def test_decode_single_memoryview():
+    data = bytearray(b"\x00" + pas.encode_single(ShipV1("a")))
+    assert pas.decode_single(memoryview(data)[1:], {pas.fingerprint(ShipV1): ShipV1}) == ShipV1("a")
+
+
+def test_decode_single_options():
+    options = pas.Option.FLOAT_32
+    data = pas.encode_single(1.5, float, options=options)
+    assert pas.decode_single(data, {pas.fingerprint(float, options=options): float}, options=options) == 1.5
+
+
+@pytest.mark.parametrize("data", [b"", b"\xc3\x01\x00", b"\xc3\x02" + bytes(8)])
+def test_decode_single_invalid(data):
+    with pytest.raises(ValueError, match="not in the Avro single-object encoding"):
+        pas.decode_single(data, {})
+
+
+def test_decode_single_unknown_fingerprint():
+    with pytest.raises(ValueError, match=f"Unknown schema fingerprint {pas.fingerprint(ShipV1).hex()}"):
+        pas.decode_single(pas.encode_single(ShipV1("a")), {})
+
+
+def test_decode_single_other_schema():
+    with pytest.raises(ValueError, match="is not the schema for"):
+        pas.decode_single(pas.encode_single(ShipV1("a")), lambda fingerprint: ShipV2)
@@ -11,10 +11,14 @@
 
 import decimal
 import re
+import typing
+from typing import Annotated, Optional
 
 import pytest
 import typeguard
 
+import py_avro_schema._type_hints
+from py_avro_schema._type_hints import raw_annotations, type_hints
 from py_avro_schema._typing import DecimalMeta, DecimalType
 
 
@@ -84,3 +88,44 @@ def test_precision_lt_scale():
 def test_bad_indexing():
     with pytest.raises(TypeError, match=re.escape('type of argument "params" must be a tuple; got int instead')):
         DecimalType[4]
+
+
+def test_type_hints_resolved_once(monkeypatch):
+    calls = []
+
+    def counting_get_type_hints(*args, **kwargs):
+        calls.append(args)
+        return typing.get_type_hints(*args, **kwargs)
+
+    monkeypatch.setattr(py_avro_schema._type_hints, "get_type_hints", counting_get_type_hints)
+
+    class PyType:
+        field_a: Annotated[int, "meta"]
+        field_b: "Optional[str]"
+
+    expected = {"field_a": Annotated[int, "meta"], "field_b": Optional[str]}
+    assert type_hints(PyType) == expected
+    assert type_hints(PyType) == expected
+    assert len(calls) == 1
+
+
+def test_type_hints_failure_not_cached():
+    class PyType:
+        field_a: "PyTypeNotDefinedYet"  # noqa: F821
+
+    with pytest.raises(NameError):
+        type_hints(PyType)
+    PyType.__annotations__["field_a"] = "int"
+    assert type_hints(PyType) == {"field_a": int}
+
+
+def test_raw_annotations_first_in_mro():
+    class Base:
+        field_a: int
+        field_b: int
+
+    class PyType(Base):
+        field_b: "str"
+        field_c: bytes
+
+    assert raw_annotations(PyType) == {"field_b": "str", "field_c": bytes, "field_a": int}
@@ -0,0 +1,168 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import collections.abc
+import dataclasses
+import datetime
+import enum
+import gc
+import weakref
+from typing import (
+    AbstractSet,
+    Annotated,
+    Any,
+    Dict,
+    Final,
+    List,
+    Literal,
+    NewType,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypedDict,
+    TypeVar,
+    Union,
+)
+
+import pytest
+import typeguard
+
+from py_avro_schema._validators import compile_validator
+
+
+class Color(enum.Enum):
+    RED = "RED"
+    BLUE = "BLUE"
+
+
+@dataclasses.dataclass
+class Ship:
+    name: str
+
+
+UserId = NewType("UserId", int)
+
+VALUES = [
+    None,
+    True,
+    0,
+    1,
+    1.5,
+    1j,
+    "",
+    "a",
+    b"a",
+    bytearray(b"a"),
+    [],
+    [1, 2],
+    [1, "a"],
+    ["a"],
+    (),
+    (1,),
+    (1, "a"),
+    (1, 2, 3),
+    {1, 2},
+    frozenset({"a"}),
+    {},
+    {"a": 1},
+    {"a": "b"},
+    {1: [1]},
+    Color.RED,
+    Ship("a"),
+    datetime.date(2020, 1, 1),
+    datetime.datetime(2020, 1, 1),
+]
+
+TYPES = [
+    Any,
+    None,
+    type(None),
+    bool,
+    int,
+    float,
+    complex,
+    str,
+    bytes,
+    datetime.date,
+    datetime.datetime,
+    Color,
+    Ship,
+    UserId,
+    List[int],
+    list[str],
+    List,
+    Sequence[int],
+    collections.abc.Sequence[str],
+    Set[int],
+    set,
+    AbstractSet[str],
+    frozenset[str],
+    Dict[str, int],
+    dict[str, Any],
+    Dict[int, List[int]],
+    Tuple[int, ...],
+    Tuple[int, str],
+    tuple[int],
+    Tuple[()],
+    tuple,
+    Optional[int],
+    Optional[float],
+    Union[str, List[int], None],
+    Literal["a", 1],
+    Literal[True],
+    Literal[Color.RED],
+    Optional[Literal["a", Literal["b"]]],
+    Annotated[int, "meta"],
+    Annotated[List[str], "meta"],
+    Optional[Annotated[Color, "meta"]],
+]
+
+
+@pytest.mark.parametrize("py_type", TYPES)
+def test_same_as_typeguard(py_type):
+    validator = compile_validator(py_type)
+    assert validator is not None
+    for value in VALUES:
+        try:
+            typeguard.check_type("value", value, py_type)
+            expected = True
+        except TypeError:
+            expected = False
+        assert validator(value) is expected, value
+
+
+T = TypeVar("T")
+
+
+class Movie(TypedDict):
+    name: str
+
+
+@pytest.mark.parametrize(
+    "py_type", [Type[int], T, Final[int], Movie, Optional["Ship"], List[Movie], Dict[str, T], Tuple[T, int]]
+)
+def test_not_supported(py_type):
+    assert compile_validator(py_type) is None
+
+
+def test_cached():
+    assert compile_validator(List[Ship]) is compile_validator(List[Ship])
+
+
+def test_weak_keys():
+    PyType = type("PyType", (), {})
+    assert compile_validator(PyType)(PyType())
+    ref = weakref.ref(PyType)
+    del PyType
+    gc.collect()
+    assert ref() is None
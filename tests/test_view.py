@@ -0,0 +1,156 @@
+# Copyright 2022 J.P. Morgan Chase & Co.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except in compliance with
+# the License. You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+import dataclasses
+import datetime
+import gc
+import weakref
+from typing import Dict, List, Optional, TypedDict
+
+import pydantic
+import pytest
+
+import py_avro_schema as pas
+from py_avro_schema._view import ArrayView, RecordView
+
+UTC = datetime.timezone.utc
+
+
+@dataclasses.dataclass
+class Item:
+    name: str
+    quantity: int
+
+
+@dataclasses.dataclass
+class Order:
+    id: int
+    notes: Dict[str, str]
+    items: List[Item]
+    shipped: Optional[datetime.datetime]
+    parent: Optional["Order"]
+    total: float
+
+
+class Ship(pydantic.BaseModel):
+    name: str
+    length: float
+    crew: List[str]
+
+
+class Movie(TypedDict):
+    title: str
+    year: int
+
+
+ORDER = Order(
+    2,
+    {"a": "b"},
+    [Item("x", 1), Item("y", 2)],
+    datetime.datetime(2000, 1, 2, tzinfo=UTC),
+    Order(1, {}, [], None, None, 0.5),
+    9.5,
+)
+
+
+def test_view_fields():
+    order_view = pas.view(Order)(pas.encoder(Order)(ORDER))
+    assert isinstance(order_view, RecordView)
+    assert order_view.total == 9.5
+    assert order_view.id == 2
+    assert order_view.shipped == ORDER.shipped
+    assert order_view.notes == {"a": "b"}
+
+
+def test_view_offsets_cached():
+    order_view = pas.view(Order)(pas.encoder(Order)(ORDER))
+    assert order_view._offsets == [0]
+    order_view.items
+    assert len(order_view._offsets) == 3
+    order_view.id
+    assert len(order_view._offsets) == 3
+
+
+def test_view_nested():
+    order_view = pas.view(Order)(pas.encoder(Order)(ORDER))
+    items = order_view.items
+    assert isinstance(items, ArrayView)
+    assert isinstance(items[1], RecordView)
+    assert items[1].name == "y"
+    assert items[-2].quantity == 1
+    assert [item.name for item in items] == ["x", "y"]
+    assert len(items) == 2
+    assert items.materialize() == ORDER.items
+    parent = order_view.parent
+    assert type(parent) is type(order_view)
+    assert parent.total == 0.5
+    assert parent.parent is None
+    assert len(parent.items) == 0
+
+
+def test_view_index_error():
+    items = pas.view(Order)(pas.encoder(Order)(ORDER)).items
+    with pytest.raises(IndexError):
+        items[2]
+
+
+def test_materialize():
+    order_view = pas.view(Order)(pas.encoder(Order)(ORDER))
+    order_view.total
+    assert order_view.materialize() == ORDER
+    assert order_view.parent.materialize() == ORDER.parent
+
+
+def test_view_pydantic():
+    ship = Ship(name="a", length=1.5, crew=["b", "c"])
+    ship_view = pas.view(Ship)(pas.encoder(Ship)(ship))
+    assert list(ship_view.crew) == ["b", "c"]
+    assert ship_view.materialize() == ship
+
+
+def test_view_typed_dict():
+    movie_view = pas.view(Movie)(pas.encoder(Movie)({"title": "a", "year": 2000}))
+    assert movie_view.year == 2000
+    assert movie_view.materialize() == {"title": "a", "year": 2000}
+
+
+def test_view_buffer_slice():
+    data = bytearray(b"\x00" + pas.encoder(Item)(Item("a", 1)))
+    assert pas.view(Item)(memoryview(data)[1:]).quantity == 1
+
+
+def test_view_class():
+    order_view_class = pas.view(Order)
+    assert order_view_class.__name__ == "OrderView"
+    assert pas.view(Order) is order_view_class
+    assert repr(order_view_class(b"")) == "<OrderView at position 0>"
+    with pytest.raises(AttributeError):
+        order_view_class(b"").other = 1  # Slots only
+
+
+def test_view_weak_keys():
+    PyType = dataclasses.make_dataclass("PyType", [("field_a", str)])
+    assert pas.view(PyType)(b"\x02a").materialize() == PyType("a")
+    assert pas.view(PyType) is pas.view(PyType)
+    ref = weakref.ref(PyType)
+    del PyType
+    gc.collect()
+    assert ref() is None
+
+
+def test_view_not_a_record():
+    with pytest.raises(pas.TypeNotSupportedError, match="only record types are supported"):
+        pas.view(List[int])
+
+
+def test_view_invalid_data():
+    with pytest.raises(ValueError, match="unexpected end of data"):
+        pas.view(Item)(b"\x02a").quantity